@@ -0,0 +1,215 @@
+import csv
+import math
+import time
+
+# Janelas móveis padrão (nome -> duração em segundos)
+DEFAULT_WINDOWS = {
+    "1s": 1.0,
+    "1min": 60.0,
+    "1h": 3600.0
+}
+
+# Campos das amostras do BMP280 que são agregados
+DEFAULT_FIELDS = ("temperature", "pressure")
+
+
+class _Bucket:
+    """Estatísticas parciais (contagem, média, M2, mínimo e máximo) de um intervalo"""
+    __slots__ = ("index", "count", "mean", "m2", "min", "max")
+
+    def __init__(self):
+        self.reset(None)
+
+    def reset(self, index):
+        self.index = index
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value):
+        # Algoritmo de Welford: atualização numericamente estável em O(1)
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        # Combinação de Chan et al. para juntar duas estatísticas parciais
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def summary(self):
+        if self.count == 0:
+            return {"count": 0, "min": None, "max": None, "mean": None, "stddev": None}
+        return {
+            "count": self.count,
+            "min": self.min,
+            "max": self.max,
+            "mean": self.mean,
+            "stddev": math.sqrt(self.m2 / self.count)
+        }
+
+
+class RollingWindow:
+    def __init__(self, duration, buckets=60):
+        """
+        Janela móvel de estatísticas com memória fixa.
+
+        A janela é dividida em um anel de 'buckets' intervalos; cada amostra
+        atualiza apenas o intervalo corrente (O(1)) e a consulta combina um
+        número fixo de intervalos.
+
+        Args:
+            duration (float): Duração da janela em segundos
+            buckets (int): Número de intervalos do anel (resolução da janela)
+        """
+        self.duration = duration
+        self.width = duration / buckets
+        self.ring = [_Bucket() for _ in range(buckets)]
+
+    def add(self, timestamp, value):
+        index = int(timestamp // self.width)
+        bucket = self.ring[index % len(self.ring)]
+        if bucket.index != index:
+            bucket.reset(index)
+        bucket.add(value)
+
+    def stats(self, now):
+        """
+        Retorna as estatísticas das amostras dentro da janela terminada em 'now'
+
+        Returns:
+            dict: count, min, max, mean e stddev (None se a janela estiver vazia)
+        """
+        newest = int(now // self.width)
+        oldest = newest - len(self.ring) + 1
+        total = _Bucket()
+        for bucket in self.ring:
+            if bucket.index is not None and oldest <= bucket.index <= newest:
+                total.merge(bucket)
+        return total.summary()
+
+
+class ReadingAggregator:
+    def __init__(self, windows=None, fields=DEFAULT_FIELDS, downsample_period=60.0, sinks=None):
+        """
+        Agrega as leituras do BMP280 em janelas móveis e gera uma série reduzida.
+
+        Args:
+            windows (dict): Janelas móveis (nome -> duração em segundos)
+            fields (tuple): Campos das amostras a agregar
+            downsample_period (float): Período da série reduzida em segundos
+                                       (None para desativar)
+            sinks (list): Funções chamadas com cada registro da série reduzida
+        """
+        windows = windows or DEFAULT_WINDOWS
+        self.fields = fields
+        self.windows = {
+            name: {field: RollingWindow(duration) for field in fields}
+            for name, duration in windows.items()
+        }
+        self.downsample_period = downsample_period
+        self.sinks = list(sinks or [])
+        self._period_index = None
+        self._period = {field: _Bucket() for field in fields}
+        self.last_timestamp = None
+
+    def add(self, sample):
+        """
+        Adiciona uma amostra (dicionário retornado por read_all ou sample_all)
+
+        Args:
+            sample (dict): Valores dos campos e, opcionalmente, 'timestamp'
+        """
+        timestamp = sample.get("timestamp")
+        if timestamp is None:
+            timestamp = time.time()
+
+        if self.downsample_period:
+            index = int(timestamp // self.downsample_period)
+            if self._period_index is not None and index != self._period_index:
+                self._emit()
+            self._period_index = index
+
+        for field in self.fields:
+            value = sample.get(field)
+            if value is None:
+                continue
+            for window in self.windows.values():
+                window[field].add(timestamp, value)
+            if self.downsample_period:
+                self._period[field].add(value)
+
+        self.last_timestamp = timestamp
+
+    def stats(self, window, now=None):
+        """
+        Retorna as estatísticas de uma janela para todos os campos
+
+        Args:
+            window (str): Nome da janela (ex.: '1s', '1min', '1h')
+            now (float): Instante de referência (padrão: última amostra)
+        """
+        if now is None:
+            now = self.last_timestamp if self.last_timestamp is not None else time.time()
+        return {field: w.stats(now) for field, w in self.windows[window].items()}
+
+    def _emit(self):
+        """Fecha o período corrente da série reduzida e envia o registro aos sinks"""
+        record = {"timestamp": self._period_index * self.downsample_period}
+        for field, bucket in self._period.items():
+            summary = bucket.summary()
+            for key, value in summary.items():
+                record[f"{field}_{key}"] = value
+            bucket.reset(None)
+        if any(record[f"{field}_count"] for field in self.fields):
+            for sink in self.sinks:
+                sink(record)
+
+    def flush(self):
+        """Emite o período parcial corrente (usar antes de encerrar)"""
+        if self._period_index is not None:
+            self._emit()
+            self._period_index = None
+
+
+class CSVSink:
+    def __init__(self, path, fields=DEFAULT_FIELDS):
+        """
+        Grava a série reduzida em um arquivo CSV (modo append)
+
+        Args:
+            path (str): Caminho do arquivo CSV
+            fields (tuple): Campos agregados (define as colunas)
+        """
+        columns = ["timestamp"]
+        for field in fields:
+            columns += [f"{field}_{key}" for key in ("count", "min", "max", "mean", "stddev")]
+        self.file = open(path, "a", newline="")
+        self.writer = csv.DictWriter(self.file, fieldnames=columns)
+        if self.file.tell() == 0:
+            self.writer.writeheader()
+
+    def __call__(self, record):
+        self.writer.writerow(record)
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+import os
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import platform
+import tempfile
+
+from i2c_module import BMP280Sensor, I2C_LIBRARIES_AVAILABLE
+from fake_smbus import FakeSMBus, bosch_registers
+
+# Modos e operações medidos
+MODES = ("simulation", "kernel", "i2c")
+OPERATIONS = ("read_temperature", "read_pressure", "read_all")
+
+# Percentis reportados para a latência de cada leitura
+PERCENTILES = (50, 90, 99)
+
+# Valores escritos nos arquivos sysfs falsos (formato do driver bmp280 do kernel)
+FAKE_SYSFS_TEMPERATURE = "25080"
+FAKE_SYSFS_PRESSURE = "100.653"
+
+
+def _create_fake_sysfs(directory):
+    """Cria um diretório IIO falso com os arquivos de temperatura e pressão"""
+    with open(os.path.join(directory, "in_temp_input"), "w") as f:
+        f.write(FAKE_SYSFS_TEMPERATURE + "\n")
+    with open(os.path.join(directory, "in_pressure_input"), "w") as f:
+        f.write(FAKE_SYSFS_PRESSURE + "\n")
+    return directory
+
+
+def create_sensor(mode, workdir):
+    """
+    Cria um sensor no modo pedido, usando arquivos sysfs falsos (kernel) ou um
+    barramento SMBus falso (i2c)
+
+    Returns:
+        BMP280Sensor: Sensor pronto para leitura, ou None se o modo não estiver disponível
+    """
+    if mode == "simulation":
+        return BMP280Sensor(simulation_mode=True)
+    if mode == "kernel":
+        sensor = BMP280Sensor(use_kernel_module=True, device_path=_create_fake_sysfs(workdir))
+    else:
+        if not I2C_LIBRARIES_AVAILABLE:
+            return None
+        bus = FakeSMBus(1, {0x76: bosch_registers()})
+        sensor = BMP280Sensor(use_kernel_module=False, i2c_addr=0x76, bus=bus)
+    # Se a inicialização caiu para simulação, o resultado não mediria o modo pedido
+    return None if sensor.simulation_mode else sensor
+
+
+def percentile(sorted_values, pct):
+    """Percentil por interpolação linear de uma lista já ordenada"""
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * pct / 100.0
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    fraction = position - lower
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * fraction
+
+
+def measure(func, iterations, warmup):
+    """
+    Mede uma operação de leitura
+
+    Returns:
+        dict: Vazão (leituras/s), percentis de latência (µs) e tempo de CPU por leitura (µs)
+    """
+    for _ in range(warmup):
+        func()
+
+    latencies = [0] * iterations
+    perf_counter_ns = time.perf_counter_ns
+    cpu_start = time.process_time()
+    wall_start = perf_counter_ns()
+    for i in range(iterations):
+        start = perf_counter_ns()
+        func()
+        latencies[i] = perf_counter_ns() - start
+    wall = (perf_counter_ns() - wall_start) / 1e9
+    cpu = time.process_time() - cpu_start
+
+    latencies.sort()
+    result = {
+        "iterations": iterations,
+        "reads_per_s": iterations / wall if wall > 0 else 0.0,
+        "cpu_us_per_read": cpu * 1e6 / iterations,
+        "latency_us": {f"p{p}": percentile(latencies, p) / 1000.0 for p in PERCENTILES}
+    }
+    result["latency_us"]["max"] = latencies[-1] / 1000.0
+    return result
+
+
+def run_benchmarks(modes=MODES, iterations=5000, warmup=200, seed=0):
+    """
+    Executa o benchmark de todas as operações nos modos pedidos
+
+    Returns:
+        dict: Metadados da execução e resultados por modo/operação
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for mode in modes:
+            random.seed(seed)
+            sensor = create_sensor(mode, workdir)
+            if sensor is None:
+                results[mode] = {"skipped": "modo indisponível neste ambiente"}
+                continue
+            try:
+                results[mode] = {
+                    op: measure(getattr(sensor, op), iterations, warmup) for op in OPERATIONS
+                }
+            finally:
+                sensor.close()
+
+    return {
+        "metadata": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "iterations": iterations,
+            "warmup": warmup,
+            "seed": seed,
+            "timestamp": time.time()
+        },
+        "results": results
+    }
+
+
+def compare(current, baseline, tolerance):
+    """
+    Compara a vazão com um resultado anterior
+
+    Args:
+        tolerance (float): Queda relativa de vazão aceita (ex.: 0.2 = 20%)
+
+    Returns:
+        list: Descrição das regressões encontradas
+    """
+    regressions = []
+    for mode, ops in current["results"].items():
+        base_ops = baseline.get("results", {}).get(mode, {})
+        if "skipped" in ops or "skipped" in base_ops:
+            continue
+        for op, data in ops.items():
+            base = base_ops.get(op)
+            if not base:
+                continue
+            limit = base["reads_per_s"] * (1.0 - tolerance)
+            if data["reads_per_s"] < limit:
+                regressions.append(
+                    f"{mode}.{op}: {data['reads_per_s']:.0f} leituras/s "
+                    f"(referência {base['reads_per_s']:.0f}, mínimo aceito {limit:.0f})")
+    return regressions
+
+
+def print_results(report):
+    print("\n{:<11} | {:<17} | {:>12} | {:>9} | {:>9} | {:>9} | {:>9}".format(
+        "Modo", "Operação", "Leituras/s", "p50 (µs)", "p99 (µs)", "máx (µs)", "CPU (µs)"))
+    print("-" * 95)
+    for mode, ops in report["results"].items():
+        if "skipped" in ops:
+            print(f"{mode:<11} | {ops['skipped']}")
+            continue
+        for op, data in ops.items():
+            lat = data["latency_us"]
+            print("{:<11} | {:<17} | {:>12.0f} | {:>9.1f} | {:>9.1f} | {:>9.1f} | {:>9.1f}".format(
+                mode, op, data["reads_per_s"], lat["p50"], lat["p99"], lat["max"], data["cpu_us_per_read"]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de leitura do BMP280Sensor em todos os modos')
+    parser.add_argument('--mode', choices=MODES, action='append', help='Modo a medir (pode repetir; padrão: todos)')
+    parser.add_argument('--iterations', type=int, default=5000, help='Leituras medidas por operação')
+    parser.add_argument('--warmup', type=int, default=200, help='Leituras de aquecimento por operação')
+    parser.add_argument('--seed', type=int, default=0, help='Semente do gerador aleatório da simulação')
+    parser.add_argument('--output', help='Arquivo JSON onde gravar os resultados')
+    parser.add_argument('--baseline', help='Arquivo JSON de referência para detectar regressões')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Queda de vazão aceita frente à referência')
+    args = parser.parse_args()
+
+    # Logs de leitura do módulo distorcem a medição
+    logging.getLogger("I2C_Module").setLevel(logging.WARNING)
+
+    report = run_benchmarks(args.mode or MODES, args.iterations, args.warmup, args.seed)
+    print_results(report)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"\nResultados gravados em {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print("\nRegressões de desempenho encontradas:")
+            for line in regressions:
+                print(f"  • {line}")
+            return 1
+        print("\nNenhuma regressão frente à referência")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+import errno
+
+
+class FakeSMBus:
+    def __init__(self, bus_number=1, devices=None):
+        """
+        Barramento SMBus falso, com a mesma interface usada do smbus2.SMBus,
+        para testar o diagnóstico e os sensores sem hardware.
+
+        Args:
+            bus_number (int): Número do barramento (apenas informativo)
+            devices (dict): Endereço -> mapa de registradores (dict registrador -> byte)
+        """
+        self.bus_number = bus_number
+        self.devices = devices if devices is not None else {}
+        self.transactions = 0
+        self.closed = False
+
+    def _device(self, addr):
+        self.transactions += 1
+        if self.closed:
+            raise OSError(errno.EBADF, "Barramento fechado")
+        if addr not in self.devices:
+            raise OSError(errno.EREMOTEIO, "Remote I/O error")
+        return self.devices[addr]
+
+    def write_quick(self, addr):
+        self._device(addr)
+
+    def read_byte(self, addr):
+        return self._device(addr).get(0x00, 0x00)
+
+    def read_byte_data(self, addr, register):
+        return self._device(addr).get(register, 0xFF)
+
+    def write_byte_data(self, addr, register, value):
+        self._device(addr)[register] = value & 0xFF
+
+    def read_i2c_block_data(self, addr, register, length, force=None):
+        regs = self._device(addr)
+        return [regs.get(register + i, 0xFF) for i in range(length)]
+
+    def write_i2c_block_data(self, addr, register, data, force=None):
+        regs = self._device(addr)
+        for i, value in enumerate(data):
+            regs[register + i] = value & 0xFF
+
+    def close(self):
+        self.closed = True
+
+
+# Coeficientes de calibração do exemplo da seção 8.2 do datasheet do BMP280
+BMP280_CALIBRATION = (27504, 26435, -1000, 36477, -10685, 3024, 2855, 140, -7, 15500, -14600, 6000)
+
+# Leituras brutas (20 bits) do mesmo exemplo: 25.08°C e 1006.53 hPa
+BMP280_RAW_TEMPERATURE = 519888
+BMP280_RAW_PRESSURE = 415148
+
+
+def bosch_registers(chip_id=0x58, raw_temperature=BMP280_RAW_TEMPERATURE, raw_pressure=BMP280_RAW_PRESSURE):
+    """
+    Mapa de registradores de um BMP280 (0x58) ou BME280 (0x60): identificação,
+    calibração (0x88-0x9F, palavras de 16 bits little-endian) e dados (0xF7-0xFC)
+    """
+    registers = {0xD0: chip_id, 0xF3: 0x00, 0xF4: 0x00, 0xF5: 0x00}
+    for i, value in enumerate(BMP280_CALIBRATION):
+        value &= 0xFFFF
+        registers[0x88 + 2 * i] = value & 0xFF
+        registers[0x89 + 2 * i] = value >> 8
+    for base, raw in ((0xF7, raw_pressure), (0xFA, raw_temperature)):
+        registers[base] = (raw >> 12) & 0xFF
+        registers[base + 1] = (raw >> 4) & 0xFF
+        registers[base + 2] = (raw & 0x0F) << 4
+    return registers
+
+
+def mpu_registers(who_am_i=0x68):
+    """Mapa mínimo de registradores de um MPU6050 (WHO_AM_I = 0x68)"""
+    return {0x75: who_am_i}
+
+
+def ds3231_registers():
+    """Mapa mínimo de registradores de um RTC DS3231 (sem registrador de identificação)"""
+    return {0x00: 0x00, 0x0E: 0x1C, 0x0F: 0x88}
@@ -4,14 +4,19 @@ import sys
 import logging
 import random
 
-# Configurando o logger
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[logging.StreamHandler()]
-)
+import log_queue
+
 logger = logging.getLogger("I2C_Module")
 
+
+def configure_logging(level=logging.INFO):
+    """
+    Configura a saída de log no console, atrás de uma fila (ver
+    log_queue.py). Chamada apenas pelos scripts: importar o módulo não altera
+    a configuração de logging da aplicação.
+    """
+    return log_queue.configure_logging(level)
+
 # Tentativa condicional de importar bibliotecas específicas do I2C
 try:
     import smbus2
@@ -22,7 +27,8 @@ except ImportError:
     logger.warning("Bibliotecas smbus2/bmp280 não encontradas. Modo de simulação será usado.")
 
 class BMP280Sensor:
-    def __init__(self, use_kernel_module=True, i2c_addr=0x76, i2c_bus=1, simulation_mode=False):
+    def __init__(self, use_kernel_module=True, i2c_addr=0x76, i2c_bus=1, simulation_mode=False,
+                 bus=None, device_path=None, simulator=None, clock=None):
         """
         Inicializa o sensor BMP280.
         
@@ -32,6 +38,13 @@ class BMP280Sensor:
             i2c_addr (int): Endereço I2C do sensor (geralmente 0x76 ou 0x77)
             i2c_bus (int): Número do barramento I2C (geralmente 1 para Raspberry Pi)
             simulation_mode (bool): Se True, gera valores simulados em vez de ler hardware
+            bus (smbus2.SMBus): Handle de barramento já aberto, compartilhado com
+                                outros sensores (não é fechado por close())
+            device_path (str): Diretório IIO específico do sensor no modo kernel
+            simulator (BMP280Simulator): Série com semente usada no modo de
+                                         simulação (ver simulation.py)
+            clock (callable): Relógio das leituras do simulador (padrão:
+                              time.time; ex.: VirtualClock(speed).time)
         """
         self.use_kernel_module = use_kernel_module
         self.i2c_addr = i2c_addr
@@ -39,14 +52,23 @@ class BMP280Sensor:
         self.sensor = None
         self.kernel_temp_path = None
         self.kernel_pressure_path = None
-        self.simulation_mode = simulation_mode or not I2C_LIBRARIES_AVAILABLE
-        self.bus = None
+        self.kernel_device_path = device_path
+        # O módulo do kernel não depende de smbus2/bmp280, apenas o acesso I2C direto
+        self.simulation_mode = simulation_mode or (not use_kernel_module and not I2C_LIBRARIES_AVAILABLE)
+        self.bus = bus
+        self.owns_bus = bus is None
+        
+        # Falhas de leitura (as leituras com erro retornam valores padrão)
+        self.error_count = 0
+        self.last_error = None
         
         # Valores iniciais para simulação
         self.simulated_temp = 25.0
         self.simulated_pressure = 1013.25
         self.simulation_trend = 0.1  # Tendência de temperatura
         self.last_update = time.time()
+        self.simulator = simulator
+        self.clock = clock or time.time
         
         # Se for modo de simulação, não tenta inicializar hardware
         if self.simulation_mode:
@@ -59,7 +81,7 @@ class BMP280Sensor:
             else:
                 self._initialize_i2c()
         except Exception as e:
-            logger.error(f"Erro ao inicializar o sensor BMP280: {e}")
+            logger.error("Erro ao inicializar o sensor BMP280: %s", e)
             logger.info("Tentando ativar modo de simulação automaticamente...")
             self.simulation_mode = True
 
@@ -69,11 +91,12 @@ class BMP280Sensor:
             raise ImportError("Bibliotecas smbus2/bmp280 não estão instaladas")
             
         # Primeiro, verifica se o barramento especificado existe
-        if not os.path.exists(f"/dev/i2c-{self.i2c_bus}"):
+        if self.owns_bus and not os.path.exists(f"/dev/i2c-{self.i2c_bus}"):
             raise FileNotFoundError(f"Barramento I2C-{self.i2c_bus} não encontrado")
         
         try:
-            self.bus = smbus2.SMBus(self.i2c_bus)
+            if self.owns_bus:
+                self.bus = smbus2.SMBus(self.i2c_bus)
             
             # Tenta verificar se o dispositivo está presente no barramento
             try:
@@ -81,35 +104,39 @@ class BMP280Sensor:
             except OSError:
                 # Se falhar, tenta o endereço alternativo comum (0x76 ou 0x77)
                 alt_addr = 0x77 if self.i2c_addr == 0x76 else 0x76
-                logger.info(f"Dispositivo não encontrado em 0x{self.i2c_addr:02x}, tentando 0x{alt_addr:02x}")
+                logger.info("Dispositivo não encontrado em 0x%02x, tentando 0x%02x", self.i2c_addr, alt_addr)
                 try:
                     self.bus.read_byte(alt_addr)
                     self.i2c_addr = alt_addr
                 except OSError:
-                    logger.warning(f"Sensor BMP280 não encontrado nos endereços 0x76 ou 0x77")
+                    logger.warning("Sensor BMP280 não encontrado nos endereços 0x76 ou 0x77")
                     logger.info("Tentando usar o módulo do kernel...")
                     self.use_kernel_module = True
                     self._initialize_kernel_module()
                     return
             
             self.sensor = bmp280.BMP280(i2c_dev=self.bus, i2c_addr=self.i2c_addr)
-            logger.info(f"Sensor BMP280 inicializado com sucesso via I2C direto (barramento: {self.i2c_bus}, endereço: 0x{self.i2c_addr:02x})")
+            logger.info("Sensor BMP280 inicializado com sucesso via I2C direto (barramento: %d, endereço: 0x%02x)",
+                        self.i2c_bus, self.i2c_addr)
         except Exception as e:
-            if self.bus:
+            if self.bus and self.owns_bus:
                 self.bus.close()
-            logger.error(f"Erro ao inicializar I2C: {e}")
+            logger.error("Erro ao inicializar I2C: %s", e)
             raise
 
     def _initialize_kernel_module(self):
         """Inicializa a comunicação via módulo do kernel."""
         try:
             # Busca pelos diretórios do dispositivo
-            device_paths = [
-                "/sys/bus/i2c/devices/i2c-1/1-0076/iio:device0/",
-                "/sys/bus/i2c/devices/i2c-1/1-0077/iio:device1/",
-                "/sys/bus/iio/devices/iio:device0/",
-                "/sys/bus/iio/devices/iio:device1/"
-            ]
+            if self.kernel_device_path:
+                device_paths = [self.kernel_device_path]
+            else:
+                device_paths = [
+                    "/sys/bus/i2c/devices/i2c-1/1-0076/iio:device0/",
+                    "/sys/bus/i2c/devices/i2c-1/1-0077/iio:device1/",
+                    "/sys/bus/iio/devices/iio:device0/",
+                    "/sys/bus/iio/devices/iio:device1/"
+                ]
             
             for path in device_paths:
                 if os.path.exists(path):
@@ -118,14 +145,14 @@ class BMP280Sensor:
                     
                     if os.path.exists(temp_path):
                         self.kernel_temp_path = temp_path
-                        logger.info(f"Arquivo de temperatura BMP280 encontrado em: {temp_path}")
+                        logger.info("Arquivo de temperatura BMP280 encontrado em: %s", temp_path)
                     
                     if os.path.exists(pressure_path):
                         self.kernel_pressure_path = pressure_path
-                        logger.info(f"Arquivo de pressão BMP280 encontrado em: {pressure_path}")
+                        logger.info("Arquivo de pressão BMP280 encontrado em: %s", pressure_path)
                     
                     if self.kernel_temp_path or self.kernel_pressure_path:
-                        logger.info(f"Dispositivo BMP280 encontrado em: {path}")
+                        logger.info("Dispositivo BMP280 encontrado em: %s", path)
                         break
             
             if not self.kernel_temp_path:
@@ -133,11 +160,16 @@ class BMP280Sensor:
                 
             logger.info("Sensor BMP280 inicializado com sucesso via módulo do kernel")
         except Exception as e:
-            logger.error(f"Erro ao inicializar módulo do kernel: {e}")
+            logger.error("Erro ao inicializar módulo do kernel: %s", e)
             raise
 
     def _update_simulation(self):
         """Atualiza os valores simulados para criar variações realistas"""
+        if self.simulator is not None:
+            sample = self.simulator.sample_at(self.clock())
+            self.simulated_temp = sample["temperature"]
+            self.simulated_pressure = sample["pressure"]
+            return
         current_time = time.time()
         elapsed = current_time - self.last_update
         
@@ -191,15 +223,18 @@ class BMP280Sensor:
                         try:
                             temperature = float(temp_data)
                         except ValueError:
-                            logger.error(f"Formato de temperatura não reconhecido: {temp_data}")
+                            logger.error("Formato de temperatura não reconhecido: %s", temp_data)
+                            self.error_count += 1
                             temperature = 25.0  # Valor padrão em caso de erro
             else:
                 temperature = self.sensor.get_temperature()
             
-            logger.debug(f"Temperatura lida: {temperature:.2f}°C")
+            logger.debug("Temperatura lida: %.2f°C", temperature)
             return round(temperature, 2)
         except Exception as e:
-            logger.error(f"Erro ao ler temperatura: {e}")
+            logger.error("Erro ao ler temperatura: %s", e)
+            self.error_count += 1
+            self.last_error = str(e)
             # Retorna um valor padrão em caso de erro
             return 25.0
 
@@ -228,15 +263,18 @@ class BMP280Sensor:
                         try:
                             pressure = float(pressure_data)
                         except ValueError:
-                            logger.error(f"Formato de pressão não reconhecido: {pressure_data}")
+                            logger.error("Formato de pressão não reconhecido: %s", pressure_data)
+                            self.error_count += 1
                             pressure = 1013.25  # Valor padrão em caso de erro
             else:
                 pressure = self.sensor.get_pressure()
             
-            logger.debug(f"Pressão lida: {pressure:.2f} hPa")
+            logger.debug("Pressão lida: %.2f hPa", pressure)
             return round(pressure, 2)
         except Exception as e:
-            logger.error(f"Erro ao ler pressão: {e}")
+            logger.error("Erro ao ler pressão: %s", e)
+            self.error_count += 1
+            self.last_error = str(e)
             # Retorna um valor padrão em caso de erro
             return 1013.25
 
@@ -253,17 +291,23 @@ class BMP280Sensor:
         }
 
     def close(self):
-        """Fecha a conexão com o barramento I2C se estiver usando acesso direto."""
-        if not self.use_kernel_module and self.bus and not self.simulation_mode:
+        """
+        Fecha a conexão com o barramento I2C aberta por este sensor, também
+        quando a inicialização caiu para o módulo do kernel ou para a simulação
+        depois de abrir o barramento.
+        """
+        if self.bus and self.owns_bus:
             try:
                 self.bus.close()
                 logger.info("Conexão I2C fechada")
             except Exception as e:
-                logger.error(f"Erro ao fechar conexão I2C: {e}")
+                logger.error("Erro ao fechar conexão I2C: %s", e)
+            self.bus = None
 
 
 # Exemplo de uso do módulo
 if __name__ == "__main__":
+    configure_logging()
     try:
         # Verifica argumentos de linha de comando
         kernel_mode = "--kernel" in sys.argv or "-k" in sys.argv
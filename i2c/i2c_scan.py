@@ -1,66 +1,317 @@
 #!/usr/bin/env python3
-import smbus2
 import sys
 import os
+import re
+import glob
+import json
 import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
 
-def scan_i2c_bus(bus_number=1):
-    """Escaneia o barramento I2C e retorna todos os endereços de dispositivos encontrados"""
-    print(f"Escaneando barramento I2C-{bus_number} completo (endereços 0x03-0x77)...")
-    
+# smbus2 é opcional para permitir importar o módulo (e testar com um barramento falso)
+try:
+    import smbus2
+    SMBUS_AVAILABLE = True
+except ImportError:
+    smbus2 = None
+    SMBUS_AVAILABLE = False
+
+# Faixa de endereços válidos de 7 bits varrida (igual ao i2cdetect)
+FIRST_ADDRESS = 0x03
+LAST_ADDRESS = 0x77
+
+# Métodos de sondagem
+PROBE_AUTO = "auto"          # quick-write, exceto nas faixas onde i2cdetect usa read-byte
+PROBE_QUICK_WRITE = "quick"  # SMBus quick write (não transfere dados, mais rápido)
+PROBE_READ_BYTE = "read"     # Leitura de um byte (método original)
+PROBE_METHODS = (PROBE_AUTO, PROBE_QUICK_WRITE, PROBE_READ_BYTE)
+
+# Tempo de validade padrão das identificações em cache (segundos)
+FINGERPRINT_TTL = 300.0
+
+# Registradores de identificação conhecidos: (registrador, tamanho, valores -> nome)
+BOSCH_CHIP_ID = (0xD0, 1, {
+    (0x55,): "BMP180 (Sensor de Pressão/Temperatura)",
+    (0x56,): "BMP280 (Sensor de Pressão/Temperatura, amostra)",
+    (0x57,): "BMP280 (Sensor de Pressão/Temperatura, amostra)",
+    (0x58,): "BMP280 (Sensor de Pressão/Temperatura)",
+    (0x60,): "BME280 (Sensor de Pressão/Temperatura/Umidade)",
+    (0x61,): "BME680 (Sensor de Gás/Pressão/Temperatura/Umidade)"
+})
+MPU_WHO_AM_I = (0x75, 1, {
+    (0x68,): "MPU6050 (IMU)",
+    (0x70,): "MPU6500 (IMU)",
+    (0x71,): "MPU9250 (IMU)",
+    (0x73,): "MPU9255 (IMU)"
+})
+ADXL345_DEVID = (0x00, 1, {
+    (0xE5,): "ADXL345 (Acelerômetro)"
+})
+HMC5883L_ID = (0x0A, 3, {
+    (0x48, 0x34, 0x33): "HMC5883L (Magnetômetro)"
+})
+
+# Endereço -> (identificação, nome quando o registrador não confirma nenhum chip)
+ID_REGISTERS = {
+    0x1D: (ADXL345_DEVID, None),
+    0x1E: (HMC5883L_ID, None),
+    0x53: (ADXL345_DEVID, None),
+    0x68: (MPU_WHO_AM_I, "DS3231 (RTC)"),
+    0x69: (MPU_WHO_AM_I, None),
+    0x76: (BOSCH_CHIP_ID, None),
+    0x77: (BOSCH_CHIP_ID, None)
+}
+
+
+def list_i2c_buses():
+    """Retorna os números de todos os barramentos /dev/i2c-* existentes"""
+    buses = []
+    for path in glob.glob("/dev/i2c-*"):
+        match = re.match(r".*/i2c-(\d+)$", path)
+        if match:
+            buses.append(int(match.group(1)))
+    return sorted(buses)
+
+
+def probe_address(bus, addr, method=PROBE_AUTO):
+    """
+    Verifica se há um dispositivo respondendo em um endereço
+
+    Args:
+        bus: Objeto SMBus aberto
+        addr (int): Endereço de 7 bits
+        method (str): 'auto', 'quick' ou 'read'
+
+    Returns:
+        bool: True se o dispositivo respondeu
+    """
+    if method == PROBE_AUTO:
+        # Quick write pode corromper EEPROMs (0x50-0x5F) e alguns chips em 0x30-0x37
+        if 0x30 <= addr <= 0x37 or 0x50 <= addr <= 0x5F:
+            method = PROBE_READ_BYTE
+        else:
+            method = PROBE_QUICK_WRITE
     try:
-        bus = smbus2.SMBus(bus_number)
-        found_devices = []
-        
-        # Matriz para exibição dos dispositivos encontrados
-        address_grid = []
-        for i in range(8):
-            row = []
-            for j in range(16):
-                row.append("--")
-            address_grid.append(row)
-            
-        # Teste cada endereço possível no barramento I2C
-        for addr in range(0x03, 0x78):
-            try:
-                # Tenta ler um byte para ver se o dispositivo responde
-                bus.read_byte(addr)
-                # Se chegou aqui, um dispositivo foi encontrado
-                found_devices.append(addr)
-                
-                # Preenche a matriz
-                row = addr // 16
-                col = addr % 16
-                address_grid[row][col] = f"{addr:02X}"
-                
-            except Exception:
-                pass
-                
-        bus.close()
-        
-        # Mostra um cabeçalho
-        print("\n     0  1  2  3  4  5  6  7  8  9  A  B  C  D  E  F")
-        print("    -----------------------------------------------")
-        
-        # Exibe a matriz formatada
-        for i in range(8):
-            row_prefix = f"{i:X}0: "
-            print(row_prefix + " ".join(address_grid[i]))
-            
-        # Mostra os dispositivos encontrados de forma mais amigável
-        if found_devices:
-            print(f"\nForam encontrados {len(found_devices)} dispositivos I2C:")
-            for addr in found_devices:
-                device_name = get_device_name(addr)
-                print(f"  • Endereço 0x{addr:02X} - {device_name}")
+        if method == PROBE_QUICK_WRITE:
+            bus.write_quick(addr)
         else:
-            print("\nNenhum dispositivo I2C encontrado!")
-            
-        return found_devices
-        
+            bus.read_byte(addr)
+        return True
+    except Exception:
+        return False
+
+
+class FingerprintCache:
+    def __init__(self, ttl=FINGERPRINT_TTL, clock=time.monotonic):
+        """
+        Cache das identificações por (barramento, endereço) com tempo de validade,
+        para que diagnósticos repetidos não voltem a acessar o barramento.
+
+        Args:
+            ttl (float): Validade de cada entrada em segundos
+            clock (callable): Relógio monotônico (substituível em testes)
+        """
+        self.ttl = ttl
+        self.clock = clock
+        self.entries = {}
+
+    def get(self, bus_number, addr):
+        entry = self.entries.get((bus_number, addr))
+        if entry is None:
+            return None
+        identity, expires = entry
+        if self.clock() >= expires:
+            del self.entries[(bus_number, addr)]
+            return None
+        return identity
+
+    def put(self, bus_number, addr, identity):
+        self.entries[(bus_number, addr)] = (identity, self.clock() + self.ttl)
+
+    def clear(self):
+        self.entries.clear()
+
+
+# Cache compartilhado pelas funções do módulo
+fingerprint_cache = FingerprintCache()
+
+
+def _read_id(bus, addr, register, length):
+    """Lê o registrador de identificação (leitura em bloco quando há mais de um byte)"""
+    if length == 1:
+        return (bus.read_byte_data(addr, register),)
+    return tuple(bus.read_i2c_block_data(addr, register, length))
+
+
+def identify_device(bus, addr):
+    """
+    Identifica um dispositivo lendo seu registrador de identificação
+
+    Args:
+        bus: Objeto SMBus aberto
+        addr (int): Endereço do dispositivo
+
+    Returns:
+        dict: name, exact (True se confirmado pelo registrador) e id (bytes lidos)
+    """
+    spec = ID_REGISTERS.get(addr)
+    if spec is None:
+        return {"name": get_device_name(addr), "exact": False, "id": None}
+
+    (register, length, known), fallback = spec
+    try:
+        value = _read_id(bus, addr, register, length)
+    except Exception:
+        value = None
+
+    if value in known:
+        return {"name": known[value], "exact": True, "id": list(value)}
+    return {
+        "name": fallback or get_device_name(addr),
+        "exact": False,
+        "id": list(value) if value is not None else None
+    }
+
+
+def fingerprint_devices(bus, bus_number, addresses, cache=None):
+    """
+    Identifica, em uma única passada pelo barramento, todos os endereços que
+    ainda não estão no cache
+
+    Args:
+        bus: Objeto SMBus aberto
+        bus_number (int): Número do barramento (chave do cache)
+        addresses (list): Endereços a identificar
+        cache (FingerprintCache): Cache usado (padrão: cache do módulo)
+
+    Returns:
+        dict: Endereço -> identificação (ver identify_device)
+    """
+    if cache is None:
+        cache = fingerprint_cache
+    identities = {}
+    for addr in addresses:
+        identity = cache.get(bus_number, addr)
+        if identity is None:
+            identity = identify_device(bus, addr)
+            cache.put(bus_number, addr, identity)
+        identities[addr] = identity
+    return identities
+
+
+def scan_bus(bus_number=1, method=PROBE_AUTO, bus_factory=None, fingerprint=True, cache=None):
+    """
+    Escaneia um barramento I2C sem imprimir nada
+
+    Args:
+        bus_number (int): Número do barramento
+        method (str): Método de sondagem ('auto', 'quick' ou 'read')
+        bus_factory (callable): Construtor do barramento (padrão: smbus2.SMBus)
+        fingerprint (bool): Se True, identifica os dispositivos encontrados
+        cache (FingerprintCache): Cache das identificações (padrão: cache do módulo)
+
+    Returns:
+        dict: bus, method, devices (lista de endereços), identities, error e elapsed_s
+    """
+    if bus_factory is None:
+        bus_factory = smbus2.SMBus if SMBUS_AVAILABLE else None
+    result = {
+        "bus": bus_number,
+        "method": method,
+        "devices": [],
+        "identities": {},
+        "error": None,
+        "elapsed_s": 0.0
+    }
+    start = time.perf_counter()
+    try:
+        if bus_factory is None:
+            raise ImportError("Biblioteca smbus2 não encontrada")
+        bus = bus_factory(bus_number)
+        try:
+            for addr in range(FIRST_ADDRESS, LAST_ADDRESS + 1):
+                if probe_address(bus, addr, method):
+                    result["devices"].append(addr)
+            if fingerprint:
+                result["identities"] = fingerprint_devices(bus, bus_number, result["devices"], cache)
+        finally:
+            bus.close()
     except Exception as e:
-        print(f"Erro ao acessar o barramento I2C-{bus_number}: {e}")
+        result["error"] = str(e)
+    result["elapsed_s"] = time.perf_counter() - start
+    return result
+
+
+def scan_all_buses(buses=None, method=PROBE_AUTO, bus_factory=None, max_workers=None, fingerprint=True,
+                   cache=None):
+    """
+    Escaneia vários barramentos ao mesmo tempo, um por thread
+
+    Args:
+        buses (list): Barramentos a escanear (padrão: todos os /dev/i2c-*)
+        method (str): Método de sondagem
+        bus_factory (callable): Construtor do barramento (padrão: smbus2.SMBus)
+        max_workers (int): Número máximo de threads (padrão: um por barramento)
+        fingerprint (bool): Se True, identifica os dispositivos encontrados
+        cache (FingerprintCache): Cache das identificações (padrão: cache do módulo)
+
+    Returns:
+        list: Resultados de scan_bus ordenados pelo número do barramento
+    """
+    if buses is None:
+        buses = list_i2c_buses()
+    if not buses:
         return []
+    with ThreadPoolExecutor(max_workers=max_workers or len(buses)) as executor:
+        results = executor.map(lambda b: scan_bus(b, method, bus_factory, fingerprint, cache), buses)
+        return sorted(results, key=lambda r: r["bus"])
+
+
+def print_scan_result(result):
+    """Mostra o resultado de um barramento na forma de matriz (estilo i2cdetect)"""
+    bus_number = result["bus"]
+    print(f"Barramento I2C-{bus_number} (endereços 0x{FIRST_ADDRESS:02x}-0x{LAST_ADDRESS:02x}, "
+          f"método: {result['method']}, {result['elapsed_s'] * 1000:.1f} ms)")
+
+    if result["error"]:
+        print(f"Erro ao acessar o barramento I2C-{bus_number}: {result['error']}")
+        return
+
+    # Matriz para exibição dos dispositivos encontrados
+    address_grid = [["--"] * 16 for _ in range(8)]
+    for addr in result["devices"]:
+        address_grid[addr // 16][addr % 16] = f"{addr:02X}"
+
+    # Mostra um cabeçalho
+    print("\n     0  1  2  3  4  5  6  7  8  9  A  B  C  D  E  F")
+    print("    -----------------------------------------------")
+
+    # Exibe a matriz formatada
+    for i in range(8):
+        row_prefix = f"{i:X}0: "
+        print(row_prefix + " ".join(address_grid[i]))
+
+    # Mostra os dispositivos encontrados de forma mais amigável
+    found_devices = result["devices"]
+    if found_devices:
+        print(f"\nForam encontrados {len(found_devices)} dispositivos I2C:")
+        for addr in found_devices:
+            identity = result["identities"].get(addr)
+            if identity is None:
+                print(f"  • Endereço 0x{addr:02X} - {get_device_name(addr)}")
+            elif identity["exact"]:
+                print(f"  • Endereço 0x{addr:02X} - {identity['name']} [identificado pelo registrador]")
+            else:
+                print(f"  • Endereço 0x{addr:02X} - {identity['name']} [provável, pelo endereço]")
+    else:
+        print("\nNenhum dispositivo I2C encontrado!")
+
+
+def scan_i2c_bus(bus_number=1, method=PROBE_READ_BYTE):
+    """Escaneia o barramento I2C e retorna todos os endereços de dispositivos encontrados"""
+    result = scan_bus(bus_number, method)
+    print_scan_result(result)
+    return result["devices"]
 
 def get_device_name(addr):
     """Retorna um nome provável para um dispositivo com base no endereço"""
@@ -82,19 +333,45 @@ def get_device_name(addr):
     
     return common_devices.get(addr, "Dispositivo desconhecido")
 
+def read_proc_modules(name="bmp280", path="/proc/modules"):
+    """
+    Procura um módulo do kernel carregado lendo /proc/modules diretamente
+
+    Args:
+        name (str): Prefixo do nome do módulo (ex.: 'bmp280' casa bmp280 e bmp280_i2c)
+        path (str): Caminho do arquivo de módulos
+
+    Returns:
+        list: Um dicionário por módulo encontrado (name, size, refcount, used_by, state)
+    """
+    modules = []
+    with open(path, 'r') as f:
+        for line in f:
+            fields = line.split()
+            if len(fields) < 5 or not fields[0].startswith(name):
+                continue
+            used_by = [m for m in fields[3].split(",") if m and m != "-"]
+            modules.append({
+                "name": fields[0],
+                "size": int(fields[1]),
+                "refcount": int(fields[2]),
+                "used_by": used_by,
+                "state": fields[4]
+            })
+    return modules
+
 def check_kernel_module():
     """Verifica se o módulo do kernel BMP280 está presente"""
     print("\nVerificando módulo do kernel BMP280...")
     
     # Verifica se o módulo está carregado - sem usar sudo
     try:
-        # Usa cat /proc/modules em vez de lsmod para evitar potenciais problemas de permissão
-        with os.popen("cat /proc/modules | grep bmp280") as f:
-            output = f.read().strip()
-            if output:
-                print(f"✅ Módulo do kernel BMP280 está carregado: {output}")
-            else:
-                print("⚠️ Módulo do kernel BMP280 não está carregado")
+        modules = read_proc_modules("bmp280")
+        if modules:
+            names = ", ".join(f"{m['name']} ({m['state']})" for m in modules)
+            print(f"✅ Módulo do kernel BMP280 está carregado: {names}")
+        else:
+            print("⚠️ Módulo do kernel BMP280 não está carregado")
     except Exception as e:
         print(f"Erro ao verificar módulo do kernel: {e}")
     
@@ -161,24 +438,75 @@ def suggest_next_steps():
     print("   • Verifique se há um endereço alternativo específico para sua placa")
     print("="*80)
 
-if __name__ == "__main__":
+def inventory(buses=None, method=PROBE_AUTO, bus_factory=None, cache=None):
+    """
+    Gera o inventário estruturado (usado pelo modo --json)
+
+    Args:
+        buses (list): Barramentos a escanear (padrão: todos os /dev/i2c-*)
+        method (str): Método de sondagem
+        bus_factory (callable): Construtor do barramento (padrão: smbus2.SMBus)
+        cache (FingerprintCache): Cache das identificações (padrão: cache do módulo)
+
+    Returns:
+        dict: Resultados de todos os barramentos e módulos do kernel carregados
+    """
+    try:
+        modules = read_proc_modules("bmp280")
+    except OSError:
+        modules = None
+    results = scan_all_buses(buses, method, bus_factory, cache=cache)
+    for result in results:
+        identities = result.pop("identities")
+        result["devices"] = [
+            dict({"address": addr}, **identities.get(addr, {"name": get_device_name(addr), "exact": False, "id": None}))
+            for addr in result["devices"]
+        ]
+    return {
+        "hostname": os.uname().nodename,
+        "timestamp": time.time(),
+        "buses": results,
+        "kernel_modules": modules
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Diagnóstico do barramento I2C e do sensor BMP280')
+    parser.add_argument('--bus', type=int, action='append', help='Barramento a escanear (pode repetir; padrão: todos)')
+    parser.add_argument('--method', choices=PROBE_METHODS, default=PROBE_AUTO, help='Método de sondagem')
+    parser.add_argument('--json', action='store_true', help='Imprimir o inventário em JSON e sair')
+    args = parser.parse_args()
+
+    if args.json:
+        print(json.dumps(inventory(args.bus, args.method), indent=2))
+        return 0
+
     print("\nDiagnóstico completo do sensor BMP280\n")
     
-    # Verifica permissões do dispositivo I2C
-    if os.path.exists("/dev/i2c-1"):
-        print(f"✅ Dispositivo I2C encontrado em /dev/i2c-1")
+    buses = args.bus or list_i2c_buses()
+    if not buses:
+        print("❌ Dispositivo I2C não encontrado")
+        return 1
+    
+    # Verifica permissões dos dispositivos I2C
+    for bus_number in buses:
+        path = f"/dev/i2c-{bus_number}"
+        if not os.path.exists(path):
+            print(f"❌ Dispositivo I2C não encontrado em {path}")
+            return 1
+        print(f"✅ Dispositivo I2C encontrado em {path}")
         try:
-            with open("/dev/i2c-1", "rb") as f:
+            with open(path, "rb") as f:
                 print("✅ Permissões de leitura OK para o dispositivo I2C")
         except PermissionError:
             print("❌ Sem permissões para acessar o dispositivo I2C")
-            sys.exit(1)
-    else:
-        print("❌ Dispositivo I2C não encontrado")
-        sys.exit(1)
+            return 1
     
-    # Escaneia o barramento I2C
-    found_devices = scan_i2c_bus()
+    # Escaneia todos os barramentos em paralelo
+    found_devices = []
+    for result in scan_all_buses(buses, args.method):
+        print()
+        print_scan_result(result)
+        found_devices += result["devices"]
     
     # Verifica módulo do kernel
     check_kernel_module()
@@ -197,3 +525,8 @@ if __name__ == "__main__":
         print("from i2c_module import BMP280Sensor")
         print("# Use o modo de simulação enquanto o hardware não estiver disponível")
         print("sensor = BMP280Sensor(simulation_mode=True)")
+    
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+import sys
+import time
+import queue
+import atexit
+import logging
+import threading
+import logging.handlers
+
+# Formato das mensagens no console
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Registros aguardando a thread de saída; com a fila cheia os novos são
+# descartados (e contados) em vez de bloquear quem registrou
+QUEUE_SIZE = 10000
+
+# Intervalo mínimo entre mensagens repetidas do mesmo ponto do código (s)
+RATE_LIMIT_INTERVAL = 10.0
+
+# Nível a partir do qual as mensagens repetidas são limitadas
+RATE_LIMIT_LEVEL = logging.WARNING
+
+# Configuração ativa (um QueueListener por processo)
+_listener = None
+_handler = None
+_lock = threading.Lock()
+
+
+class RateLimitFilter(logging.Filter):
+    def __init__(self, interval=RATE_LIMIT_INTERVAL, level=RATE_LIMIT_LEVEL):
+        """
+        Deduplica mensagens repetidas: registros com o mesmo logger, nível e
+        modelo de mensagem (o texto antes da formatação, ex.: "Erro ao ler
+        temperatura: %s") passam no máximo uma vez a cada 'interval'
+        segundos. Os suprimidos são contados e o próximo registro que passar
+        informa quantos foram omitidos.
+
+        Args:
+            interval (float): Intervalo mínimo entre registros repetidos (s)
+            level (int): Nível a partir do qual a limitação se aplica
+        """
+        super().__init__()
+        self.interval = interval
+        self.level = level
+        self.entries = {}       # chave -> [último registro emitido, suprimidos desde então, total suprimido]
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno < self.level:
+            return True
+        key = (record.name, record.levelno, record.pathname, record.lineno, str(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.entries[key] = [now, 0, 0]
+                return True
+            if now - entry[0] < self.interval:
+                entry[1] += 1
+                entry[2] += 1
+                return False
+            suppressed = entry[1]
+            entry[0], entry[1] = now, 0
+        if suppressed:
+            record.suppressed = suppressed
+            record.msg = f"{record.msg} [{suppressed} repetições omitidas em {self.interval:g} s]"
+        return True
+
+    def counters(self):
+        """
+        Returns:
+            dict: Modelo de mensagem -> total de registros suprimidos
+        """
+        with self._lock:
+            return {key[4]: entry[2] for key, entry in self.entries.items() if entry[2]}
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler que nunca bloqueia: a formatação fica para a thread de saída
+    (o registro vai para a fila com a mensagem e os argumentos separados) e,
+    com a fila cheia, o registro é descartado e contado
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Mesmo processo: não é preciso serializar o registro
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def configure_logging(level=logging.INFO, handlers=None, rate_limit=RATE_LIMIT_INTERVAL,
+                      queue_size=QUEUE_SIZE):
+    """
+    Configura o logging do processo com todos os handlers atrás de uma fila:
+    o logger raiz recebe apenas um NonBlockingQueueHandler (com a limitação
+    de repetições) e um QueueListener grava nos handlers reais em uma thread
+    de fundo. Chamadas repetidas só ajustam o nível.
+
+    Args:
+        level (int): Nível do logger raiz
+        handlers (list): Handlers de saída (padrão: console em stderr)
+        rate_limit (float): Intervalo da limitação de repetições (None desativa)
+        queue_size (int): Capacidade da fila
+
+    Returns:
+        logging.handlers.QueueListener: Listener em execução
+    """
+    global _listener, _handler
+    root = logging.getLogger()
+    root.setLevel(level)
+    with _lock:
+        if _listener is not None:
+            return _listener
+        if handlers is None:
+            console = logging.StreamHandler(sys.stderr)
+            console.setFormatter(logging.Formatter(LOG_FORMAT))
+            handlers = [console]
+        _handler = NonBlockingQueueHandler(queue.Queue(queue_size))
+        if rate_limit:
+            _handler.addFilter(RateLimitFilter(rate_limit))
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(_handler)
+        _listener = logging.handlers.QueueListener(_handler.queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+        return _listener
+
+
+def shutdown_logging():
+    """Esvazia a fila e para a thread de saída (registrada em atexit)"""
+    global _listener, _handler
+    with _lock:
+        listener, _listener = _listener, None
+        handler, _handler = _handler, None
+    if listener is not None:
+        listener.stop()
+        logging.getLogger().removeHandler(handler)
+
+
+def logging_stats():
+    """
+    Returns:
+        dict: dropped (descartados com a fila cheia), queued (aguardando
+        saída) e suppressed (repetições omitidas por modelo de mensagem)
+    """
+    handler = _handler
+    if handler is None:
+        return {"dropped": 0, "queued": 0, "suppressed": {}}
+    suppressed = {}
+    for log_filter in handler.filters:
+        if isinstance(log_filter, RateLimitFilter):
+            suppressed.update(log_filter.counters())
+    return {"dropped": handler.dropped, "queued": handler.queue.qsize(), "suppressed": suppressed}
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+import sys
+import json
+import argparse
+
+from i2c_scan import inventory, FingerprintCache, ID_REGISTERS, FINGERPRINT_TTL, PROBE_METHODS, PROBE_AUTO
+from fake_smbus import FakeSMBus, bosch_registers, mpu_registers, ds3231_registers
+
+# Barramento -> endereço -> (registradores, nome esperado, identificado pelo registrador)
+FAKE_BUSES = {
+    1: {
+        0x76: (bosch_registers(0x58), "BMP280 (Sensor de Pressão/Temperatura)", True),
+        0x68: (mpu_registers(0x68), "MPU6050 (IMU)", True),
+        0x42: ({}, "Dispositivo desconhecido", False)
+    },
+    3: {
+        0x77: (bosch_registers(0x60), "BME280 (Sensor de Pressão/Temperatura/Umidade)", True),
+        0x69: (mpu_registers(0x71), "MPU9250 (IMU)", True),
+        0x68: (ds3231_registers(), "DS3231 (RTC)", False),
+        0x3C: ({}, "SSD1306 (Display OLED)", False)
+    }
+}
+
+# Barramento sem dispositivo em /dev (deve aparecer com erro no inventário)
+MISSING_BUS = 5
+
+
+class FakeBuses:
+    def __init__(self, layout=FAKE_BUSES):
+        """
+        Fábrica de FakeSMBus para scan_bus: cada abertura cria um barramento
+        novo sobre os mesmos registradores e soma as transações por barramento
+        """
+        self.registers = {bus: {addr: dict(spec[0]) for addr, spec in devices.items()}
+                          for bus, devices in layout.items()}
+        self.opened = []
+
+    def __call__(self, bus_number):
+        if bus_number not in self.registers:
+            raise FileNotFoundError(f"/dev/i2c-{bus_number}")
+        bus = FakeSMBus(bus_number, self.registers[bus_number])
+        self.opened.append(bus)
+        return bus
+
+    def collect(self):
+        """Transações dos barramentos abertos desde a última chamada"""
+        counts = {bus: 0 for bus in self.registers}
+        for bus in self.opened:
+            counts[bus.bus_number] += bus.transactions
+        self.opened = []
+        return counts
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _check_inventory(report, layout):
+    """Confere o inventário (já em JSON) com os dispositivos falsos"""
+    buses = {result["bus"]: result for result in report["buses"]}
+    assert sorted(buses) == sorted(list(layout) + [MISSING_BUS]), sorted(buses)
+    assert buses[MISSING_BUS]["error"] and not buses[MISSING_BUS]["devices"]
+    for bus_number, devices in layout.items():
+        result = buses[bus_number]
+        assert result["error"] is None, result["error"]
+        found = {device["address"]: device for device in result["devices"]}
+        assert sorted(found) == sorted(devices), (bus_number, sorted(found))
+        for addr, (_, name, exact) in devices.items():
+            device = found[addr]
+            assert device["name"] == name, (bus_number, hex(addr), device["name"])
+            assert device["exact"] is exact, (bus_number, hex(addr), device)
+
+
+def run(method=PROBE_AUTO, ttl=FINGERPRINT_TTL):
+    """
+    Executa o inventário do diagnóstico sobre barramentos FakeSMBus com BMP280,
+    BME280, MPU (WHO_AM_I), DS3231 e dispositivos desconhecidos e confere as
+    identificações e o uso do cache dentro e fora da validade
+
+    Returns:
+        dict: Transações por barramento em cada passada
+    """
+    factory = FakeBuses()
+    clock = FakeClock()
+    cache = FingerprintCache(ttl, clock)
+    buses = sorted(list(FAKE_BUSES) + [MISSING_BUS])
+
+    def scan():
+        report = json.loads(json.dumps(inventory(buses, method, factory, cache)))
+        _check_inventory(report, FAKE_BUSES)
+        return factory.collect()
+
+    first = scan()
+
+    # Dentro da validade: nenhuma leitura de identificação, mesmo com o chip trocado
+    factory.registers[1][0x76][0xD0] = 0x60
+    clock.now = ttl * 0.5
+    cached = scan()
+    factory.registers[1][0x76][0xD0] = 0x58
+    for bus_number, devices in FAKE_BUSES.items():
+        id_reads = sum(1 for addr in devices if addr in ID_REGISTERS)
+        assert cached[bus_number] == first[bus_number] - id_reads, (bus_number, cached, first)
+
+    # Vencida a validade, os registradores de identificação voltam a ser lidos
+    clock.now = ttl * 1.5
+    expired = scan()
+    assert expired == first, (expired, first)
+
+    return {"first": first, "cached": cached, "expired": expired}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Verificação do diagnóstico I2C com barramentos SMBus falsos')
+    parser.add_argument('--method', choices=PROBE_METHODS, default=PROBE_AUTO, help='Método de sondagem')
+    args = parser.parse_args()
+
+    result = run(args.method)
+    for bus_number in FAKE_BUSES:
+        print(f"I2C-{bus_number}: {len(FAKE_BUSES[bus_number])} dispositivos identificados | transações: "
+              f"{result['first'][bus_number]} na primeira passada, {result['cached'][bus_number]} com o cache, "
+              f"{result['expired'][bus_number]} após a validade")
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
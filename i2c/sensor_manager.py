@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+import glob
+import os
+import re
+import sys
+import time
+import logging
+
+from i2c_module import BMP280Sensor, I2C_LIBRARIES_AVAILABLE, configure_logging
+from i2c_scan import list_i2c_buses
+from simulation import BMP280Simulator
+
+logger = logging.getLogger("BMP280_Manager")
+
+if I2C_LIBRARIES_AVAILABLE:
+    import smbus2
+
+# Endereços possíveis do BMP280/BME280 e valores do registrador de identificação (0xD0)
+BMP280_ADDRESSES = (0x76, 0x77)
+CHIP_ID_REGISTER = 0xD0
+CHIP_IDS = {
+    0x58: "BMP280",
+    0x60: "BME280"
+}
+
+# Nomes reportados pelo driver do kernel em /sys/bus/iio/devices/iio:deviceN/name
+IIO_DEVICE_NAMES = ("bmp280", "bme280")
+IIO_DEVICES_DIR = "/sys/bus/iio/devices"
+
+
+def _iio_bus_address(device_dir):
+    """
+    Descobre barramento e endereço I2C de um dispositivo IIO a partir do link
+    'device' do sysfs (ex.: .../i2c-1/1-0076)
+
+    Returns:
+        tuple: (barramento, endereço) ou (None, None) se não for um dispositivo I2C
+    """
+    try:
+        parent = os.path.basename(os.path.realpath(os.path.join(device_dir, "device")))
+    except OSError:
+        return None, None
+    match = re.match(r"^(\d+)-([0-9a-fA-F]{4})$", parent)
+    if not match:
+        return None, None
+    return int(match.group(1)), int(match.group(2), 16)
+
+
+def list_iio_sensors(iio_dir=IIO_DEVICES_DIR):
+    """
+    Enumera os sensores BMP280/BME280 expostos pelo módulo do kernel
+
+    Returns:
+        list: Lista de dicionários com 'path', 'chip', 'bus' e 'address'
+    """
+    sensors = []
+    for device_dir in sorted(glob.glob(os.path.join(iio_dir, "iio:device*"))):
+        try:
+            with open(os.path.join(device_dir, "name"), 'r') as f:
+                name = f.read().strip().lower()
+        except OSError:
+            continue
+        if not name.startswith(IIO_DEVICE_NAMES):
+            continue
+        if not os.path.exists(os.path.join(device_dir, "in_temp_input")):
+            continue
+        bus, address = _iio_bus_address(device_dir)
+        sensors.append({
+            "path": device_dir,
+            "chip": name.upper(),
+            "bus": bus,
+            "address": address
+        })
+    return sensors
+
+
+class BMP280Manager:
+    def __init__(self, use_kernel_module=True, use_i2c=True, simulation_count=0, simulation_seed=None):
+        """
+        Gerencia vários sensores BMP280/BME280 espalhados por barramentos e endereços.
+
+        Args:
+            use_kernel_module (bool): Se True, inclui os sensores expostos via IIO
+            use_i2c (bool): Se True, procura sensores nos barramentos /dev/i2c-*
+            simulation_count (int): Número de sensores simulados a criar quando
+                                    nenhum hardware for encontrado
+            simulation_seed (int): Semente das séries dos sensores simulados
+                                   (o sensor i usa seed + i; None mantém a
+                                   simulação aleatória do BMP280Sensor)
+        """
+        self.use_kernel_module = use_kernel_module
+        self.use_i2c = use_i2c and I2C_LIBRARIES_AVAILABLE
+        self.simulation_count = simulation_count
+        self.simulation_seed = simulation_seed
+        self.sensors = {}   # id -> BMP280Sensor
+        self.info = {}      # id -> metadados da descoberta
+        self.buses = {}     # número do barramento -> SMBus compartilhado
+        self.sweep_count = 0
+
+    def discover(self):
+        """
+        Enumera todos os sensores disponíveis. Sensores já ligados ao driver do
+        kernel não são sondados novamente via I2C direto.
+
+        Returns:
+            list: Identificadores dos sensores encontrados
+        """
+        claimed = set()
+
+        if self.use_kernel_module:
+            for entry in list_iio_sensors():
+                sensor_id = os.path.basename(entry["path"])
+                try:
+                    sensor = BMP280Sensor(use_kernel_module=True, device_path=entry["path"])
+                except Exception as e:
+                    logger.error("Erro ao inicializar %s: %s", sensor_id, e)
+                    continue
+                if sensor.simulation_mode:
+                    continue
+                self._add(sensor_id, sensor, "kernel", entry["chip"], entry["bus"], entry["address"])
+                if entry["bus"] is not None:
+                    claimed.add((entry["bus"], entry["address"]))
+
+        if self.use_i2c:
+            for bus_number in list_i2c_buses():
+                for address in BMP280_ADDRESSES:
+                    if (bus_number, address) in claimed:
+                        continue
+                    chip = self._probe(bus_number, address)
+                    if chip is None:
+                        continue
+                    sensor_id = f"i2c-{bus_number}-0x{address:02x}"
+                    sensor = BMP280Sensor(use_kernel_module=False, i2c_addr=address,
+                                          i2c_bus=bus_number, bus=self.buses[bus_number])
+                    if sensor.simulation_mode or sensor.use_kernel_module:
+                        continue
+                    self._add(sensor_id, sensor, "i2c", chip, bus_number, address)
+
+        if not self.sensors:
+            for i in range(self.simulation_count):
+                simulator = None
+                if self.simulation_seed is not None:
+                    simulator = BMP280Simulator(seed=self.simulation_seed + i)
+                self._add(f"sim-{i}", BMP280Sensor(simulation_mode=True, simulator=simulator),
+                          "simulation", "BMP280", None, None)
+
+        self._close_unused_buses()
+        logger.info("%d sensores BMP280/BME280 encontrados", len(self.sensors))
+        return list(self.sensors)
+
+    def _add(self, sensor_id, sensor, mode, chip, bus, address):
+        self.sensors[sensor_id] = sensor
+        self.info[sensor_id] = {
+            "mode": mode,
+            "chip": chip,
+            "bus": bus,
+            "address": address
+        }
+        logger.info("Sensor %s (%s) adicionado no modo %s", sensor_id, chip, mode)
+
+    def _get_bus(self, bus_number):
+        """Abre (uma única vez) o handle SMBus de um barramento"""
+        if bus_number not in self.buses:
+            self.buses[bus_number] = smbus2.SMBus(bus_number)
+        return self.buses[bus_number]
+
+    def _probe(self, bus_number, address):
+        """
+        Lê o registrador de identificação para confirmar que há um BMP280/BME280
+
+        Returns:
+            str: Nome do chip ou None se não houver sensor compatível
+        """
+        try:
+            bus = self._get_bus(bus_number)
+            chip_id = bus.read_byte_data(address, CHIP_ID_REGISTER)
+        except OSError:
+            return None
+        return CHIP_IDS.get(chip_id)
+
+    def _close_unused_buses(self):
+        """Fecha os barramentos que não ficaram com nenhum sensor associado"""
+        used = {info["bus"] for info in self.info.values() if info["mode"] == "i2c"}
+        for bus_number in list(self.buses):
+            if bus_number not in used:
+                self.buses.pop(bus_number).close()
+
+    def sample_all(self):
+        """
+        Lê todos os sensores em uma única varredura, agrupados por barramento
+
+        Returns:
+            list: Um dicionário por sensor com id, temperatura, pressão e timestamp
+        """
+        order = sorted(self.sensors, key=lambda s: (self.info[s]["bus"] is None,
+                                                    self.info[s]["bus"] or 0, s))
+        samples = []
+        for sensor_id in order:
+            data = self.sensors[sensor_id].read_all()
+            samples.append({
+                "id": sensor_id,
+                "temperature": data["temperature"],
+                "pressure": data["pressure"],
+                "timestamp": time.time()
+            })
+        self.sweep_count += 1
+        return samples
+
+    def run(self, interval, callback, count=None):
+        """
+        Executa varreduras periódicas com prazos fixos (sem acumular atraso)
+
+        Args:
+            interval (float): Período entre varreduras em segundos
+            callback (callable): Função chamada com a lista de amostras de cada varredura
+            count (int): Número de varreduras (None para executar indefinidamente)
+        """
+        next_deadline = time.monotonic()
+        done = 0
+        while count is None or done < count:
+            callback(self.sample_all())
+            done += 1
+            next_deadline += interval
+            delay = next_deadline - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                # Varredura atrasou mais que um período: reagenda a partir de agora
+                next_deadline = time.monotonic()
+
+    def close(self):
+        """Fecha todos os sensores e os barramentos compartilhados"""
+        for sensor in self.sensors.values():
+            sensor.close()
+        for bus in self.buses.values():
+            try:
+                bus.close()
+            except Exception as e:
+                logger.error("Erro ao fechar barramento I2C: %s", e)
+        self.buses = {}
+
+
+# Exemplo de uso do módulo
+if __name__ == "__main__":
+    configure_logging()
+    simulate = "--simulate" in sys.argv or "-s" in sys.argv
+    # Séries simuladas reproduzíveis: --seed N
+    seed = int(sys.argv[sys.argv.index("--seed") + 1]) if "--seed" in sys.argv[:-1] else None
+    manager = BMP280Manager(use_kernel_module=not simulate, use_i2c=not simulate,
+                            simulation_count=3 if simulate else 0, simulation_seed=seed)
+    manager.discover()
+
+    def print_sweep(samples):
+        line = " | ".join(f"{s['id']}: {s['temperature']:.2f}°C {s['pressure']:.2f} hPa" for s in samples)
+        print(line)
+
+    try:
+        manager.run(1.0, print_sweep, count=5)
+    except KeyboardInterrupt:
+        print("\nLeitura interrompida pelo usuário")
+    finally:
+        manager.close()
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+import sys
+import math
+import time
+import random
+import argparse
+
+# numpy é opcional: sem ele as séries são geradas amostra a amostra em listas
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Intervalo entre amostras simuladas (s), o mesmo do modo de simulação do BMP280Sensor
+SAMPLE_PERIOD = 0.1
+
+# Valores iniciais
+TEMPERATURE_START = 25.0
+PRESSURE_START = 1013.25
+
+# A deriva da temperatura inverte o sentido nos limites da faixa (°C)
+TEMPERATURE_RANGE = (15.0, 30.0)
+PRESSURE_RANGE = (990.0, 1030.0)
+
+# Deriva da temperatura (°C/s)
+TEMPERATURE_DRIFT = 0.01
+
+# Desvio padrão do passeio aleatório por amostra (°C e hPa)
+TEMPERATURE_NOISE = 0.03
+PRESSURE_NOISE = 0.06
+
+# Queda da pressão por grau de aumento da temperatura (hPa/°C)
+PRESSURE_COUPLING = 2.0
+
+# Amostras geradas por bloco ao consultar ou reproduzir a série
+CHUNK_SIZE = 65536
+
+
+def _fold(values, low, high):
+    """Reflete os valores para dentro de [low, high] (o passeio 'quica' nos limites)"""
+    span = high - low
+    if NUMPY_AVAILABLE and not isinstance(values, float):
+        offset = np.mod(values - low, 2 * span)
+        return low + np.where(offset > span, 2 * span - offset, offset)
+    offset = math.fmod(values - low, 2 * span)
+    if offset < 0:
+        offset += 2 * span
+    return low + (2 * span - offset if offset > span else offset)
+
+
+class BMP280Simulator:
+    def __init__(self, seed=None, period=SAMPLE_PERIOD, start=None,
+                 temperature=TEMPERATURE_START, pressure=PRESSURE_START,
+                 temperature_range=TEMPERATURE_RANGE, pressure_range=PRESSURE_RANGE,
+                 drift=TEMPERATURE_DRIFT, temperature_noise=TEMPERATURE_NOISE,
+                 pressure_noise=PRESSURE_NOISE, coupling=PRESSURE_COUPLING):
+        """
+        Gerador de séries de temperatura e pressão do BMP280 com semente.
+
+        A temperatura é um passeio aleatório com deriva que reflete nos limites
+        da faixa; a pressão é um passeio aleatório próprio menos 'coupling'
+        vezes a variação da temperatura, refletido na sua faixa. Como a
+        reflexão não depende do caminho, cada bloco é gerado de uma vez com
+        somas acumuladas (numpy) e os blocos seguintes continuam a série.
+
+        A mesma semente reproduz a mesma série; as séries com e sem numpy
+        seguem o mesmo modelo, mas não são idênticas.
+
+        Args:
+            seed (int): Semente do gerador (None para uma série diferente a cada vez)
+            period (float): Intervalo entre amostras (s)
+            start (float): Instante da primeira amostra (padrão: time.time())
+            temperature (float): Temperatura inicial (°C)
+            pressure (float): Pressão inicial (hPa)
+            temperature_range (tuple): Faixa da temperatura (°C)
+            pressure_range (tuple): Faixa da pressão (hPa)
+            drift (float): Deriva da temperatura (°C/s)
+            temperature_noise (float): Desvio padrão do passo da temperatura (°C)
+            pressure_noise (float): Desvio padrão do passo da pressão (hPa)
+            coupling (float): Queda da pressão por °C de aumento da temperatura
+        """
+        self.seed = seed
+        self.period = period
+        self.start = time.time() if start is None else start
+        self.temperature_start = temperature
+        self.temperature_range = temperature_range
+        self.pressure_range = pressure_range
+        self.drift = drift
+        self.temperature_noise = temperature_noise
+        self.pressure_noise = pressure_noise
+        self.coupling = coupling
+        self.rng = np.random.default_rng(seed) if NUMPY_AVAILABLE else random.Random(seed)
+
+        # Estado no fim da série gerada: índice da próxima amostra, temperatura
+        # antes da reflexão e passeio da pressão
+        self.index = 0
+        self._temperature = temperature
+        self._pressure = pressure
+
+        # Bloco usado por sample_at()
+        self._block = None
+        self._block_index = 0
+
+    def generate(self, count):
+        """
+        Gera as próximas 'count' amostras da série
+
+        Returns:
+            dict: 'timestamp', 'temperature' e 'pressure' (arrays numpy, ou
+            listas sem numpy)
+        """
+        if NUMPY_AVAILABLE:
+            return self._generate_numpy(count)
+        return self._generate_python(count)
+
+    def _generate_numpy(self, count):
+        # Dois sorteios por amostra, na ordem das amostras: a série não depende
+        # do tamanho dos blocos
+        noise = self.rng.standard_normal((count, 2))
+        unfolded = self._temperature + np.cumsum(self.drift * self.period + self.temperature_noise * noise[:, 0])
+        walk = self._pressure + np.cumsum(self.pressure_noise * noise[:, 1])
+        temperature = _fold(unfolded, *self.temperature_range)
+        pressure = _fold(walk - self.coupling * (temperature - self.temperature_start), *self.pressure_range)
+        timestamps = self.start + (self.index + np.arange(1, count + 1)) * self.period
+        if count:
+            self._temperature = float(unfolded[-1])
+            self._pressure = float(walk[-1])
+        self.index += count
+        return {"timestamp": timestamps, "temperature": temperature, "pressure": pressure}
+
+    def _generate_python(self, count):
+        gauss = self.rng.gauss
+        step = self.drift * self.period
+        timestamps, temperatures, pressures = [], [], []
+        unfolded, walk = self._temperature, self._pressure
+        for i in range(count):
+            unfolded += gauss(step, self.temperature_noise)
+            walk += gauss(0.0, self.pressure_noise)
+            temperature = _fold(unfolded, *self.temperature_range)
+            temperatures.append(temperature)
+            pressures.append(_fold(walk - self.coupling * (temperature - self.temperature_start),
+                                   *self.pressure_range))
+            timestamps.append(self.start + (self.index + i + 1) * self.period)
+        self._temperature, self._pressure = unfolded, walk
+        self.index += count
+        return {"timestamp": timestamps, "temperature": temperatures, "pressure": pressures}
+
+    def series(self, duration):
+        """Gera as amostras dos próximos 'duration' segundos"""
+        return self.generate(int(round(duration / self.period)))
+
+    def chunks(self, count, size=CHUNK_SIZE):
+        """Gera 'count' amostras em blocos de até 'size' (memória limitada)"""
+        while count > 0:
+            block = self.generate(min(size, count))
+            count -= len(block["timestamp"])
+            yield block
+
+    def sample_at(self, timestamp):
+        """
+        Amostra vigente no instante 'timestamp' (a última gerada até ele), no
+        formato de BMP280Sensor.read_all(). Os instantes consultados não podem
+        voltar antes do bloco atual.
+
+        Returns:
+            dict: timestamp, temperature e pressure
+        """
+        index = max(0, int(math.floor((timestamp - self.start) / self.period)) - 1)
+        if self._block is None:
+            self._block_index = self.index
+            self._block = self._to_lists(self.generate(CHUNK_SIZE))
+        while index >= self._block_index + len(self._block["timestamp"]):
+            # Avança bloco a bloco até o instante pedido (só o último fica guardado)
+            self._block_index = self.index
+            self._block = self._to_lists(self.generate(CHUNK_SIZE))
+        offset = max(0, index - self._block_index)
+        return {field: values[offset] for field, values in self._block.items()}
+
+    @staticmethod
+    def _to_lists(block):
+        if NUMPY_AVAILABLE:
+            return {field: values.tolist() for field, values in block.items()}
+        return block
+
+
+class VirtualClock:
+    def __init__(self, speed=1.0, start=0.0):
+        """
+        Relógio que avança 'speed' vezes mais rápido que o relógio do sistema,
+        a partir de 'start' (ex.: o início da série do simulador)
+        """
+        self.speed = speed
+        self.start = start
+        self.origin = time.perf_counter()
+
+    def time(self):
+        return self.start + (time.perf_counter() - self.origin) * self.speed
+
+    def sleep(self, seconds):
+        time.sleep(seconds / self.speed)
+
+
+class Playback:
+    def __init__(self, simulator, speed=None):
+        """
+        Reproduz a série do simulador para consumidores (ex.:
+        ReadingAggregator.add) em um relógio virtual
+
+        Args:
+            simulator (BMP280Simulator): Gerador da série
+            speed (float): Aceleração em relação ao tempo real (None para
+                entregar as amostras o mais rápido possível)
+        """
+        self.simulator = simulator
+        self.speed = speed
+        self.clock = None
+        self.now = simulator.start + simulator.index * simulator.period
+
+    def time(self):
+        """Instante virtual da reprodução (o da última amostra entregue, sem 'speed')"""
+        return self.clock.time() if self.clock else self.now
+
+    def run(self, sinks=(), count=None, duration=None, chunk_sinks=()):
+        """
+        Entrega as amostras em ordem, uma por vez aos 'sinks' e em blocos
+        (arrays) aos 'chunk_sinks'. Com 'speed', cada amostra é entregue
+        quando o relógio virtual passa pelo seu instante.
+
+        Args:
+            sinks (list): Funções chamadas com cada amostra (dict)
+            count (int): Número de amostras
+            duration (float): Duração virtual (alternativa a 'count')
+
+        Returns:
+            dict: samples, virtual_s, wall_s, samples_per_s e max_lag_s
+            (maior atraso de entrega em tempo virtual)
+        """
+        simulator = self.simulator
+        if count is None:
+            count = int(round(duration / simulator.period))
+        if self.speed:
+            self.clock = VirtualClock(self.speed, self.now)
+        max_lag = 0.0
+        wall_start = time.perf_counter()
+        for block in simulator.chunks(count):
+            for sink in chunk_sinks:
+                sink(block)
+            self.now = float(block["timestamp"][-1])
+            if not sinks and not self.clock:
+                continue
+            lists = simulator._to_lists(block)
+            temperatures, pressures = lists["temperature"], lists["pressure"]
+            for i, timestamp in enumerate(lists["timestamp"]):
+                if self.clock:
+                    ahead = timestamp - self.clock.time()
+                    if ahead > 0:
+                        self.clock.sleep(ahead)
+                    else:
+                        max_lag = max(max_lag, -ahead)
+                sample = {"timestamp": timestamp, "temperature": temperatures[i], "pressure": pressures[i]}
+                for sink in sinks:
+                    sink(sample)
+        wall = time.perf_counter() - wall_start
+        return {
+            "samples": count,
+            "virtual_s": count * simulator.period,
+            "wall_s": wall,
+            "samples_per_s": count / wall if wall > 0 else 0.0,
+            "max_lag_s": max_lag,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Séries simuladas do BMP280 para testes de carga')
+    parser.add_argument('--samples', type=int, default=1000000, help='Número de amostras')
+    parser.add_argument('--seed', type=int, default=0, help='Semente do gerador')
+    parser.add_argument('--speed', type=float, help='Aceleração da reprodução (padrão: o mais rápido possível)')
+    parser.add_argument('--aggregate', action='store_true', help='Reproduzir as amostras no ReadingAggregator')
+    parser.add_argument('--csv', metavar='ARQUIVO', help='Gravar a série gerada em CSV')
+    args = parser.parse_args()
+
+    simulator = BMP280Simulator(seed=args.seed, start=0.0)
+    started = time.perf_counter()
+    block = simulator.generate(args.samples)
+    elapsed = time.perf_counter() - started
+    temperatures = block["temperature"]
+    print(f"{args.samples} amostras geradas em {elapsed * 1e3:.1f} ms "
+          f"({args.samples / elapsed:,.0f} amostras/s, numpy: {'sim' if NUMPY_AVAILABLE else 'não'})")
+    print(f"Temperatura: {min(temperatures):.2f} a {max(temperatures):.2f} °C | "
+          f"Pressão: {min(block['pressure']):.2f} a {max(block['pressure']):.2f} hPa | "
+          f"{args.samples * simulator.period / 3600:.1f} h simuladas")
+
+    if args.csv:
+        lists = simulator._to_lists(block)
+        with open(args.csv, "w") as f:
+            f.write("timestamp,temperature,pressure\n")
+            for row in zip(lists["timestamp"], lists["temperature"], lists["pressure"]):
+                f.write("{:.1f},{:.4f},{:.4f}\n".format(*row))
+        print(f"Série gravada em {args.csv}")
+
+    if args.aggregate or args.speed:
+        from aggregator import ReadingAggregator
+        aggregator = ReadingAggregator()
+        playback = Playback(BMP280Simulator(seed=args.seed, start=0.0), speed=args.speed)
+        result = playback.run([aggregator.add] if args.aggregate else [], count=args.samples)
+        print(f"Reprodução: {result['samples']} amostras ({result['virtual_s']:.0f} s virtuais) em "
+              f"{result['wall_s']:.2f} s ({result['samples_per_s']:,.0f} amostras/s, "
+              f"atraso máximo {result['max_lag_s']:.3f} s virtuais)")
+        if args.aggregate:
+            stats = aggregator.stats("1h")["temperature"]
+            print(f"Última hora: {stats['count']} amostras, média {stats['mean']:.2f} °C, "
+                  f"desvio {stats['stddev']:.3f} °C")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 import time
 import argparse
-from i2c_module import BMP280Sensor
+from i2c_module import BMP280Sensor, configure_logging
+from aggregator import ReadingAggregator, CSVSink
 
 def main():
     parser = argparse.ArgumentParser(description='Teste do sensor BMP280 para Trabalho 2')
@@ -10,7 +11,10 @@ def main():
     parser.add_argument('--simulate', action='store_true', help='Usar modo de simulação')
     parser.add_argument('--count', type=int, default=20, help='Número de leituras')
     parser.add_argument('--interval', type=float, default=0.5, help='Intervalo entre leituras (s)')
+    parser.add_argument('--quiet', action='store_true', help='Não imprimir cada leitura, apenas o resumo')
+    parser.add_argument('--downsample-csv', metavar='ARQUIVO', help='Gravar série reduzida (1 min) em CSV')
     args = parser.parse_args()
+    configure_logging()
     
     print("\n=== Teste do Sensor BMP280 para o Trabalho 2 ===\n")
     
@@ -49,25 +53,50 @@ def main():
                 print("Caindo para modo de simulação...")
                 sensor = BMP280Sensor(simulation_mode=True)
     
+    # Agregador com janelas móveis e série reduzida opcional
+    csv_sink = CSVSink(args.downsample_csv) if args.downsample_csv else None
+    aggregator = ReadingAggregator(sinks=[csv_sink] if csv_sink else None)
+    
     # Cabeçalho da tabela
-    print("\n{:<4} | {:<12} | {:<12}".format("Nº", "Temperatura", "Pressão"))
-    print("-" * 33)
+    if not args.quiet:
+        print("\n{:<4} | {:<12} | {:<12}".format("Nº", "Temperatura", "Pressão"))
+        print("-" * 33)
     
     # Realiza leituras
     try:
         for i in range(args.count):
             temp = sensor.read_temperature()
             pressure = sensor.read_pressure()
-            print("{:<4} | {:<12} | {:<12}".format(
-                i+1, 
-                f"{temp:.2f}°C", 
-                f"{pressure:.2f} hPa"
-            ))
+            aggregator.add({"temperature": temp, "pressure": pressure})
+            if not args.quiet:
+                print("{:<4} | {:<12} | {:<12}".format(
+                    i+1, 
+                    f"{temp:.2f}°C", 
+                    f"{pressure:.2f} hPa"
+                ))
             time.sleep(args.interval)
     except KeyboardInterrupt:
         print("\nLeitura interrompida pelo usuário")
     finally:
         sensor.close()
+        aggregator.flush()
+        if csv_sink:
+            csv_sink.close()
+    
+    # Resumo das janelas móveis
+    print("\n{:<6} | {:<8} | {:<28} | {:<28}".format("Janela", "Amostras", "Temperatura (mín/méd/máx)", "Pressão (mín/méd/máx)"))
+    print("-" * 78)
+    for window in aggregator.windows:
+        stats = aggregator.stats(window)
+        t, p = stats["temperature"], stats["pressure"]
+        if not t["count"]:
+            continue
+        print("{:<6} | {:<8} | {:<28} | {:<28}".format(
+            window,
+            t["count"],
+            f"{t['min']:.2f}/{t['mean']:.2f}/{t['max']:.2f} ±{t['stddev']:.2f}",
+            f"{p['min']:.2f}/{p['mean']:.2f}/{p['max']:.2f} ±{p['stddev']:.2f}"
+        ))
     
     print("\n=== Usando o BMP280 no projeto ===")
     print("Para integrar o sensor no projeto principal:")
@@ -0,0 +1,298 @@
+# autotune.py
+import os
+import sys
+import json
+import math
+import argparse
+
+from controle import clock
+from controle.hardware import default_hardware
+
+# Arquivo padrão dos ganhos ajustados (carregado na inicialização pelo main.py)
+GAINS_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "pid_gains.json")
+
+# Parâmetros do experimento de relé
+RELAY_AMPLITUDE = 40.0   # Duty cycle aplicado pelo relé (%)
+RELAY_HYSTERESIS = 2     # Histerese do relé (unidades do encoder)
+RELAY_CYCLES = 6         # Ciclos medidos (após descartar o primeiro)
+RELAY_TIMEOUT = 30.0     # Tempo máximo do experimento (s)
+
+# Regras de Ziegler-Nichols: kp = a*Ku, Ti = b*Pu, Td = c*Pu (Ti None = sem integral).
+# O eixo já é integrador (posição), então a regra PD é a padrão
+TUNING_RULES = {
+    'pd': (0.8, None, 0.125),
+    'classic': (0.6, 0.5, 0.125),
+    'some_overshoot': (0.33, 0.5, 0.33),
+    'no_overshoot': (0.2, 0.5, 0.33)
+}
+
+# Critério de acomodação usado para medir a melhoria
+SETTLE_TOLERANCE = 5     # unidades do encoder (mesma tolerância de is_position_reached)
+SETTLE_SPEED = 1.0       # unidades/s
+SETTLE_HOLD = 0.2        # tempo que o eixo precisa ficar parado dentro da tolerância (s)
+SETTLE_TIMEOUT = 10.0    # s
+TEST_DISTANCE = 200      # deslocamento do movimento de teste (unidades do encoder)
+
+AXIS_INDEX = {'x': 0, 'y': 1}
+
+
+def _stop_axis(motors, axis):
+    motors.set_speed(axis, 0)
+    motors.set_direction(axis, 0)
+
+
+def _wait_applied(controller, future, wait):
+    """Aguarda o loop de controle aplicar um comando enfileirado"""
+    while not future.done():
+        wait(controller.control_period)
+    return future
+
+
+def relay_experiment(axis, amplitude=RELAY_AMPLITUDE, hysteresis=RELAY_HYSTERESIS,
+                     cycles=RELAY_CYCLES, period=0.01, timeout=RELAY_TIMEOUT, wait=None, hardware=None):
+    """
+    Experimento de realimentação por relé em torno da posição atual de um eixo.
+
+    O controlador deve estar em modo manual (o PID não atua) durante o ensaio.
+
+    Args:
+        axis (str): 'x' ou 'y'
+        amplitude (float): Duty cycle do relé (%)
+        hysteresis (float): Histerese do relé em unidades do encoder
+        cycles (int): Número de ciclos de oscilação medidos
+        period (float): Período de amostragem (s)
+        timeout (float): Tempo máximo do ensaio (s)
+        wait (callable): Função que aguarda um período (padrão: clock.sleep)
+        hardware (HardwareContext): Pórtico do ensaio (padrão: o pórtico padrão)
+
+    Returns:
+        dict: ku (ganho crítico), pu (período crítico, s) e amplitude da oscilação
+    """
+    wait = wait or clock.sleep
+    hardware = hardware if hardware is not None else default_hardware
+    motors = hardware.motors
+    index = AXIS_INDEX[axis]
+    center = hardware.get_position()[index]
+    output = amplitude
+    rising = []             # instantes em que o relé passou para +amplitude
+    highs, lows = [], []    # extremos de posição em cada meio ciclo
+    extreme = center
+    start = clock.monotonic()
+
+    try:
+        while len(rising) < cycles + 2:
+            now = clock.monotonic()
+            if now - start > timeout:
+                raise RuntimeError(f"Ensaio de relé do eixo {axis} não oscilou em {timeout:.0f} s")
+            limits = hardware.read_limit_switches()
+            if limits[f'{axis}_min'] or limits[f'{axis}_max']:
+                raise RuntimeError(f"Fim de curso atingido no ensaio de relé do eixo {axis}")
+
+            position = hardware.get_position()[index]
+            error = center - position
+            if output > 0:
+                extreme = max(extreme, position)
+                if error < -hysteresis:
+                    highs.append(extreme)
+                    output, extreme = -amplitude, position
+            else:
+                extreme = min(extreme, position)
+                if error > hysteresis:
+                    lows.append(extreme)
+                    rising.append(now)
+                    output, extreme = amplitude, position
+
+            motors.set_direction(axis, 1 if output > 0 else -1)
+            motors.set_speed(axis, abs(output))
+            wait(period)
+    finally:
+        _stop_axis(motors, axis)
+
+    # Descarta o primeiro ciclo (transitório de partida)
+    periods = [b - a for a, b in zip(rising[1:], rising[2:])]
+    pu = sum(periods) / len(periods)
+    a = (sum(highs[1:]) / len(highs[1:]) - sum(lows[1:]) / len(lows[1:])) / 2.0
+    if a <= 0:
+        raise RuntimeError(f"Ensaio de relé do eixo {axis} sem amplitude de oscilação mensurável")
+    # Função descritiva do relé com histerese
+    effective = math.sqrt(a * a - hysteresis * hysteresis) if a > hysteresis else a
+    ku = 4.0 * amplitude / (math.pi * effective)
+    return {"ku": ku, "pu": pu, "amplitude": a}
+
+
+def ziegler_nichols(ku, pu, rule='pd'):
+    """
+    Calcula os ganhos PID a partir do ganho e período críticos
+
+    Returns:
+        tuple: (kp, ki, kd) no formato usado por PIDController
+    """
+    a, b, c = TUNING_RULES[rule]
+    kp = a * ku
+    td = c * pu
+    ki = kp / (b * pu) if b is not None else 0.0
+    return kp, ki, kp * td
+
+
+def measure_settle(controller, axis, distance=TEST_DISTANCE, wait=None,
+                   tolerance=SETTLE_TOLERANCE, hold=SETTLE_HOLD, timeout=SETTLE_TIMEOUT):
+    """
+    Mede o tempo de acomodação de um movimento de 'distance' unidades em um eixo
+
+    Returns:
+        float: Tempo até o eixo ficar parado dentro da tolerância, ou None se não acomodou
+    """
+    wait = wait or clock.sleep
+    index = AXIS_INDEX[axis]
+    target = controller.hardware.get_position()[index] + distance
+    controller.go_to_position(**{axis: target})
+
+    start = clock.monotonic()
+    settled_since = None
+    while clock.monotonic() - start < timeout:
+        wait(controller.control_period)
+        now = clock.monotonic()
+        speed = controller.speed_x if axis == 'x' else controller.speed_y
+        if abs(target - controller.hardware.get_position()[index]) <= tolerance and abs(speed) < SETTLE_SPEED:
+            if settled_since is None:
+                settled_since = now
+            elif now - settled_since >= hold:
+                return settled_since - start
+        else:
+            settled_since = None
+    return None
+
+
+def _settle_time(controller, axis, distance, wait):
+    """Média do tempo de acomodação ida e volta (None se algum não acomodou)"""
+    forward = measure_settle(controller, axis, distance, wait)
+    back = measure_settle(controller, axis, -distance, wait)
+    if forward is None or back is None:
+        return None
+    return (forward + back) / 2.0
+
+
+def autotune(controller, axes=('x', 'y'), rule='pd', distance=TEST_DISTANCE, wait=None):
+    """
+    Ajusta os ganhos PID de cada eixo por realimentação por relé e mede a
+    melhoria no tempo de acomodação. Os novos ganhos só são mantidos se o eixo
+    acomodar pelo menos tão rápido quanto com os ganhos anteriores.
+
+    Args:
+        controller (MotorController): Controlador (com o loop de controle em execução)
+        axes (tuple): Eixos a ajustar
+        rule (str): Regra de sintonia ('pd', 'classic', 'some_overshoot' ou 'no_overshoot')
+        distance (int): Deslocamento dos movimentos de teste
+        wait (callable): Função que aguarda um período (padrão: clock.sleep)
+
+    Returns:
+        dict: Resultado por eixo (ku, pu, ganhos anteriores/novos e tempos de acomodação)
+    """
+    results = {}
+    manual_mode = controller.manual_mode
+    try:
+        for axis in axes:
+            old_gains = controller.pid.gains[axis]
+            settle_before = _settle_time(controller, axis, distance, wait)
+
+            _wait_applied(controller, controller.set_mode(manual=True), wait or clock.sleep)
+            relay = relay_experiment(axis, period=controller.control_period, wait=wait,
+                                     hardware=controller.hardware)
+            new_gains = ziegler_nichols(relay["ku"], relay["pu"], rule)
+            controller.pid.set_gains(axis, *new_gains)
+            settle_after = _settle_time(controller, axis, distance, wait)
+
+            applied = settle_after is not None and (settle_before is None or settle_after <= settle_before)
+            if not applied:
+                controller.pid.set_gains(axis, *old_gains)
+
+            results[axis] = dict(relay, rule=rule, gains_before=list(old_gains), gains=list(new_gains),
+                                 settle_before=settle_before, settle_after=settle_after, applied=applied)
+    finally:
+        controller.set_mode(manual=manual_mode)
+    return results
+
+
+def save_gains(results, path=GAINS_FILE):
+    """Grava os ganhos aplicados de cada eixo em JSON"""
+    data = {}
+    if os.path.exists(path):
+        data = load_gains(path)
+    for axis, result in results.items():
+        if result["applied"]:
+            kp, ki, kd = result["gains"]
+            data[axis] = {"kp": kp, "ki": ki, "kd": kd, "ku": result["ku"], "pu": result["pu"],
+                          "rule": result["rule"], "tuned_at": clock.time()}
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+
+
+def load_gains(path=GAINS_FILE):
+    """Lê os ganhos gravados (dicionário vazio se o arquivo não existir)"""
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def apply_saved_gains(pid, path=GAINS_FILE):
+    """
+    Aplica ao PIDController os ganhos gravados por eixo
+
+    Returns:
+        list: Eixos cujos ganhos foram carregados
+    """
+    gains = load_gains(path)
+    for axis, values in gains.items():
+        pid.set_gains(axis, values["kp"], values["ki"], values["kd"])
+    return list(gains)
+
+
+def print_results(results):
+    for axis, r in results.items():
+        kp, ki, kd = r["gains"]
+        before = f"{r['settle_before']:.2f} s" if r["settle_before"] is not None else "não acomodou"
+        after = f"{r['settle_after']:.2f} s" if r["settle_after"] is not None else "não acomodou"
+        print(f"Eixo {axis.upper()}: Ku={r['ku']:.3f} Pu={r['pu']:.3f} s (oscilação ±{r['amplitude']:.1f})")
+        print(f"  Ganhos: kp={kp:.4f} ki={ki:.4f} kd={kd:.4f} ({r['rule']})")
+        print(f"  Acomodação ({TEST_DISTANCE} unidades): antes {before} | depois {after} | "
+              f"{'aplicado' if r['applied'] else 'mantidos os ganhos anteriores'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sintonia automática do PID por realimentação por relé')
+    parser.add_argument('--axis', choices=('x', 'y'), action='append', help='Eixo a ajustar (padrão: ambos)')
+    parser.add_argument('--rule', choices=tuple(TUNING_RULES), default='pd', help='Regra de sintonia')
+    parser.add_argument('--output', default=GAINS_FILE, help='Arquivo onde gravar os ganhos')
+    args = parser.parse_args()
+    axes = tuple(args.axis or ('x', 'y'))
+
+    from gpio.gpio_config import setup_gpio, cleanup_gpio
+    from gpio.buttons import setup_buttons
+    from gpio.limitswitches import setup_limit_switches
+    from gpio.encoder_gpio import setup_encoders
+    from controle.encoder import setup_encoder_interrupts
+    from controle.motor_control import MotorController
+
+    setup_gpio()
+    setup_buttons()
+    setup_limit_switches()
+    setup_encoders()
+    setup_encoder_interrupts()
+    controller = MotorController()
+    apply_saved_gains(controller.pid, args.output)
+    controller.start()
+    try:
+        results = autotune(controller, axes, args.rule)
+    finally:
+        controller.stop()
+        cleanup_gpio()
+
+    print_results(results)
+    save_gains(results, args.output)
+    print(f"\nGanhos gravados em {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
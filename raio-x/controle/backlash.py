@@ -0,0 +1,212 @@
+# backlash.py
+from controle import clock
+from controle.hardware import default_hardware
+
+# Parâmetros do ensaio de folga
+MEASURE_DUTY = 30.0      # Duty cycle dos pulsos (%)
+MEASURE_TIME = 0.5       # Duração de cada pulso (s)
+MEASURE_SETTLE = 0.3     # Espera após cada pulso (s)
+MEASURE_REPEATS = 2      # Ciclos de ida e volta
+
+# Compensação
+APPROACH_MARGIN = 10     # Distância extra além da folga na aproximação por um lado só
+
+# Curso de cada eixo em contagens a partir do fim de curso mínimo (zero da calibração)
+AXIS_TRAVEL = {'x': 1000, 'y': 1000}
+
+AXIS_INDEX = {'x': 0, 'y': 1}
+
+
+def run_steps(steps, wait):
+    """
+    Executa uma rotina passo a passo fora do loop de controle: cada valor
+    gerado é uma espera em segundos, feita com wait()
+
+    Returns:
+        O valor retornado pela rotina
+    """
+    try:
+        delay = next(steps)
+        while True:
+            wait(delay)
+            delay = steps.send(None)
+    except StopIteration as done:
+        return done.value
+
+
+def _pulse(hardware, axis, direction, duty, duration, settle):
+    """Aplica um pulso de motor a partir do repouso e retorna o deslocamento do carro"""
+    index = AXIS_INDEX[axis]
+    motors = hardware.motors
+    start = hardware.get_position()[index]
+    motors.set_direction(axis, direction)
+    motors.set_speed(axis, duty)
+    yield duration
+    motors.set_speed(axis, 0)
+    motors.set_direction(axis, 0)
+    yield settle
+    return abs(hardware.get_position()[index] - start)
+
+
+def measure_backlash_steps(axis, duty=MEASURE_DUTY, duration=MEASURE_TIME, repeats=MEASURE_REPEATS,
+                           settle=MEASURE_SETTLE, hardware=None):
+    """
+    Versão passo a passo de measure_backlash: gera as esperas (s) entre os
+    comandos dos motores e retorna o resultado. Executada pelo loop de
+    controle na calibração (MotorController.calibrate), sem bloquear a thread.
+    """
+    hardware = hardware if hardware is not None else default_hardware
+    # Fecha a folga no sentido positivo antes de medir
+    yield from _pulse(hardware, axis, 1, duty, duration, settle)
+
+    same, reversed_ = [], []
+    for _ in range(repeats):
+        same.append((yield from _pulse(hardware, axis, 1, duty, duration, settle)))
+        reversed_.append((yield from _pulse(hardware, axis, -1, duty, duration, settle)))
+        same.append((yield from _pulse(hardware, axis, -1, duty, duration, settle)))
+        reversed_.append((yield from _pulse(hardware, axis, 1, duty, duration, settle)))
+
+    full = sum(same) / len(same)
+    backlash = max(0.0, full - sum(reversed_) / len(reversed_))
+    return {"backlash": backlash, "speed": full / duration}
+
+
+def measure_backlash(axis, duty=MEASURE_DUTY, duration=MEASURE_TIME, repeats=MEASURE_REPEATS,
+                     settle=MEASURE_SETTLE, wait=None, hardware=None):
+    """
+    Mede a folga de um eixo aproximando-se dos dois lados. O mesmo pulso de
+    motor (mesmo duty e duração, partindo do repouso) desloca o carro a
+    distância completa quando repete o sentido anterior e a distância menos
+    a folga quando inverte o sentido.
+
+    O controlador deve estar em modo manual e o eixo longe dos fins de curso.
+
+    Args:
+        axis (str): 'x' ou 'y'
+        duty (float): Duty cycle dos pulsos (%)
+        duration (float): Duração de cada pulso (s)
+        repeats (int): Ciclos de ida e volta medidos
+        settle (float): Espera após cada pulso (s)
+        wait (callable): Função que aguarda um período (padrão: clock.sleep)
+        hardware (HardwareContext): Pórtico medido (padrão: o pórtico padrão)
+
+    Returns:
+        dict: backlash (contagens) e speed (velocidade média do carro no pulso, contagens/s)
+    """
+    return run_steps(measure_backlash_steps(axis, duty, duration, repeats, settle, hardware),
+                     wait or clock.sleep)
+
+
+class BacklashCompensation:
+    def __init__(self, backlash, speed=None, approach=None, approach_margin=APPROACH_MARGIN, travel=None):
+        """
+        Compensação de folga na inversão de sentido. Depois de uma inversão o
+        encoder (no carro) fica parado enquanto o motor atravessa a folga, ou
+        seja, o motor precisa andar a folga além do erro visto pelo PID. Nesse
+        trecho o comando é escalado como se o erro fosse |erro| + folga, até o
+        carro voltar a se mover ou o tempo estimado para atravessar a folga se
+        esgotar. Inversões com erro menor que a folga (correções finas perto
+        do alvo) não são compensadas.
+
+        Opcionalmente os alvos são sempre aproximados pelo mesmo lado, passando
+        antes por um ponto além do alvo.
+
+        Args:
+            backlash (dict): Folga por eixo em contagens
+            speed (dict): Velocidade de referência por eixo (contagens/s), usada
+                para limitar o tempo de compensação
+            approach (str): '+' ou '-' para aproximar sempre por esse lado; None desativa
+            approach_margin (int): Distância extra além da folga no ponto de aproximação
+            travel (dict): Curso por eixo em contagens; limita os pontos de aproximação
+        """
+        self.backlash = dict(backlash)
+        self.speed = dict(speed or {})
+        self.approach = approach
+        self.approach_margin = approach_margin
+        self.travel = dict(AXIS_TRAVEL, **(travel or {}))
+        self.reset()
+
+    def reset(self):
+        self.last_direction = {'x': 0, 'y': 0}
+        self.anchor = {'x': None, 'y': None}      # posição do carro na inversão
+        self.deadline = {'x': None, 'y': None}    # fim da compensação da inversão atual
+        self.reversals = {'x': 0, 'y': 0}
+
+    def adjust(self, axis, direction, speed, position, error):
+        """
+        Ajusta o comando calculado pelo PID para um eixo
+
+        Args:
+            position (int): Posição do encoder
+            error (float): Erro de posição usado pelo PID
+
+        Returns:
+            tuple: (direção, velocidade)
+        """
+        backlash = self.backlash.get(axis, 0)
+        if backlash <= 0 or direction == 0 or speed <= 0:
+            return direction, speed
+
+        now = clock.monotonic()
+        if self.last_direction[axis] and direction != self.last_direction[axis] and abs(error) > backlash:
+            # Inversão: o carro só volta a se mover depois da folga. Correções
+            # menores que a folga (perto do alvo) não são amplificadas
+            self.reversals[axis] += 1
+            self.anchor[axis] = position
+            reference = self.speed.get(axis)
+            self.deadline[axis] = now + (2.0 * backlash / reference if reference else 0.5)
+        self.last_direction[axis] = direction
+
+        if self.anchor[axis] is not None:
+            if position != self.anchor[axis] or now >= self.deadline[axis]:
+                self.anchor[axis] = None
+            else:
+                speed = min(100.0, speed * (abs(error) + backlash) / abs(error))
+        return direction, speed
+
+    def approach_path(self, position, target):
+        """
+        Pontos a percorrer até o alvo respeitando o lado de aproximação
+
+        Args:
+            position (tuple): Posição atual (x, y)
+            target (tuple): Alvo (x, y); eixos None não se movem
+
+        Returns:
+            list: Alvos intermediários seguidos do alvo final
+        """
+        if self.approach is None:
+            return [target]
+        sign = 1 if self.approach == '+' else -1
+        waypoint = list(target)
+        needed = False
+        for index, axis in enumerate(('x', 'y')):
+            goal = target[index]
+            if goal is None or (goal - position[index]) * sign >= 0:
+                continue
+            offset = self.backlash.get(axis, 0) + self.approach_margin
+            # O ponto de aproximação fica dentro do curso do eixo
+            waypoint[index] = (max(0, round(goal - offset)) if sign > 0
+                               else min(self.travel[axis], round(goal + offset)))
+            needed = True
+        return [tuple(waypoint), target] if needed else [target]
+
+
+def calibrate_backlash_steps(axes=('x', 'y'), approach=None, hardware=None):
+    """Versão passo a passo de calibrate_backlash (ver measure_backlash_steps)"""
+    backlash, speed = {}, {}
+    for axis in axes:
+        result = yield from measure_backlash_steps(axis, hardware=hardware)
+        backlash[axis] = result["backlash"]
+        speed[axis] = result["speed"]
+    return BacklashCompensation(backlash, speed, approach=approach)
+
+
+def calibrate_backlash(axes=('x', 'y'), approach=None, wait=None, hardware=None):
+    """
+    Mede a folga dos eixos e cria a compensação correspondente
+
+    Returns:
+        BacklashCompensation: Compensação com as folgas medidas
+    """
+    return run_steps(calibrate_backlash_steps(axes, approach, hardware), wait or clock.sleep)
@@ -0,0 +1,283 @@
+# calibration_map.py
+import os
+import sys
+import csv
+import json
+import math
+import argparse
+
+# numpy é opcional: usado apenas na conversão de lotes de posições
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Arquivo do mapa de calibração (carregado na inicialização pelo main.py)
+CALIBRATION_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "calibration_map.json")
+
+# Número de pontos das tabelas uniformes de consulta
+LOOKUP_SIZE = 1024
+
+# Número padrão de nós do ajuste por mínimos quadrados
+FIT_KNOTS = 32
+
+
+def _interpolate(xs, ys, x):
+    """Interpolação linear em uma tabela ordenada (extrapola com a inclinação das pontas)"""
+    if x <= xs[0]:
+        i = 0
+    elif x >= xs[-1]:
+        i = len(xs) - 2
+    else:
+        lo, hi = 0, len(xs) - 1
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if xs[mid] <= x:
+                lo = mid
+            else:
+                hi = mid
+        i = lo
+    return ys[i] + (ys[i + 1] - ys[i]) * (x - xs[i]) / (xs[i + 1] - xs[i])
+
+
+class _UniformTable:
+    """Tabela com amostras igualmente espaçadas: consulta O(1) com interpolação linear"""
+
+    def __init__(self, xs, ys, size=LOOKUP_SIZE):
+        self.start = xs[0]
+        self.step = (xs[-1] - xs[0]) / (size - 1)
+        self.inverse_step = 1.0 / self.step
+        self.last = size - 2
+        self.values = [_interpolate(xs, ys, self.start + i * self.step) for i in range(size)]
+        if NUMPY_AVAILABLE:
+            self.array = np.asarray(self.values)
+
+    def __call__(self, x):
+        offset = (x - self.start) * self.inverse_step
+        i = int(math.floor(offset))
+        if i < 0:
+            i = 0
+        elif i > self.last:
+            i = self.last
+        low = self.values[i]
+        return low + (self.values[i + 1] - low) * (offset - i)
+
+    def slope(self, x):
+        i = min(max(int(math.floor((x - self.start) * self.inverse_step)), 0), self.last)
+        return (self.values[i + 1] - self.values[i]) * self.inverse_step
+
+    def many(self, xs):
+        """Conversão de um lote (vetorizada com numpy quando disponível)"""
+        if not NUMPY_AVAILABLE:
+            return [self(x) for x in xs]
+        offset = (np.asarray(xs, dtype=float) - self.start) * self.inverse_step
+        i = np.clip(np.floor(offset).astype(int), 0, self.last)
+        low = self.array[i]
+        return low + (self.array[i + 1] - low) * (offset - i)
+
+
+class AxisCalibration:
+    def __init__(self, counts, positions, size=LOOKUP_SIZE):
+        """
+        Mapa não linear de um eixo: contagem do encoder -> posição medida (m).
+
+        A tabela (pontos medidos ou ajustados, em qualquer espaçamento) é
+        reamostrada na inicialização em tabelas uniformes direta e inversa, de
+        modo que cada conversão é uma indexação e uma interpolação linear.
+        Fora da faixa calibrada as conversões extrapolam com a inclinação das
+        pontas.
+
+        Args:
+            counts (list): Contagens do encoder (crescentes)
+            positions (list): Posições medidas em metros (estritamente monotônicas)
+            size (int): Número de pontos das tabelas uniformes
+        """
+        if len(counts) != len(positions) or len(counts) < 2:
+            raise ValueError("O mapa precisa de pelo menos dois pares (contagem, posição)")
+        pairs = sorted(zip(counts, positions))
+        self.counts = [float(c) for c, _ in pairs]
+        self.positions = [float(p) for _, p in pairs]
+        if any(b <= a for a, b in zip(self.counts, self.counts[1:])):
+            raise ValueError("As contagens do mapa precisam ser distintas")
+        increasing = self.positions[-1] > self.positions[0]
+        if any((b <= a) if increasing else (b >= a) for a, b in zip(self.positions, self.positions[1:])):
+            raise ValueError("As posições do mapa precisam ser estritamente monotônicas")
+
+        self.forward = _UniformTable(self.counts, self.positions, size)
+        inverse = sorted(zip(self.positions, self.counts))
+        self.inverse = _UniformTable([p for p, _ in inverse], [c for _, c in inverse], size)
+
+    def to_meters(self, count):
+        return self.forward(count)
+
+    def to_counts(self, position):
+        """Contagem (fracionária) correspondente a uma posição em metros"""
+        return self.inverse(position)
+
+    def meters_per_count(self, count):
+        """Inclinação local do mapa (m por contagem)"""
+        return self.forward.slope(count)
+
+    def to_meters_many(self, counts):
+        return self.forward.many(counts)
+
+    def to_counts_many(self, positions):
+        return self.inverse.many(positions)
+
+    def to_dict(self):
+        return {"counts": self.counts, "positions": self.positions}
+
+
+class CalibrationMap:
+    def __init__(self, x, y):
+        """
+        Mapas de calibração dos dois eixos
+
+        Args:
+            x (AxisCalibration): Mapa do eixo X
+            y (AxisCalibration): Mapa do eixo Y
+        """
+        self.axes = {'x': x, 'y': y}
+
+    def __getitem__(self, axis):
+        return self.axes[axis]
+
+    @classmethod
+    def linear(cls, units_to_meters, travel=1000):
+        """Mapa equivalente ao fator linear units_to_meters"""
+        axis = AxisCalibration([0, travel], [0.0, travel * units_to_meters])
+        return cls(axis, axis)
+
+    def save(self, path=CALIBRATION_FILE):
+        with open(path, "w") as f:
+            json.dump({axis: cal.to_dict() for axis, cal in self.axes.items()}, f, indent=2)
+
+    @classmethod
+    def load(cls, path=CALIBRATION_FILE):
+        """
+        Carrega o mapa gravado
+
+        Returns:
+            CalibrationMap: Mapa, ou None se o arquivo não existir
+        """
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            data = json.load(f)
+        return cls(*(AxisCalibration(data[axis]["counts"], data[axis]["positions"]) for axis in ('x', 'y')))
+
+
+def _solve_tridiagonal(lower, diagonal, upper, rhs):
+    """Algoritmo de Thomas para sistemas tridiagonais"""
+    n = len(diagonal)
+    c = [0.0] * n
+    d = [0.0] * n
+    c[0] = upper[0] / diagonal[0] if n > 1 else 0.0
+    d[0] = rhs[0] / diagonal[0]
+    for i in range(1, n):
+        m = diagonal[i] - lower[i] * c[i - 1]
+        if i < n - 1:
+            c[i] = upper[i] / m
+        d[i] = (rhs[i] - lower[i] * d[i - 1]) / m
+    x = [0.0] * n
+    x[-1] = d[-1]
+    for i in range(n - 2, -1, -1):
+        x[i] = d[i] - c[i] * x[i + 1]
+    return x
+
+
+def fit_axis(points, knots=FIT_KNOTS, smoothing=1e-9):
+    """
+    Ajusta um mapa linear por partes com nós igualmente espaçados aos pontos
+    medidos (mínimos quadrados). Com funções "chapéu" as equações normais são
+    tridiagonais e resolvidas sem numpy.
+
+    Args:
+        points (list): Pares (contagem, posição medida em m); repetições são bem-vindas
+        knots (int): Número de nós do mapa
+        smoothing (float): Regularização entre nós vizinhos (evita nós sem pontos próximos)
+
+    Returns:
+        AxisCalibration: Mapa ajustado
+    """
+    if len(points) < 2:
+        raise ValueError("São necessários pelo menos dois pontos medidos")
+    low = min(c for c, _ in points)
+    high = max(c for c, _ in points)
+    if high == low:
+        raise ValueError("Os pontos precisam cobrir contagens diferentes")
+    knots = max(2, min(knots, len(points)))
+    step = (high - low) / (knots - 1)
+
+    lower = [0.0] * knots
+    diagonal = [0.0] * knots
+    upper = [0.0] * knots
+    rhs = [0.0] * knots
+    for count, position in points:
+        offset = (count - low) / step
+        i = min(int(offset), knots - 2)
+        t = offset - i
+        a, b = 1.0 - t, t
+        diagonal[i] += a * a
+        diagonal[i + 1] += b * b
+        upper[i] += a * b
+        lower[i + 1] += a * b
+        rhs[i] += a * position
+        rhs[i + 1] += b * position
+
+    # Pequena penalidade na diferença entre nós vizinhos (mantém o sistema
+    # bem condicionado quando um trecho não tem pontos)
+    for i in range(knots):
+        neighbours = (i > 0) + (i < knots - 1)
+        diagonal[i] += smoothing * neighbours
+        if i > 0:
+            lower[i] -= smoothing
+        if i < knots - 1:
+            upper[i] -= smoothing
+
+    values = _solve_tridiagonal(lower, diagonal, upper, rhs)
+    return AxisCalibration([low + i * step for i in range(knots)], values)
+
+
+def read_points(path):
+    """
+    Lê medições de um CSV com colunas axis, counts e measured_m
+
+    Returns:
+        dict: Eixo -> lista de pares (contagem, posição)
+    """
+    points = {'x': [], 'y': []}
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            points[row["axis"]].append((float(row["counts"]), float(row["measured_m"])))
+    return points
+
+
+def residuals(calibration, points):
+    """Erro máximo e RMS (m) do mapa nos pontos medidos"""
+    errors = [calibration.to_meters(c) - p for c, p in points]
+    return max(abs(e) for e in errors), math.sqrt(sum(e * e for e in errors) / len(errors))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Ajuste do mapa de calibração não linear dos eixos')
+    parser.add_argument('csv', help='Medições: axis,counts,measured_m')
+    parser.add_argument('--knots', type=int, default=FIT_KNOTS, help='Número de nós por eixo')
+    parser.add_argument('--output', default=CALIBRATION_FILE, help='Arquivo onde gravar o mapa')
+    args = parser.parse_args()
+
+    points = read_points(args.csv)
+    axes = {}
+    for axis in ('x', 'y'):
+        axes[axis] = fit_axis(points[axis], args.knots)
+        worst, rms = residuals(axes[axis], points[axis])
+        print(f"Eixo {axis.upper()}: {len(points[axis])} pontos | erro máx {worst * 1e6:.1f} µm | "
+              f"RMS {rms * 1e6:.1f} µm")
+    CalibrationMap(axes['x'], axes['y']).save(args.output)
+    print(f"Mapa gravado em {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
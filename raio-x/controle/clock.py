@@ -0,0 +1,41 @@
+# clock.py
+import time as _time
+
+
+class SystemClock:
+    """Relógio real do sistema (padrão)"""
+
+    def time(self):
+        return _time.time()
+
+    def monotonic(self):
+        return _time.monotonic()
+
+    def sleep(self, seconds):
+        _time.sleep(seconds)
+
+
+# Relógio usado pelo controle; pode ser trocado por um relógio virtual na simulação
+_clock = SystemClock()
+
+
+def set_clock(new_clock=None):
+    """Define o relógio usado pelo controle (None volta ao relógio do sistema)"""
+    global _clock
+    _clock = new_clock if new_clock is not None else SystemClock()
+
+
+def get_clock():
+    return _clock
+
+
+def time():
+    return _clock.time()
+
+
+def monotonic():
+    return _clock.monotonic()
+
+
+def sleep(seconds):
+    _clock.sleep(seconds)
@@ -0,0 +1,154 @@
+# commands.py
+import threading
+from collections import deque
+from concurrent.futures import Future
+
+# Tipos de comando
+MOVE = 'move'
+MANUAL = 'manual'
+MODE = 'mode'
+STOP = 'stop'
+CALIBRATE = 'calibrate'
+
+
+class MotionAborted(Exception):
+    """Movimento interrompido antes de chegar ao destino"""
+
+
+class MotionPreempted(MotionAborted):
+    """Movimento substituído por um comando com preempção"""
+
+
+class EmergencyStop(MotionAborted):
+    """Movimento cancelado por parada de emergência"""
+
+
+class LimitReached(MotionAborted):
+    """Fim de curso atingido durante o movimento"""
+
+
+def resolve(future, result=None, exception=None):
+    """Conclui um future ignorando os que já foram concluídos ou cancelados"""
+    if future.done():
+        return
+    if exception is not None:
+        future.set_exception(exception)
+    else:
+        future.set_result(result)
+
+
+class Command:
+    def __init__(self, kind, args=(), preempt=False, group=None, timeout=None):
+        """
+        Comando para o loop de controle
+
+        Args:
+            kind (str): MOVE, MANUAL, MODE, STOP ou CALIBRATE
+            args (tuple): Argumentos do comando (ex.: (x, y) para MOVE)
+            preempt (bool): Descarta os movimentos pendentes e interrompe o atual
+            group (object): Identificador da sequência à qual o comando pertence
+            timeout (float): Tempo máximo de um movimento (s), None para sem limite
+        """
+        self.kind = kind
+        self.args = args
+        self.preempt = preempt
+        self.group = group
+        self.timeout = timeout
+        self.started_at = None
+        self.waypoints = []     # alvos restantes de um movimento (ex.: aproximação por um lado)
+        self.steps = None       # rotina passo a passo de um CALIBRATE (gerador de esperas em s)
+        self.resume_at = None   # instante (clock.monotonic) do próximo passo da rotina
+        self.future = Future()
+
+
+class CommandQueue:
+    def __init__(self):
+        """
+        Fila de comandos consumida pela thread de controle.
+
+        Qualquer thread pode enfileirar comandos; somente a thread de controle
+        os executa, no início de cada iteração. Cada comando tem um future
+        concluído quando ele é aplicado (ou, para movimentos, na chegada), com
+        uma exceção MotionAborted se for interrompido.
+        """
+        self._lock = threading.Lock()
+        self._pending = deque()
+        self._preempt = False
+        self._emergency = None  # exceção da parada de emergência pendente
+
+    def __len__(self):
+        return len(self._pending)
+
+    def submit(self, command):
+        """
+        Enfileira um comando
+
+        Returns:
+            Future: Concluído quando o comando terminar
+        """
+        dropped = []
+        with self._lock:
+            if command.preempt:
+                # Somente os movimentos pendentes são descartados; comandos de
+                # modo e manuais enfileirados antes continuam valendo
+                dropped = [c for c in self._pending if c.kind == MOVE]
+                self._pending = deque(c for c in self._pending if c.kind != MOVE)
+                self._preempt = True
+            self._pending.append(command)
+        _fail(dropped, MotionPreempted("Substituído por um novo comando"))
+        return command.future
+
+    def flush(self, exception=None):
+        """
+        Parada de emergência: descarta todos os comandos pendentes. A thread de
+        controle interrompe o movimento em andamento com a mesma exceção.
+        """
+        exception = exception or EmergencyStop("Parada de emergência")
+        with self._lock:
+            dropped = self._take_pending()
+            self._emergency = exception
+        _fail(dropped, exception)
+
+    @property
+    def emergency_pending(self):
+        """Há uma parada de emergência ainda não processada pela thread de controle"""
+        return self._emergency is not None
+
+    def cancel_group(self, group, exception):
+        """Descarta os comandos pendentes de uma sequência"""
+        with self._lock:
+            dropped = [c for c in self._pending if c.group is group]
+            self._pending = deque(c for c in self._pending if c.group is not group)
+        _fail(dropped, exception)
+
+    def take_flags(self):
+        """
+        Lê e limpa os pedidos de preempção e de emergência
+
+        Returns:
+            tuple: (preempt, exceção da emergência ou None)
+        """
+        with self._lock:
+            flags = (self._preempt, self._emergency)
+            self._preempt, self._emergency = False, None
+        return flags
+
+    def pop(self):
+        """Retorna o próximo comando não cancelado (None se a fila estiver vazia)"""
+        with self._lock:
+            while self._pending:
+                command = self._pending.popleft()
+                if command.future.set_running_or_notify_cancel():
+                    return command
+        return None
+
+    def _take_pending(self):
+        pending = list(self._pending)
+        self._pending.clear()
+        return pending
+
+
+def _fail(commands, exception):
+    # Fora do lock: os callbacks dos futures podem enfileirar novos comandos
+    for command in commands:
+        resolve(command.future, exception=exception)
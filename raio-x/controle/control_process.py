@@ -0,0 +1,554 @@
+# control_process.py
+import os
+import json
+import math
+import time
+import struct
+import threading
+import multiprocessing
+from multiprocessing import shared_memory
+from concurrent.futures import Future
+
+from controle import profiling
+from controle.commands import (Command, resolve, MotionAborted, MotionPreempted, EmergencyStop,
+                               LimitReached)
+from controle.commands import MOVE as MOVE_COMMAND
+
+# Este módulo é importado pelo processo de controle antes de o GPIO (real ou
+# simulado) ser configurado: gpio/ e o restante de controle/ são importados
+# apenas dentro de _serve()
+
+# Período do loop de controle no processo isolado (s)
+CONTROL_PERIOD = 0.01
+
+# Posições em cada fila circular de comandos e de resultados
+RING_SLOTS = 64
+
+# Iterações entre atualizações das estatísticas de período publicadas
+STATS_INTERVAL = 100
+
+# Tempo máximo para o processo de controle publicar o primeiro estado (s)
+START_TIMEOUT = 10.0
+
+# Intervalo de leitura dos resultados pelo cliente (s)
+RESULT_POLL = 0.001
+
+# Estado publicado a cada iteração (seqlock): sequência, instante, posição
+# (contagens e m), velocidade (contagens/s e m/s), modo manual, calibrado,
+# movimento em andamento, iterações, atrasos, p99 e máximo do período (µs)
+STATE_FORMAT = "<QdqqddddddBBBxxxxxQQdd"
+STATE_SIZE = struct.calcsize(STATE_FORMAT)
+
+# Comando: id, tipo, flags, código, x, y, valor (tempo limite ou duração), grupo
+COMMAND_FORMAT = "<QBBBxxxxxdddQ"
+
+# Resultado: id, status, mensagem (erro ou registro em JSON)
+RESULT_FORMAT = "<QB7x256s"
+
+# Tipos de comando
+MOVE, MOVE_METERS, MANUAL, MODE, STOP, EMERGENCY, CALIBRATE, CAPTURE, SHUTDOWN = range(9)
+
+# Flags dos comandos
+PREEMPT = 1
+X_NONE = 2
+Y_NONE = 4
+LATCHED = 8     # move_manual(held=False): malha aberta até stop_movement
+LAST = 16       # último segmento de move_sequence (o grupo deixa de ser guardado)
+
+MANUAL_DIRECTIONS = ('up', 'down', 'left', 'right', 'stop')
+
+# Status dos resultados e exceções correspondentes
+OK = 0
+ERRORS = (MotionAborted, MotionPreempted, EmergencyStop, LimitReached, RuntimeError)
+
+
+class _Ring:
+    def __init__(self, buf, offset, fmt, slots=RING_SLOTS):
+        """
+        Fila circular de um produtor e um consumidor em memória compartilhada:
+        contadores de escrita e leitura (8 bytes cada) seguidos das posições
+        """
+        self.buf = buf
+        self.offset = offset
+        self.record = struct.Struct(fmt)
+        self.slots = slots
+        self.data = offset + 16
+
+    @staticmethod
+    def size(fmt, slots=RING_SLOTS):
+        return 16 + slots * struct.calcsize(fmt)
+
+    def put(self, *values):
+        """
+        Returns:
+            bool: False se a fila estiver cheia
+        """
+        head, tail = struct.unpack_from("<QQ", self.buf, self.offset)
+        if head - tail >= self.slots:
+            return False
+        self.record.pack_into(self.buf, self.data + (head % self.slots) * self.record.size, *values)
+        struct.pack_into("<Q", self.buf, self.offset, head + 1)
+        return True
+
+    def get(self):
+        head, tail = struct.unpack_from("<QQ", self.buf, self.offset)
+        if tail == head:
+            return None
+        values = self.record.unpack_from(self.buf, self.data + (tail % self.slots) * self.record.size)
+        struct.pack_into("<Q", self.buf, self.offset + 8, tail + 1)
+        return values
+
+
+def _layout(buf):
+    """Divide o segmento em estado, fila de comandos e fila de resultados"""
+    commands_offset = (STATE_SIZE + 7) // 8 * 8
+    results_offset = commands_offset + _Ring.size(COMMAND_FORMAT)
+    return _Ring(buf, commands_offset, COMMAND_FORMAT), _Ring(buf, results_offset, RESULT_FORMAT)
+
+
+SEGMENT_SIZE = (STATE_SIZE + 7) // 8 * 8 + _Ring.size(COMMAND_FORMAT) + _Ring.size(RESULT_FORMAT)
+
+
+def _optional(value):
+    return None if math.isnan(value) else value
+
+
+def _configure_process(cpu, priority):
+    """Fixa o processo em uma CPU e eleva a prioridade, quando permitido"""
+    applied = []
+    if cpu is not None:
+        try:
+            os.sched_setaffinity(0, {cpu})
+            applied.append(f"CPU {cpu}")
+        except (AttributeError, OSError):
+            pass
+    if priority is not None:
+        try:
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(priority))
+            applied.append(f"SCHED_FIFO {priority}")
+        except (AttributeError, OSError):
+            pass
+    return applied
+
+
+def run_paced(controller, keep_running, period=CONTROL_PERIOD, before=None, after=None, advance=None):
+    """
+    Loop de controle com prazos absolutos (o período não acumula o tempo da
+    iteração)
+
+    Args:
+        controller (MotorController): Controlador executado
+        keep_running (callable): Condição de continuação
+        before (callable): Chamada antes de cada iteração (ex.: ler comandos)
+        after (callable): Chamada depois de cada iteração (ex.: publicar o estado)
+        advance (callable): Avança o relógio virtual da simulação em um período
+    """
+    deadline = time.monotonic()
+    while keep_running():
+        if before:
+            before()
+        controller.step()
+        if after:
+            after()
+        if advance:
+            advance(period)
+        deadline += period
+        delay = deadline - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        else:
+            deadline = time.monotonic()
+
+
+class _Server:
+    """Lado do processo de controle: aplica os comandos e publica o estado"""
+
+    def __init__(self, controller, shm):
+        self.controller = controller
+        self.buf = shm.buf
+        self.commands, self.results = _layout(shm.buf)
+        self.groups = {}
+        self.sequence = 0
+        self.stats = (0.0, 0.0)
+        self.running = True
+        self._results_lock = threading.Lock()
+
+    def _reply(self, command_id, status=OK, message=""):
+        data = message.encode("utf-8")[:256]
+        with self._results_lock:
+            while not self.results.put(command_id, status, data):
+                time.sleep(RESULT_POLL)
+
+    def _reply_future(self, command_id, future, encode=None):
+        def done(f):
+            error = f.exception()
+            if error is None:
+                result = f.result()
+                self._reply(command_id, OK, json.dumps(encode(result) if encode else result))
+                return
+            for status, kind in enumerate(ERRORS, start=1):
+                if type(error) is kind:
+                    break
+            else:
+                status = ERRORS.index(RuntimeError) + 1
+            self._reply(command_id, status, str(error))
+        future.add_done_callback(done)
+
+    def poll_commands(self):
+        while True:
+            command = self.commands.get()
+            if command is None:
+                return
+            try:
+                self._apply(*command)
+            except Exception as e:
+                self._reply(command[0], ERRORS.index(RuntimeError) + 1, str(e))
+
+    def _apply(self, command_id, kind, flags, code, x, y, value, group):
+        controller = self.controller
+        x = None if flags & X_NONE else x
+        y = None if flags & Y_NONE else y
+        if kind in (MOVE, MOVE_METERS):
+            if kind == MOVE_METERS:
+                x, y = controller.meters_to_counts(x, y)
+            else:
+                x, y = (None if x is None else round(x)), (None if y is None else round(y))
+            # Segmentos de uma sequência (mesmo grupo) são cancelados juntos se um
+            # falhar; depois do último, só os comandos guardam o objeto do grupo
+            if not group:
+                group = None
+            elif flags & LAST:
+                group = self.groups.pop(group, None) or object()
+            else:
+                group = self.groups.setdefault(group, object())
+            command = Command(MOVE_COMMAND, (x, y), preempt=bool(flags & PREEMPT),
+                              group=group, timeout=_optional(value))
+            self._reply_future(command_id, controller._submit(command))
+        elif kind == MANUAL:
+            self._reply_future(command_id, controller.move_manual(MANUAL_DIRECTIONS[code],
+                                                                  held=not flags & LATCHED))
+        elif kind == MODE:
+            self._reply_future(command_id, controller.set_mode(bool(code)))
+        elif kind == STOP:
+            self._reply_future(command_id, controller.stop_movement())
+        elif kind == EMERGENCY:
+            controller.emergency_stop()
+            self._reply(command_id)
+        elif kind == CALIBRATE:
+            # Executada passo a passo pelo loop, que continua publicando o estado
+            # (e alimentando o watchdog) durante a busca dos fins de curso
+            self._reply_future(command_id, controller.begin_calibration(), encode=list)
+        elif kind == CAPTURE:
+            # Sem duração: a padrão do ExposureController
+            duration = _optional(value)
+            future = controller.exposure.expose(duration) if duration else controller.exposure.expose()
+            self._reply_future(command_id, future, encode=lambda record: {
+                key: record[key] for key in ("id", "requested_s", "duration_s", "error_s",
+                                             "start_position", "end_position")})
+        elif kind == SHUTDOWN:
+            self.running = False
+            self._reply(command_id)
+
+    def publish(self):
+        controller = self.controller
+        position = controller.hardware.get_position()
+        meters = controller.counts_to_meters(*position)
+        speed_m = controller.get_speed_meters_per_second()
+        profiler = controller.profiler
+        self.sequence += 1
+        if self.sequence % STATS_INTERVAL == 0:
+            period = profiler.snapshot()["stages"]["period"]
+            if period["count"]:
+                # O percentil é o limite superior do balde do histograma
+                self.stats = (min(period["p99_us"], period["max_us"]), period["max_us"])
+        struct.pack_into("<Q", self.buf, 0, 2 * self.sequence - 1)
+        struct.pack_into(STATE_FORMAT, self.buf, 0, 2 * self.sequence - 1, time.monotonic(),
+                         position[0], position[1], meters[0], meters[1],
+                         float(controller.speed_x), float(controller.speed_y), speed_m[0], speed_m[1],
+                         1 if controller.manual_mode else 0, 1 if controller.calibrated else 0,
+                         1 if controller.active_move is not None else 0,
+                         profiler.counts[profiling.TICK], profiler.overruns,
+                         self.stats[0], self.stats[1])
+        struct.pack_into("<Q", self.buf, 0, 2 * self.sequence)
+
+
+def _serve(name, simulate, cpu, priority, gains, watchdog_name, jog):
+    """Ponto de entrada do processo de controle"""
+    from controle.environment import configure_logging
+    configure_logging()
+    applied = _configure_process(cpu, priority)
+    if simulate:
+        # Pórtico simulado em tempo real: o relógio virtual avança um período por iteração
+        from simulacao.gantry import SimulatedGantry
+        gantry = SimulatedGantry().install()
+        controller = gantry.create_controller()
+        advance = gantry.clock.sleep
+    else:
+        from gpio.gpio_config import cleanup_gpio
+        from controle.motor_control import MotorController
+        controller = MotorController()
+        controller.hardware.setup()
+        controller.running = True
+        advance = None
+
+    if jog:
+        from controle.jog import JogController
+        controller.jog = JogController()
+
+    from controle.autotune import apply_saved_gains
+    from controle.calibration_map import CalibrationMap
+    if gains:
+        for axis in ('x', 'y'):
+            controller.pid.set_gains(axis, *gains)
+    else:
+        apply_saved_gains(controller.pid)
+    controller.calibration = CalibrationMap.load()
+    controller.control_period = CONTROL_PERIOD
+    controller.exposure.start()
+    if watchdog_name:
+        from controle.watchdog import SharedState
+        controller.shared_state = SharedState(watchdog_name, create=False)
+    if applied:
+        print(f"Processo de controle: {', '.join(applied)}")
+
+    shm = shared_memory.SharedMemory(name=name)
+    server = _Server(controller, shm)
+    try:
+        server.publish()
+        run_paced(controller, lambda: server.running, CONTROL_PERIOD,
+                  before=server.poll_commands, after=server.publish, advance=advance)
+    finally:
+        controller.hardware.motors.stop()
+        controller.running = False
+        controller.exposure.stop()
+        controller.commands.flush(MotionAborted("Processo de controle encerrado"))
+        controller._process_commands()
+        if controller.shared_state is not None:
+            controller.shared_state.shm.close()
+        del server
+        shm.close()
+        if not simulate:
+            cleanup_gpio()
+
+
+class ControlProcess:
+    def __init__(self, simulate=False, cpu=None, priority=None, gains=None, watchdog_state=None, jog=False):
+        """
+        Executa o loop de controle, os encoders e os motores em um processo
+        dedicado e expõe a mesma interface do MotorController. O estado é
+        publicado pelo processo de controle em memória compartilhada a cada
+        iteração; os comandos seguem por uma fila circular também em memória
+        compartilhada e os resultados voltam por outra, concluindo os futures.
+
+        Args:
+            simulate (bool): Usar o pórtico simulado no processo de controle
+            cpu (int): CPU em que o processo de controle é fixado
+            priority (int): Prioridade SCHED_FIFO do processo de controle
+            gains (tuple): Ganhos (kp, ki, kd) dos dois eixos (padrão: os gravados pela sintonia)
+            watchdog_state (SharedState): Segmento do watchdog (ver controle/watchdog.py)
+            jog (bool): Jog em malha fechada de velocidade no modo manual (ver controle/jog.py)
+        """
+        self.simulate = simulate
+        self.cpu = cpu
+        self.priority = priority
+        self.gains = gains
+        self.watchdog_state = watchdog_state
+        self.jog = jog
+        self.control_period = CONTROL_PERIOD
+        self.shm = None
+        self.process = None
+        self.pending = {}
+        self.next_id = 0
+        self._lock = threading.Lock()
+        self._reader = None
+        self._reading = False
+
+    # Ciclo de vida
+
+    def start(self):
+        self.shm = shared_memory.SharedMemory(create=True, size=SEGMENT_SIZE)
+        self.shm.buf[:SEGMENT_SIZE] = bytes(SEGMENT_SIZE)
+        self.commands, self.results = _layout(self.shm.buf)
+        context = multiprocessing.get_context("spawn")
+        self.process = context.Process(
+            target=_serve, name="control", daemon=True,
+            args=(self.shm.name, self.simulate, self.cpu, self.priority, self.gains,
+                  self.watchdog_state.name if self.watchdog_state else None, self.jog))
+        self.process.start()
+        self._reading = True
+        self._reader = threading.Thread(target=self._read_results, daemon=True)
+        self._reader.start()
+
+        start = time.monotonic()
+        while self.state()["sequence"] == 0:
+            if not self.process.is_alive() or time.monotonic() - start > START_TIMEOUT:
+                self.stop()
+                raise RuntimeError("O processo de controle não iniciou")
+            time.sleep(RESULT_POLL)
+        return self
+
+    def stop(self):
+        if self.process is not None:
+            if self.process.is_alive():
+                future = self._send(SHUTDOWN)
+                try:
+                    future.result(timeout=1.0)
+                except Exception:
+                    pass
+            self.process.join(timeout=2.0)
+            if self.process.is_alive():
+                self.process.terminate()
+            self.process = None
+        self._reading = False
+        if self._reader:
+            self._reader.join(timeout=1.0)
+            self._reader = None
+        with self._lock:
+            pending, self.pending = self.pending, {}
+        for future in pending.values():
+            resolve(future, exception=MotionAborted("Processo de controle encerrado"))
+        if self.shm is not None:
+            self.commands = self.results = None
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+    @property
+    def running(self):
+        return self.process is not None and self.process.is_alive()
+
+    # Comunicação
+
+    def _send(self, kind, flags=0, code=0, x=math.nan, y=math.nan, value=math.nan, group=0):
+        future = Future()
+        future.set_running_or_notify_cancel()
+        with self._lock:
+            self.next_id += 1
+            command_id = self.next_id
+            self.pending[command_id] = future
+            while not self.commands.put(command_id, kind, flags, code, x, y, value, group):
+                time.sleep(RESULT_POLL)
+        return future
+
+    def _read_results(self):
+        while self._reading:
+            result = self.results.get()
+            if result is None:
+                time.sleep(RESULT_POLL)
+                continue
+            command_id, status, message = result
+            with self._lock:
+                future = self.pending.pop(command_id, None)
+            if future is None:
+                continue
+            text = message.rstrip(b"\0").decode("utf-8", "replace")
+            if status == OK:
+                resolve(future, json.loads(text) if text else None)
+            else:
+                resolve(future, exception=ERRORS[status - 1](text))
+
+    def state(self):
+        """Último estado publicado pelo processo de controle"""
+        buf = self.shm.buf
+        while True:
+            values = struct.unpack_from(STATE_FORMAT, buf, 0)
+            if values[0] % 2 == 0 and struct.unpack_from("<Q", buf, 0)[0] == values[0]:
+                break
+        return {
+            "sequence": values[0] // 2, "time": values[1],
+            "position": (values[2], values[3]), "position_m": (values[4], values[5]),
+            "speed": (values[6], values[7]), "speed_mps": (values[8], values[9]),
+            "manual_mode": bool(values[10]), "calibrated": bool(values[11]), "moving": bool(values[12]),
+            "ticks": values[13], "overruns": values[14],
+            "period_p99_us": values[15], "period_max_us": values[16],
+        }
+
+    @staticmethod
+    def _target(x, y):
+        flags = (X_NONE if x is None else 0) | (Y_NONE if y is None else 0)
+        return flags, math.nan if x is None else float(x), math.nan if y is None else float(y)
+
+    # Interface do MotorController
+
+    @property
+    def manual_mode(self):
+        return self.state()["manual_mode"]
+
+    @property
+    def calibrated(self):
+        return self.state()["calibrated"]
+
+    @property
+    def speed_x(self):
+        return self.state()["speed"][0]
+
+    @property
+    def speed_y(self):
+        return self.state()["speed"][1]
+
+    def get_position(self):
+        return self.state()["position"]
+
+    def get_position_meters(self):
+        return self.state()["position_m"]
+
+    def get_speed_meters_per_second(self):
+        return self.state()["speed_mps"]
+
+    def move_manual(self, direction, held=True):
+        return self._send(MANUAL, flags=0 if held else LATCHED, code=MANUAL_DIRECTIONS.index(direction))
+
+    def stop_movement(self):
+        return self._send(STOP)
+
+    def set_mode(self, manual=True):
+        return self._send(MODE, code=1 if manual else 0)
+
+    def emergency_stop(self):
+        return self._send(EMERGENCY)
+
+    def go_to_position(self, x=None, y=None, preempt=True, timeout=None):
+        flags, x, y = self._target(x, y)
+        return self._send(MOVE, flags | (PREEMPT if preempt else 0), x=x, y=y,
+                          value=math.nan if timeout is None else timeout)
+
+    def go_to_position_meters(self, x=None, y=None, preempt=True, timeout=None):
+        flags, x, y = self._target(x, y)
+        return self._send(MOVE_METERS, flags | (PREEMPT if preempt else 0), x=x, y=y,
+                          value=math.nan if timeout is None else timeout)
+
+    def move_sequence(self, points, preempt=False, timeout=None):
+        with self._lock:
+            self.next_id += 1
+            group = self.next_id
+        points = list(points)
+        futures = []
+        for index, (x, y) in enumerate(points):
+            flags, x, y = self._target(x, y)
+            if preempt and index == 0:
+                flags |= PREEMPT
+            if index == len(points) - 1:
+                flags |= LAST
+            futures.append(self._send(MOVE, flags, x=x, y=y,
+                                      value=math.nan if timeout is None else timeout, group=group))
+        return futures
+
+    def calibrate(self):
+        """
+        Calibra no processo de controle e aguarda o fim
+
+        Returns:
+            tuple: Posição (x, y) ao final da calibração
+        """
+        return tuple(self._send(CALIBRATE).result())
+
+    def capture_image(self, duration=None, metadata=None):
+        """
+        Captura uma imagem e aguarda o fim da exposição
+
+        Returns:
+            dict: Registro resumido da exposição (id, duração, erro e posições)
+        """
+        record = self._send(CAPTURE, value=math.nan if duration is None else duration).result()
+        record["metadata"] = dict(metadata or {})
+        return record
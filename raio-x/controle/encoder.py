@@ -3,40 +3,74 @@ import RPi.GPIO as GPIO
 import threading
 import time
 
-# Estado dos encoders (posição absoluta)
-pos_x = 0
-pos_y = 0
-
 # Pinos
 PIN_X_A = 5
 PIN_X_B = 6
 PIN_Y_A = 12
 PIN_Y_B = 13
 
-def _encoder_callback_x(channel):
-    global pos_x
-    b = GPIO.input(PIN_X_B)
-    if b == GPIO.HIGH:
-        pos_x += 1
-    else:
-        pos_x -= 1
-
-def _encoder_callback_y(channel):
-    global pos_y
-    b = GPIO.input(PIN_Y_B)
-    if b == GPIO.HIGH:
-        pos_y += 1
-    else:
-        pos_y -= 1
+
+class Encoders:
+    def __init__(self, gpio=None):
+        """
+        Encoders de quadratura de um pórtico: a posição absoluta de cada eixo
+        é contada nos callbacks das bordas do canal A
+
+        Args:
+            gpio: Backend GPIO (padrão: o RPi.GPIO do módulo)
+        """
+        self.gpio = gpio
+        # Estado dos encoders (posição absoluta)
+        self.pos_x = 0
+        self.pos_y = 0
+        # Funções chamadas a cada borda com (eixo, nova posição), ex.: gravador de traços
+        self.listeners = []
+
+    def backend(self):
+        return self.gpio if self.gpio is not None else GPIO
+
+    def _callback_x(self, channel):
+        gpio = self.backend()
+        if gpio.input(PIN_X_B) == gpio.HIGH:
+            self.pos_x += 1
+        else:
+            self.pos_x -= 1
+        for listener in self.listeners:
+            listener('x', self.pos_x)
+
+    def _callback_y(self, channel):
+        gpio = self.backend()
+        if gpio.input(PIN_Y_B) == gpio.HIGH:
+            self.pos_y += 1
+        else:
+            self.pos_y -= 1
+        for listener in self.listeners:
+            listener('y', self.pos_y)
+
+    def setup_interrupts(self):
+        gpio = self.backend()
+        gpio.add_event_detect(PIN_X_A, gpio.BOTH, callback=self._callback_x)
+        gpio.add_event_detect(PIN_Y_A, gpio.BOTH, callback=self._callback_y)
+
+    def reset(self):
+        self.pos_x = 0
+        self.pos_y = 0
+
+    def get_position(self):
+        return self.pos_x, self.pos_y
+
+
+# Encoders do pórtico padrão, usados pelas funções abaixo (ver controle/hardware.py)
+default_encoders = Encoders()
+
+# Funções chamadas a cada borda do pórtico padrão com (eixo, nova posição)
+position_listeners = default_encoders.listeners
 
 def setup_encoder_interrupts():
-    GPIO.add_event_detect(PIN_X_A, GPIO.BOTH, callback=_encoder_callback_x)
-    GPIO.add_event_detect(PIN_Y_A, GPIO.BOTH, callback=_encoder_callback_y)
+    default_encoders.setup_interrupts()
 
 def reset_position():
-    global pos_x, pos_y
-    pos_x = 0
-    pos_y = 0
+    default_encoders.reset()
 
 def get_position():
-    return pos_x, pos_y
+    return default_encoders.pos_x, default_encoders.pos_y
@@ -0,0 +1,172 @@
+# environment.py
+import os
+import sys
+import json
+import time
+import logging
+import threading
+
+# O driver do BMP280 fica no diretório i2c/ do repositório
+I2C_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "i2c")
+
+# Cache do dispositivo encontrado na última inicialização (evita repetir a busca)
+DEVICE_CACHE_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "devices.json")
+
+logger = logging.getLogger(__name__)
+
+
+def configure_logging(level=logging.INFO):
+    """
+    Logging do processo atrás de uma fila (i2c/log_queue.py): os registros do
+    loop de controle e do sensor só são enfileirados, e uma thread de fundo
+    faz a saída. Mensagens repetidas são limitadas e contadas.
+
+    Returns:
+        QueueListener: Listener em execução
+    """
+    if I2C_DIR not in sys.path:
+        sys.path.append(I2C_DIR)
+    import log_queue
+    return log_queue.configure_logging(level)
+
+
+def load_device_cache(path=DEVICE_CACHE_FILE):
+    """
+    Returns:
+        dict: Argumentos do BMP280Sensor que encontraram o sensor, ou None
+    """
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _discovered(sensor):
+    """Argumentos que recriam o sensor sem repetir a busca"""
+    if sensor.use_kernel_module:
+        return {"use_kernel_module": True, "device_path": os.path.dirname(sensor.kernel_temp_path)}
+    return {"use_kernel_module": False, "i2c_bus": sensor.i2c_bus, "i2c_addr": sensor.i2c_addr}
+
+
+def create_bmp280_sensor(cache=DEVICE_CACHE_FILE, **kwargs):
+    """
+    Cria um BMP280Sensor (i2c/i2c_module.py) com os argumentos dados.
+
+    Sem argumentos explícitos, usa primeiro o endereço/diretório gravado no
+    cache; se o sensor não responder ali, refaz a busca completa. O resultado
+    de uma busca bem-sucedida é gravado no cache para a próxima inicialização.
+
+    Args:
+        cache (str): Arquivo do cache de descoberta (None desativa)
+
+    Returns:
+        BMP280Sensor: Sensor, ou None se o driver não estiver disponível
+    """
+    if I2C_DIR not in sys.path:
+        sys.path.append(I2C_DIR)
+    try:
+        from i2c_module import BMP280Sensor
+    except ImportError:
+        return None
+
+    cached = load_device_cache(cache) if cache and not kwargs else None
+    sensor = BMP280Sensor(**cached) if cached else None
+    if sensor is None or sensor.simulation_mode:
+        if sensor is not None:
+            # Sensor ausente no endereço do cache: libera o barramento antes da busca
+            sensor.close()
+        sensor = BMP280Sensor(**kwargs)
+    if cache and not sensor.simulation_mode:
+        found = _discovered(sensor)
+        if found != cached:
+            try:
+                with open(cache, "w") as f:
+                    json.dump(found, f, indent=2)
+            except OSError:
+                pass
+    return sensor
+
+
+class SensorMonitor:
+    def __init__(self, sensor=None, interval=2.0, factory=None):
+        """
+        Lê o sensor ambiental periodicamente em uma thread própria e guarda a
+        última leitura, para que o controle e as métricas nunca acessem o
+        barramento I2C diretamente.
+
+        Com 'factory' o sensor só é criado (e procurado) na thread do monitor,
+        sem atrasar a inicialização; até lá self.sensor é None.
+
+        Args:
+            sensor: Objeto com read_all() -> {"temperature", "pressure"} (ex.: BMP280Sensor)
+            interval (float): Intervalo entre leituras (s)
+            factory (callable): Cria o sensor no primeiro uso (ex.: create_bmp280_sensor);
+                se retornar None o monitor termina
+        """
+        self.sensor = sensor
+        self.factory = factory
+        self.interval = interval
+        self.latest = None      # {"temperature", "pressure", "timestamp"}
+        self.reads = 0
+        self.errors = 0         # leituras que falharam (exceção ou error_count do sensor)
+        self._thread = None
+        self._running = False
+
+    def poll(self):
+        """
+        Faz uma leitura e atualiza o valor em cache.
+
+        O BMP280Sensor não lança exceção em caso de falha: devolve os valores
+        padrão e incrementa error_count. Uma leitura assim não substitui
+        self.latest, para que a última leitura válida envelheça normalmente.
+        """
+        sensor = self.sensor
+        errors_before = getattr(sensor, "error_count", 0)
+        try:
+            reading = sensor.read_all()
+        except Exception as e:
+            self.errors += 1
+            logger.error("Falha na leitura do sensor ambiental: %s", e)
+            return None
+        if getattr(sensor, "error_count", 0) > errors_before:
+            self.errors += 1
+            logger.error("Falha na leitura do sensor ambiental: %s", getattr(sensor, "last_error", None))
+            return None
+        self.reads += 1
+        # Substituição atômica: quem lê self.latest vê sempre uma leitura completa
+        self.latest = {"temperature": reading["temperature"], "pressure": reading["pressure"],
+                       "timestamp": time.time()}
+        return self.latest
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._running = False
+        if self._thread:
+            self._thread.join(timeout=self.interval + 1.0)
+            self._thread = None
+
+    def close(self):
+        """Para o monitor e fecha o sensor, se já tiver sido criado"""
+        self.stop()
+        if self.sensor is not None:
+            self.sensor.close()
+
+    def _run(self):
+        if self.sensor is None:
+            self.sensor = self.factory()
+            if self.sensor is None:
+                self._running = False
+                return
+        while self._running:
+            self.poll()
+            time.sleep(self.interval)
+
+    def sensor_errors(self):
+        """Falhas de leitura contadas pelo sensor e pelo monitor"""
+        return getattr(self.sensor, "error_count", 0) + self.errors
@@ -0,0 +1,229 @@
+# exposure.py
+import os
+import math
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Future
+
+from controle import clock
+from controle.commands import resolve
+from controle.hardware import default_hardware
+
+# Duração padrão de uma exposição (s)
+EXPOSURE_TIME = 0.5
+
+# Nos últimos SPIN_TIME segundos antes do prazo a thread não dorme: consulta o
+# relógio monotônico em laço (sleep do sistema pode acordar vários ms depois)
+SPIN_TIME = 0.002
+
+# Prioridade de tempo real da thread de exposição (SCHED_FIFO, exige permissão)
+REALTIME_PRIORITY = 50
+
+# Registros guardados para as estatísticas
+HISTORY = 1000
+
+
+class ExposureOverlap(RuntimeError):
+    """Pedido de exposição enquanto outro pulso ainda está ativo"""
+
+
+def _raise_priority(priority=REALTIME_PRIORITY):
+    """
+    Coloca a thread atual em SCHED_FIFO (no Linux a política vale por thread)
+
+    Returns:
+        bool: True se a prioridade foi aplicada
+    """
+    try:
+        os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(priority))
+        return True
+    except (AttributeError, OSError):
+        return False
+
+
+def _wait_until(deadline, spin=SPIN_TIME):
+    """Espera até o instante monotônico 'deadline'"""
+    current = clock.get_clock()
+    if not isinstance(current, clock.SystemClock):
+        # Relógio virtual: o tempo só avança com sleep
+        remaining = deadline - current.monotonic()
+        if remaining > 0:
+            current.sleep(remaining)
+        return
+    remaining = deadline - current.monotonic()
+    if remaining > spin:
+        current.sleep(remaining - spin)
+    while current.monotonic() < deadline:
+        pass
+
+
+class ExposureController:
+    def __init__(self, history=HISTORY, priority=REALTIME_PRIORITY, hardware=None):
+        """
+        Pulsos de exposição do raio-X temporizados por um prazo monotônico em
+        uma thread dedicada (com prioridade de tempo real quando permitido),
+        independente do loop de controle.
+
+        A posição dos encoders e o instante são registrados logo depois de
+        ligar e logo depois de desligar o raio-X; cada exposição produz um
+        registro com esses dados, os metadados recebidos e o erro de duração.
+
+        Args:
+            history (int): Registros mantidos para as estatísticas
+            priority (int): Prioridade SCHED_FIFO da thread
+            hardware (HardwareContext): Pórtico com o raio-X e os encoders
+                (padrão: o pórtico padrão)
+        """
+        self.priority = priority
+        self.hardware = hardware if hardware is not None else default_hardware
+        self.records = deque(maxlen=history)
+        self.realtime = False
+        self.count = 0
+        self.rejected = 0       # disparos recusados por sobreposição
+        self._active = None     # registro do pulso em andamento
+        self._pulse_lock = threading.Lock()
+        self._requests = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="exposure", daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self):
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread:
+            self._requests.put(None)
+            thread.join(timeout=1.0)
+
+    def expose(self, duration=EXPOSURE_TIME, metadata=None):
+        """
+        Agenda uma exposição
+
+        Args:
+            duration (float): Duração do pulso (s)
+            metadata (dict): Dados copiados para o registro (ex.: alvo, índice da imagem)
+
+        Returns:
+            Future: Concluído com o registro da exposição
+        """
+        if duration <= 0:
+            raise ValueError("A duração da exposição precisa ser positiva")
+        future = Future()
+        self.start()
+        self._requests.put((duration, dict(metadata or {}), future))
+        return future
+
+    def trigger(self, duration=EXPOSURE_TIME, metadata=None):
+        """
+        Liga o raio-X imediatamente na thread que chama (ex.: callback do
+        encoder na varredura em movimento); o fim do pulso fica com a thread
+        de exposição. Um disparo durante um pulso ainda ativo é recusado (o
+        pulso em andamento não é alterado).
+
+        Returns:
+            Future: Concluído com o registro da exposição, ou com ExposureOverlap
+            se o disparo foi recusado
+        """
+        if duration <= 0:
+            raise ValueError("A duração da exposição precisa ser positiva")
+        future = Future()
+        future.set_running_or_notify_cancel()
+        self.start()
+        try:
+            record = self._begin(duration, dict(metadata or {}))
+        except ExposureOverlap as e:
+            self.rejected += 1
+            future.set_exception(e)
+            return future
+        self._requests.put((duration, record, future))
+        return future
+
+    def _run(self):
+        self.realtime = _raise_priority(self.priority)
+        while True:
+            request = self._requests.get()
+            if request is None:
+                break
+            duration, data, future = request
+            if future.running():
+                # Pulso já iniciado por trigger(): data é o registro parcial
+                record = data
+            elif not future.set_running_or_notify_cancel():
+                continue
+            else:
+                record = None
+            try:
+                if record is None:
+                    record = self._begin(duration, data)
+                resolve(future, self._finish(record))
+            except ExposureOverlap as e:
+                # O pulso ativo (de trigger) continua; só este pedido falha
+                resolve(future, exception=e)
+            except Exception as e:
+                self._end_pulse()
+                resolve(future, exception=e)
+
+    def _begin(self, duration, metadata):
+        with self._pulse_lock:
+            if self._active is not None:
+                raise ExposureOverlap("Exposição pedida durante um pulso em andamento")
+            self.hardware.motors.activate_raio_x(True)
+            start = clock.monotonic()
+            self._active = {
+                "requested_s": duration,
+                "start_time": clock.time(),
+                "start_monotonic": start,
+                "start_position": self.hardware.get_position(),
+                "deadline": start + duration,
+                "realtime": self.realtime,
+                "metadata": metadata,
+            }
+            return self._active
+
+    def _end_pulse(self):
+        with self._pulse_lock:
+            self.hardware.motors.activate_raio_x(False)
+            self._active = None
+
+    def _finish(self, record):
+        _wait_until(record["deadline"])
+
+        self._end_pulse()
+        end = clock.monotonic()
+        record["end_position"] = self.hardware.get_position()
+        record["end_monotonic"] = end
+
+        deadline = record.pop("deadline")
+        record["duration_s"] = end - record["start_monotonic"]
+        record["error_s"] = end - deadline
+        self.count += 1
+        record["id"] = self.count
+        self.records.append(record)
+        return record
+
+    def stats(self):
+        """
+        Estatísticas do erro de duração das últimas exposições
+
+        Returns:
+            dict: count, mean_us, stdev_us, p50_us, p99_us, max_us (erro = fim real - prazo)
+        """
+        errors = sorted(record["error_s"] * 1e6 for record in list(self.records))
+        if not errors:
+            return {"count": 0}
+        n = len(errors)
+        mean = sum(errors) / n
+        return {
+            "count": n,
+            "mean_us": mean,
+            "stdev_us": math.sqrt(sum((e - mean) ** 2 for e in errors) / n),
+            "p50_us": errors[n // 2],
+            "p99_us": errors[min(n - 1, int(n * 0.99))],
+            "max_us": errors[-1],
+        }
@@ -0,0 +1,260 @@
+# flyscan.py
+import csv
+import threading
+
+from controle import clock
+from controle.encoder import default_encoders
+from controle.exposure import EXPOSURE_TIME
+from controle.commands import MotionAborted
+from controle.path_optimizer import AXIS_SPEED
+
+# Duty cycle máximo do eixo X durante a varredura (velocidade constante em
+# malha aberta); sem duty explícito a passada usa o maior duty em que cada
+# exposição termina antes do próximo disparo (ver fly_duty)
+FLY_DUTY = 100.0
+
+# Fração do intervalo entre disparos que uma exposição pode ocupar
+PULSE_MARGIN = 0.8
+
+# Exposição padrão na varredura em movimento (s); o borrão é velocidade * exposição
+FLY_EXPOSURE = 0.05
+
+# Distância antes do primeiro disparo para o eixo atingir a velocidade de regime
+RUNUP = 30
+
+# Distância após o último disparo antes de parar
+OVERRUN = 10
+
+# Tempo máximo de cada linha (s)
+ROW_TIMEOUT = 30.0
+
+
+class PositionCompare:
+    def __init__(self, axis, fire, encoders=None):
+        """
+        Comparação de posição no caminho do encoder: a cada borda a contagem
+        é comparada com o próximo disparo da lista ordenada no sentido do
+        movimento, e 'fire' é chamada assim que o eixo passa pela posição.
+
+        Registrada nos ouvintes de posição dos encoders; executa na thread
+        do callback do encoder.
+
+        Args:
+            axis (str): 'x' ou 'y'
+            fire (callable): fire(trigger, position) chamada em cada disparo
+            encoders (Encoders): Encoders do pórtico (padrão: os do pórtico padrão)
+        """
+        self.axis = axis
+        self.encoders = encoders if encoders is not None else default_encoders
+        self.fire = fire
+        self.triggers = []
+        self.direction = 0
+        self.next = 0
+        self._lock = threading.Lock()
+
+    def arm(self, positions, direction):
+        """
+        Prepara os disparos de uma passada
+
+        Args:
+            positions (list): Posições de disparo (contagens)
+            direction (int): 1 para contagens crescentes, -1 para decrescentes
+        """
+        with self._lock:
+            self.triggers = sorted(positions, reverse=direction < 0)
+            self.direction = direction
+            self.next = 0
+        if self not in self.encoders.listeners:
+            self.encoders.listeners.append(self)
+
+    def disarm(self):
+        if self in self.encoders.listeners:
+            self.encoders.listeners.remove(self)
+        with self._lock:
+            self.direction = 0
+
+    @property
+    def remaining(self):
+        return len(self.triggers) - self.next
+
+    def __call__(self, axis, position):
+        if axis != self.axis or not self.direction:
+            return
+        with self._lock:
+            triggers = self.triggers
+            while self.next < len(triggers) and (position - triggers[self.next]) * self.direction >= 0:
+                trigger = triggers[self.next]
+                self.next += 1
+                self.fire(trigger, position)
+
+
+def fly_duty(spacing, exposure, max_speed=None, max_duty=FLY_DUTY):
+    """
+    Duty da passada para disparos a cada 'spacing' contagens: a velocidade
+    fica abaixo de PULSE_MARGIN * spacing / exposure, estimada como
+    proporcional ao duty (o atrito só a reduz)
+
+    Args:
+        spacing (int): Menor distância entre disparos (None: um disparo só)
+        exposure (float): Duração de cada exposição (s)
+        max_speed (float): Velocidade do eixo X com 100% de duty (contagens/s)
+        max_duty (float): Limite do duty (%)
+
+    Returns:
+        float: Duty cycle (%)
+    """
+    if not spacing:
+        return max_duty
+    max_speed = max_speed or AXIS_SPEED['x']
+    return min(max_duty, 100.0 * PULSE_MARGIN * spacing / exposure / max_speed)
+
+
+def raster(x_start, x_end, y_start, y_end, x_step, y_step):
+    """
+    Grade de posições de imagem
+
+    Returns:
+        list: Linhas (y, [x, ...])
+    """
+    xs = list(range(x_start, x_end + 1, x_step))
+    return [(y, list(xs)) for y in range(y_start, y_end + 1, y_step)]
+
+
+class FlyScan:
+    def __init__(self, controller, duty=None, exposure=FLY_EXPOSURE, fire=None,
+                 runup=RUNUP, overrun=OVERRUN, wait=None, max_speed=None):
+        """
+        Varredura em movimento: cada linha da grade é percorrida pelo eixo X em
+        velocidade constante e as imagens são disparadas pela comparação de
+        posição do encoder, sem parar em cada ponto. As linhas alternam o
+        sentido (serpentina).
+
+        Args:
+            controller (MotorController): Controlador do pórtico
+            duty (float): Duty cycle do eixo X na passada (%); None escolhe pelo
+                espaçamento dos disparos e pela exposição (fly_duty)
+            exposure (float): Duração de cada exposição (s)
+            fire (callable): fire(duration, metadata) que inicia um pulso
+                (padrão: controller.exposure.trigger)
+            runup (int): Distância de aceleração antes do primeiro disparo
+            overrun (int): Distância percorrida depois do último disparo
+            wait (callable): Função que aguarda um período (padrão: clock.sleep)
+            max_speed (float): Velocidade do eixo X com 100% de duty (contagens/s)
+        """
+        self.controller = controller
+        self.duty = duty
+        self.exposure = exposure
+        self.fire = fire or controller.exposure.trigger
+        self.runup = runup
+        self.overrun = overrun
+        self.wait = wait or clock.sleep
+        self.max_speed = max_speed or AXIS_SPEED['x']
+        self.compare = PositionCompare('x', self._on_trigger, controller.hardware.encoders)
+        self.shots = []
+        self._row = None
+
+    def _on_trigger(self, trigger, position):
+        now = clock.monotonic()
+        y = self.controller.get_position()[1]
+        shot = {"row": self._row, "trigger": trigger, "position": position, "y": y,
+                "error": position - trigger, "time": now}
+        self.shots.append(shot)
+        self.fire(self.exposure, {"trigger": (trigger, y), "row": self._row})
+
+    def _wait_for(self, future, timeout=ROW_TIMEOUT):
+        start = clock.monotonic()
+        while not future.done():
+            if clock.monotonic() - start > timeout:
+                raise MotionAborted(f"Comando não concluído em {timeout:.1f} s")
+            self.wait(self.controller.control_period)
+        return future.result()
+
+    def scan_row(self, y, xs, direction, row=None):
+        """
+        Percorre uma linha disparando nas posições 'xs'
+
+        Args:
+            y (int): Posição do eixo Y da linha
+            xs (list): Posições de disparo no eixo X
+            direction (int): 1 para X crescente, -1 para decrescente
+
+        Raises:
+            ValueError: Se na velocidade da passada uma exposição ainda estiver
+                ativa no disparo seguinte
+        """
+        ordered = sorted(xs)
+        spacing = min((b - a for a, b in zip(ordered, ordered[1:])), default=None)
+        duty = self.duty if self.duty is not None else fly_duty(spacing, self.exposure, self.max_speed)
+        if spacing is not None and spacing <= self.max_speed * duty / 100.0 * self.exposure:
+            raise ValueError(f"Com {duty:.0f}% de duty as exposições de {self.exposure:.3f} s se sobrepõem "
+                             f"(disparos a cada {spacing} contagens)")
+
+        controller = self.controller
+        first = min(xs) if direction > 0 else max(xs)
+        last = max(xs) if direction > 0 else min(xs)
+        self._wait_for(controller.go_to_position(first - direction * self.runup, y))
+
+        self._row = row
+        self.compare.arm(xs, direction)
+        saved_speed = controller.manual_speed_x
+        try:
+            self._wait_for(controller.set_mode(manual=True))
+            controller.manual_speed_x = duty
+            # A passada usa o duty constante do modo manual em malha aberta, sem o jog
+            self._wait_for(controller.move_manual('right' if direction > 0 else 'left', held=False))
+            start = clock.monotonic()
+            end = last + direction * self.overrun
+            while (end - controller.get_position()[0]) * direction > 0:
+                if clock.monotonic() - start > ROW_TIMEOUT:
+                    raise MotionAborted(f"Linha Y={y} não concluída em {ROW_TIMEOUT:.1f} s")
+                self.wait(controller.control_period)
+        finally:
+            controller.stop_movement()
+            controller.manual_speed_x = saved_speed
+            self.compare.disarm()
+
+    def run(self, rows):
+        """
+        Executa a varredura
+
+        Args:
+            rows (list): Linhas (y, [x, ...]), ex.: raster(...)
+
+        Returns:
+            list: Disparos (row, trigger, position, y, error, time)
+        """
+        self.shots = []
+        for index, (y, xs) in enumerate(rows):
+            self.scan_row(y, xs, 1 if index % 2 == 0 else -1, index)
+        return self.shots
+
+    def write_shots(self, path):
+        """Grava os disparos em CSV (um por linha, com o erro de posição)"""
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=["row", "trigger", "position", "y", "error", "time"])
+            writer.writeheader()
+            writer.writerows(self.shots)
+
+
+def stop_and_shoot(controller, rows, exposure=EXPOSURE_TIME, settled=None, wait=None):
+    """
+    Referência: para em cada posição, espera acomodar e captura
+
+    Args:
+        settled (callable): Condição de acomodação após a chegada (padrão: chegada do movimento)
+
+    Returns:
+        list: Registros das exposições
+    """
+    wait = wait or clock.sleep
+    records = []
+    for index, (y, xs) in enumerate(rows):
+        for x in (xs if index % 2 == 0 else reversed(xs)):
+            future = controller.go_to_position(x, y)
+            while not future.done():
+                wait(controller.control_period)
+            future.result()
+            while settled is not None and not settled():
+                wait(controller.control_period)
+            records.append(controller.capture_image(exposure, {"target": (x, y)}))
+    return records
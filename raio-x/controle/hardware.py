@@ -0,0 +1,46 @@
+# hardware.py
+from gpio.gpio_config import setup_gpio
+from gpio.encoder_gpio import setup_encoders
+from gpio.motors import Motors, default_motors
+from gpio.limitswitches import LimitSwitches, default_limit_switches
+from controle.encoder import Encoders, default_encoders
+
+
+class HardwareContext:
+    def __init__(self, gpio=None, motors=None, encoders=None, limit_switches=None):
+        """
+        Periféricos de um pórtico (motores, encoders e chaves de fim de curso)
+        sobre um backend GPIO. Injetado no MotorController e no PIDController,
+        permite vários pórticos no mesmo processo, cada um com o seu estado
+        (ex.: pórticos simulados, cada um com o seu FakeGPIO).
+
+        Args:
+            gpio: Backend GPIO (padrão: o RPi.GPIO dos módulos gpio/)
+            motors (Motors): Saídas dos motores (padrão: Motors(gpio))
+            encoders (Encoders): Encoders (padrão: Encoders(gpio))
+            limit_switches (LimitSwitches): Chaves (padrão: LimitSwitches(gpio))
+        """
+        self.gpio = gpio
+        self.motors = motors if motors is not None else Motors(gpio)
+        self.encoders = encoders if encoders is not None else Encoders(gpio)
+        self.limit_switches = limit_switches if limit_switches is not None else LimitSwitches(gpio)
+
+    def setup(self):
+        """Configura os pinos e as interrupções dos encoders como no main()"""
+        setup_gpio(self.gpio)
+        self.limit_switches.setup()
+        setup_encoders(self.gpio)
+        self.encoders.setup_interrupts()
+        self.motors.setup()
+
+    def get_position(self):
+        return self.encoders.get_position()
+
+    def read_limit_switches(self):
+        return self.limit_switches.read()
+
+
+# Pórtico padrão: o mesmo estado usado pelas funções de gpio/motors.py,
+# controle/encoder.py e gpio/limitswitches.py
+default_hardware = HardwareContext(motors=default_motors, encoders=default_encoders,
+                                   limit_switches=default_limit_switches)
@@ -0,0 +1,279 @@
+# jog.py
+from controle import clock
+from gpio.motors import default_motors
+
+# Velocidades em contagens/s e acelerações em contagens/s²; os padrões
+# correspondem ao eixo simulado (400 contagens/s com 100% de duty)
+
+# Velocidade do jog logo depois do passo fino inicial, mantida por
+# SPEEDUP_DELAY segundos (aproximações curtas ficam na velocidade baixa)
+JOG_START_SPEED = 50.0
+SPEEDUP_DELAY = 0.5
+
+# Velocidade máxima alcançada com o botão mantido pressionado
+JOG_MAX_SPEED = 250.0
+
+# Aumento da velocidade alvo enquanto o botão continua pressionado
+JOG_SPEEDUP = 400.0
+
+# Rampas do setpoint de velocidade
+JOG_ACCELERATION = 800.0
+JOG_DECELERATION = 1500.0
+
+# Pressionamentos mais curtos que HOLD_DELAY são toques: o eixo anda FINE_STEP
+# contagens a partir da posição do toque, a no máximo FINE_SPEED
+HOLD_DELAY = 0.3
+FINE_STEP = 4
+FINE_SPEED = 40.0
+FINE_GAIN = 8.0          # Velocidade por contagem de erro no passo fino (1/s)
+FINE_TOLERANCE = 1       # Erro aceito no fim do passo fino (contagens)
+FINE_TIMEOUT = 1.0       # Tempo máximo do passo fino (s)
+
+# Sem novo comando do botão por este tempo o jog é considerado solto
+RELEASE_TIMEOUT = 0.3
+
+# Regulador de velocidade: duty = atrito + FEEDFORWARD * v + PI(erro de velocidade)
+FRICTION_DUTY = 5.0
+FEEDFORWARD = 0.2375     # Duty por contagem/s (%)
+VELOCITY_KP = 0.05
+VELOCITY_KI = 0.5
+INTEGRAL_LIMIT = 20.0    # Limite do termo integral (%)
+
+# Constante de tempo do filtro da estimativa de velocidade do encoder (s)
+SPEED_FILTER = 0.03
+
+# Velocidade abaixo da qual o eixo é considerado parado (contagens/s)
+STOPPED_SPEED = 5.0
+
+AXES = ('x', 'y')
+
+# Direções do move_manual -> (eixo, sentido)
+DIRECTIONS = {'up': ('y', 1), 'down': ('y', -1), 'left': ('x', -1), 'right': ('x', 1)}
+
+# Estados de cada eixo
+IDLE, FINE, JOG, STOPPING = 'idle', 'fine', 'jog', 'stopping'
+
+
+class _AxisJog:
+    def __init__(self):
+        self.state = IDLE
+        self.direction = 0
+        self.held = False
+        self.pressed_at = 0.0
+        self.refreshed_at = 0.0
+        self.fine_target = 0
+        self.setpoint = 0.0      # setpoint de velocidade após a rampa
+        self.integral = 0.0
+        self.speed = 0.0         # estimativa filtrada
+        self.last_position = None
+        self.last_time = None
+
+
+class JogController:
+    def __init__(self, start_speed=JOG_START_SPEED, max_speed=JOG_MAX_SPEED, speedup=JOG_SPEEDUP,
+                 acceleration=JOG_ACCELERATION, deceleration=JOG_DECELERATION,
+                 speedup_delay=SPEEDUP_DELAY, hold_delay=HOLD_DELAY, fine_step=FINE_STEP, fine_speed=FINE_SPEED,
+                 feedforward=FEEDFORWARD, friction=FRICTION_DUTY, kp=VELOCITY_KP, ki=VELOCITY_KI):
+        """
+        Jog em malha fechada de velocidade para o modo manual. Cada
+        pressionamento começa como um passo fino de 'fine_step' contagens;
+        se o botão continuar pressionado depois de 'hold_delay', o eixo passa
+        a seguir a velocidade 'start_speed', que depois de 'speedup_delay'
+        cresce com o tempo pressionado até 'max_speed'. O setpoint segue rampas de aceleração e desaceleração e
+        o duty vem de feedforward mais um PI sobre a velocidade estimada pelo
+        encoder. Ao soltar, o eixo desacelera pela rampa até parar.
+
+        O botão é considerado pressionado enquanto move_manual for repetido
+        (o loop principal repete a cada leitura dos botões); sem repetição
+        por RELEASE_TIMEOUT o jog é solto. Chamadas únicas de move_manual
+        (held=False) continuam em malha aberta.
+
+        Os padrões foram ajustados para o eixo simulado; no pórtico real o jog
+        só é ativado com --jog (main.py).
+
+        Executado pelo loop de controle (MotorController.step) no modo manual.
+
+        Args:
+            start_speed (float): Velocidade ao fim do passo fino (contagens/s)
+            max_speed (float): Velocidade máxima (contagens/s)
+            speedup (float): Crescimento da velocidade alvo pressionado (contagens/s²)
+            speedup_delay (float): Tempo na velocidade inicial antes de acelerar (s)
+            acceleration (float): Rampa de aceleração do setpoint (contagens/s²)
+            deceleration (float): Rampa de desaceleração do setpoint (contagens/s²)
+            hold_delay (float): Duração a partir da qual o toque vira jog contínuo (s)
+            fine_step (int): Deslocamento de um toque (contagens)
+            fine_speed (float): Velocidade máxima do passo fino (contagens/s)
+            feedforward (float): Duty por contagem/s (%)
+            friction (float): Duty para vencer o atrito estático (%)
+            kp (float): Ganho proporcional do regulador de velocidade
+            ki (float): Ganho integral do regulador de velocidade
+        """
+        self.start_speed = start_speed
+        self.max_speed = max_speed
+        self.speedup = speedup
+        self.speedup_delay = speedup_delay
+        self.acceleration = acceleration
+        self.deceleration = deceleration
+        self.hold_delay = hold_delay
+        self.fine_step = fine_step
+        self.fine_speed = fine_speed
+        self.feedforward = feedforward
+        self.friction = friction
+        self.kp = kp
+        self.ki = ki
+        self.axes = {axis: _AxisJog() for axis in AXES}
+        # Chamados com (evento, argumento) a cada press/release/reset vindo de
+        # fora do jog (ex.: gravador de traço)
+        self.listeners = []
+
+    def config(self):
+        """Parâmetros que recriam este jog (gravados no traço; ver controle/trace.py)"""
+        return {"start_speed": self.start_speed, "max_speed": self.max_speed, "speedup": self.speedup,
+                "acceleration": self.acceleration, "deceleration": self.deceleration,
+                "speedup_delay": self.speedup_delay, "hold_delay": self.hold_delay,
+                "fine_step": self.fine_step, "fine_speed": self.fine_speed, "feedforward": self.feedforward,
+                "friction": self.friction, "kp": self.kp, "ki": self.ki}
+
+    @property
+    def active(self):
+        return any(jog.state != IDLE for jog in self.axes.values())
+
+    def press(self, direction, position):
+        """
+        Botão de direção pressionado (ou mantido)
+
+        Args:
+            direction (str): 'up', 'down', 'left' ou 'right'
+            position (tuple): Posição atual dos encoders
+        """
+        for listener in self.listeners:
+            listener('press', direction)
+        axis, sense = DIRECTIONS[direction]
+        jog = self.axes[axis]
+        now = clock.monotonic()
+        jog.refreshed_at = now
+        if jog.held and jog.direction == sense:
+            return
+        # Novo pressionamento (ou inversão): começa pelo passo fino
+        current = position[AXES.index(axis)]
+        jog.held = True
+        jog.direction = sense
+        jog.pressed_at = now
+        jog.fine_target = current + sense * self.fine_step
+        jog.state = FINE
+        jog.integral = 0.0
+
+    def release(self, axis=None):
+        """Botões soltos: o passo fino termina normalmente e o jog desacelera"""
+        for listener in self.listeners:
+            listener('release', axis)
+        self._release(axis)
+
+    def _release(self, axis=None):
+        for name in ([axis] if axis else AXES):
+            jog = self.axes[name]
+            jog.held = False
+            if jog.state == JOG:
+                jog.state = STOPPING
+
+    def reset(self):
+        """Parada imediata (emergência, troca de modo)"""
+        for listener in self.listeners:
+            listener('reset', None)
+        for jog in self.axes.values():
+            jog.state = IDLE
+            jog.held = False
+            jog.setpoint = 0.0
+            jog.integral = 0.0
+
+    def update(self, position, limit_switches, motors=default_motors):
+        """
+        Uma iteração do jog (loop de controle)
+
+        Args:
+            position (tuple): Posição atual dos encoders
+            limit_switches (dict): Estado das chaves de fim de curso
+            motors (Motors): Saídas dos motores do pórtico
+        """
+        now = clock.monotonic()
+        for index, axis in enumerate(AXES):
+            jog = self.axes[axis]
+            current = position[index]
+            dt = self._estimate_speed(jog, current, now)
+            if jog.state == IDLE or dt is None:
+                continue
+
+            if jog.held and now - jog.refreshed_at > RELEASE_TIMEOUT:
+                self._release(axis)
+            if limit_switches[f'{axis}_min' if jog.direction < 0 else f'{axis}_max']:
+                # Fim de curso no sentido do movimento: parada imediata
+                self._stop(motors, axis, jog)
+                continue
+
+            if jog.state == FINE:
+                if jog.held and now - jog.pressed_at >= self.hold_delay:
+                    jog.state = JOG
+                else:
+                    error = jog.fine_target - current
+                    if (abs(error) <= FINE_TOLERANCE and abs(jog.speed) < STOPPED_SPEED) or \
+                            now - jog.pressed_at > self.hold_delay + FINE_TIMEOUT:
+                        # Ainda pressionado: espera parado até virar jog contínuo
+                        held = jog.held
+                        self._stop(motors, axis, jog)
+                        jog.state = FINE if held else IDLE
+                        continue
+                    # O passo fino não tem rampa: vai direto ao comando proporcional
+                    jog.setpoint = max(-self.fine_speed, min(self.fine_speed, FINE_GAIN * error))
+                    self._drive(motors, axis, jog, dt)
+                    continue
+
+            if jog.state == JOG:
+                held_for = max(0.0, now - jog.pressed_at - self.hold_delay - self.speedup_delay)
+                target = jog.direction * min(self.max_speed, self.start_speed + self.speedup * held_for)
+            else:
+                target = 0.0
+            jog.setpoint = self._ramp(jog.setpoint, target, dt)
+            if jog.state == STOPPING and jog.setpoint == 0.0:
+                self._stop(motors, axis, jog)
+                continue
+            self._drive(motors, axis, jog, dt)
+
+    def _estimate_speed(self, jog, position, now):
+        """Atualiza a velocidade filtrada e retorna o intervalo desde a última iteração"""
+        if jog.last_time is None or now <= jog.last_time:
+            jog.last_position, jog.last_time = position, now
+            return None
+        dt = now - jog.last_time
+        raw = (position - jog.last_position) / dt
+        alpha = dt / (SPEED_FILTER + dt)
+        jog.speed += alpha * (raw - jog.speed)
+        jog.last_position, jog.last_time = position, now
+        return dt
+
+    def _ramp(self, setpoint, target, dt):
+        # Acelera quando o alvo tem módulo maior no mesmo sentido; senão desacelera
+        rate = self.acceleration if abs(target) > abs(setpoint) and target * setpoint >= 0 else self.deceleration
+        step = rate * dt
+        if target > setpoint:
+            return min(target, setpoint + step)
+        return max(target, setpoint - step)
+
+    def _drive(self, motors, axis, jog, dt):
+        error = jog.setpoint - jog.speed
+        jog.integral = max(-INTEGRAL_LIMIT, min(INTEGRAL_LIMIT, jog.integral + self.ki * error * dt))
+        duty = self.feedforward * jog.setpoint + self.kp * error + jog.integral
+        if jog.setpoint:
+            duty += self.friction if jog.setpoint > 0 else -self.friction
+        if duty == 0:
+            motors.set_speed(axis, 0)
+            motors.set_direction(axis, 0)
+            return
+        motors.set_direction(axis, 1 if duty > 0 else -1)
+        motors.set_speed(axis, min(100.0, abs(duty)))
+
+    def _stop(self, motors, axis, jog):
+        motors.set_speed(axis, 0)
+        motors.set_direction(axis, 0)
+        jog.state = IDLE
+        jog.setpoint = 0.0
+        jog.integral = 0.0
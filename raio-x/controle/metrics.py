@@ -0,0 +1,237 @@
+# metrics.py
+import time
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from gpio import limitswitches
+
+# Porta padrão do endpoint local de métricas
+METRICS_PORT = 9108
+
+# Motores e tipos de comando notificados pelos ouvintes dos motores
+MOTORS = ('x', 'y')
+COMMAND_KINDS = ('direction', 'speed')
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Baldes do histograma do período do loop: índices dos baldes do LoopProfiler
+# (limite 2^i ns), de ~131 µs a ~1,07 s
+PERIOD_BUCKETS = range(17, 31)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value):
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+class _Exposition:
+    """Monta o texto no formato de exposição do Prometheus"""
+
+    def __init__(self):
+        self.lines = []
+
+    def metric(self, name, kind, help_text, samples, suffix=""):
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            self.lines.append(f"{name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+
+    def text(self):
+        return "\n".join(self.lines) + "\n"
+
+
+class MetricsCollector:
+    def __init__(self, controller, sensor_monitor=None, interval=1.0):
+        """
+        Monta periodicamente, em uma thread própria, um instantâneo das
+        métricas do pórtico e do sensor ambiental. As requisições HTTP apenas
+        devolvem o último instantâneo: nunca acessam GPIO ou I2C nem esperam
+        pelo MotorController.
+
+        Args:
+            controller (MotorController): Controlador observado
+            sensor_monitor (SensorMonitor): Leituras em cache do BMP280 (opcional)
+            interval (float): Intervalo entre instantâneos (s)
+        """
+        self.controller = controller
+        self.sensor_monitor = sensor_monitor
+        self.interval = interval
+        self.limit_hits = Counter()
+        # Chaves criadas aqui: o ouvinte (thread de controle) só incrementa e
+        # collect() pode percorrer o Counter sem que ele mude de tamanho
+        self.gpio_writes = Counter({(motor, kind): 0 for motor in MOTORS for kind in COMMAND_KINDS})
+        self.snapshot = b""
+        self.snapshot_time = None
+        self._limit_states = {}
+        self._thread = None
+        self._running = False
+
+    # Contadores alimentados pelos ouvintes de gpio/ (apenas incrementos)
+
+    def _on_limits(self, states):
+        for name, active in states.items():
+            if active and not self._limit_states.get(name):
+                self.limit_hits[name] += 1
+            self._limit_states[name] = active
+
+    def _on_command(self, motor, kind, value):
+        self.gpio_writes[(motor, kind)] += 1
+
+    def start(self):
+        hardware = self.controller.hardware
+        hardware.limit_switches.listeners.append(self._on_limits)
+        hardware.motors.listeners.append(self._on_command)
+        self.collect()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._running = False
+        if self._thread:
+            self._thread.join(timeout=self.interval + 1.0)
+            self._thread = None
+        hardware = self.controller.hardware
+        for listeners, callback in ((hardware.limit_switches.listeners, self._on_limits),
+                                    (hardware.motors.listeners, self._on_command)):
+            if callback in listeners:
+                listeners.remove(callback)
+
+    def _run(self):
+        while self._running:
+            time.sleep(self.interval)
+            self.collect()
+
+    def collect(self):
+        """Monta um novo instantâneo (texto de exposição já codificado)"""
+        controller = self.controller
+        pos_x, pos_y = controller.hardware.get_position()
+        profile = controller.profiler.snapshot()
+        out = _Exposition()
+
+        out.metric("gantry_position_counts", "gauge", "Posição do encoder (contagens)",
+                   [({"axis": "x"}, pos_x), ({"axis": "y"}, pos_y)])
+        out.metric("gantry_speed_counts_per_second", "gauge", "Velocidade medida do eixo",
+                   [({"axis": "x"}, controller.speed_x), ({"axis": "y"}, controller.speed_y)])
+        out.metric("gantry_manual_mode", "gauge", "1 em modo manual, 0 em modo automático",
+                   [({}, 1 if controller.manual_mode else 0)])
+        out.metric("gantry_calibrated", "gauge", "1 se o pórtico foi calibrado",
+                   [({}, 1 if controller.calibrated else 0)])
+        out.metric("gantry_limit_hits_total", "counter", "Acionamentos das chaves de fim de curso",
+                   [({"switch": name}, self.limit_hits[name]) for name in limitswitches.LIMIT_SWITCHES])
+        out.metric("gantry_gpio_writes_total", "counter", "Comandos escritos nos motores",
+                   [({"motor": motor, "kind": kind}, n) for (motor, kind), n in sorted(self.gpio_writes.items())])
+        out.metric("gantry_control_overruns_total", "counter", "Iterações do loop de controle atrasadas",
+                   [({}, profile["overruns"])])
+
+        stages = profile["stages"]
+        if stages["tick"]["count"]:
+            tick = stages["tick"]
+            out.metric("gantry_control_tick_seconds", "summary", "Duração de uma iteração do loop de controle",
+                       [({"quantile": "0.5"}, tick["p50_us"] / 1e6),
+                        ({"quantile": "0.9"}, tick["p90_us"] / 1e6),
+                        ({"quantile": "0.99"}, tick["p99_us"] / 1e6)])
+            out.lines.append(f"gantry_control_tick_seconds_count {tick['count']}")
+            out.lines.append(f"gantry_control_tick_seconds_sum {_format_value(tick['mean_us'] * tick['count'] / 1e6)}")
+
+        if stages["period"]["count"]:
+            period = stages["period"]
+            samples = []
+            for index in PERIOD_BUCKETS:
+                bound = 1 << index
+                samples.append(({"le": repr(bound / 1e9)},
+                                sum(n for upper, n in period["buckets"].items() if upper <= bound)))
+            samples.append(({"le": "+Inf"}, period["count"]))
+            out.metric("gantry_control_period_seconds", "histogram",
+                       "Intervalo entre o início de iterações consecutivas do loop de controle",
+                       samples, suffix="_bucket")
+            out.lines.append(f"gantry_control_period_seconds_count {period['count']}")
+            out.lines.append(f"gantry_control_period_seconds_sum {_format_value(period['mean_us'] * period['count'] / 1e6)}")
+
+        exposure = controller.exposure.stats()
+        out.metric("gantry_exposures_total", "counter", "Exposições de raio-X realizadas",
+                   [({}, controller.exposure.count)])
+        if exposure["count"]:
+            out.metric("gantry_exposure_error_seconds", "summary",
+                       "Atraso do fim da exposição em relação ao prazo (últimas exposições)",
+                       [({"quantile": "0.5"}, exposure["p50_us"] / 1e6),
+                        ({"quantile": "0.99"}, exposure["p99_us"] / 1e6),
+                        ({"quantile": "1"}, exposure["max_us"] / 1e6)])
+
+        monitor = self.sensor_monitor
+        if monitor is not None:
+            latest = monitor.latest
+            if latest is not None:
+                out.metric("bmp280_temperature_celsius", "gauge", "Última temperatura lida",
+                           [({}, latest["temperature"])])
+                out.metric("bmp280_pressure_hpa", "gauge", "Última pressão lida",
+                           [({}, latest["pressure"])])
+                out.metric("bmp280_last_read_timestamp_seconds", "gauge", "Instante da última leitura",
+                           [({}, latest["timestamp"])])
+            out.metric("bmp280_simulation_mode", "gauge", "1 se o sensor está gerando valores simulados",
+                       [({}, 1 if getattr(monitor.sensor, "simulation_mode", False) else 0)])
+            out.metric("bmp280_reads_total", "counter", "Leituras do sensor", [({}, monitor.reads)])
+            out.metric("bmp280_errors_total", "counter", "Falhas de leitura do sensor",
+                       [({}, monitor.sensor_errors())])
+
+        self.snapshot = out.text().encode("utf-8")
+        self.snapshot_time = time.time()
+        return self.snapshot
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.server.collector.snapshot
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MetricsServer:
+    def __init__(self, collector, host="127.0.0.1", port=METRICS_PORT):
+        """
+        Endpoint HTTP local (GET /metrics) que serve o último instantâneo do
+        MetricsCollector
+
+        Args:
+            collector (MetricsCollector): Fonte dos instantâneos
+            host (str): Endereço de escuta (padrão: apenas local)
+            port (int): Porta (0 escolhe uma porta livre)
+        """
+        self.collector = collector
+        self.httpd = ThreadingHTTPServer((host, port), _MetricsHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.collector = collector
+        self._thread = None
+
+    @property
+    def address(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread:
+            self._thread.join()
@@ -1,13 +1,35 @@
-import time
+import logging
 import threading
-from gpio.motors import setup_motors, set_motor_direction, set_motor_speed, stop_motors, activate_raio_x
-from gpio.limitswitches import read_limit_switches
-from controle.encoder import get_position, reset_position
+from time import perf_counter_ns
+from controle import clock
+from controle import profiling
+from controle.backlash import calibrate_backlash_steps
+from controle.exposure import ExposureController, EXPOSURE_TIME
+from controle.hardware import default_hardware
 from controle.pid import PIDController
+from controle.commands import (CommandQueue, Command, MOVE, MANUAL, MODE, STOP, CALIBRATE, resolve,
+                               MotionAborted, MotionPreempted, LimitReached, EmergencyStop)
+
+# Registros do loop de controle: com log_queue.configure_logging (i2c/) a
+# chamada só enfileira o registro, sem E/S nesta thread
+logger = logging.getLogger(__name__)
+
+# Tempo máximo para cada eixo chegar ao fim de curso mínimo na calibração (s)
+HOMING_TIMEOUT = 60.0
+
+# Folga no fim das esperas das rotinas (s): os instantes de um traço têm
+# resolução de 1 µs e o replay precisa retomar a rotina na mesma iteração
+ROUTINE_SLACK = 1e-5
 
 class MotorController:
-    def __init__(self):
-        self.pid = PIDController()
+    def __init__(self, pid=None, hardware=None):
+        # Motores, encoders e chaves do pórtico (ver controle/hardware.py)
+        self.hardware = hardware if hardware is not None else default_hardware
+        
+        # Controlador de posição (padrão: PIDController; ver também ScheduledPIDController),
+        # sempre ligado ao hardware deste controlador
+        self.pid = pid if pid is not None else PIDController(hardware=self.hardware)
+        self.pid.hardware = self.hardware
         self.running = False
         self.control_thread = None
         self.manual_mode = True  # Iniciar em modo manual
@@ -20,59 +42,305 @@ class MotorController:
         
         # Variáveis para cálculo de velocidade
         self.last_pos_x, self.last_pos_y = 0, 0
-        self.last_time = time.time()
+        self.last_time = clock.time()
         self.speed_x, self.speed_y = 0, 0  # em unidades/segundo
         
+        # Período do loop de controle em segundos
+        self.control_period = 0.01
+        
+        # Gravador de traços opcional (ver controle/trace.py)
+        self.trace = None
+        
+        # Histogramas de tempo de cada estágio do loop (ver controle/profiling.py)
+        self.profiler = profiling.LoopProfiler(self.control_period)
+        
+        # Fila de comandos consumida pelo loop de controle, movimento em andamento
+        # e rotina passo a passo em andamento (calibração)
+        self.commands = CommandQueue()
+        self.active_move = None
+        self.active_routine = None
+        
         # Fator de conversão de unidades do encoder para metros
         # Este valor deve ser calibrado para seu sistema específico
         self.units_to_meters = 0.001  # exemplo: 1000 unidades = 1 metro
+        
+        # Compensação térmica opcional da escala (ver controle/thermal.py)
+        self.thermal = None
+        
+        # Mapa de calibração não linear opcional por eixo (ver controle/calibration_map.py)
+        self.calibration = None
+        
+        # Pulsos de exposição em thread própria (ver controle/exposure.py)
+        self.exposure = ExposureController(hardware=self.hardware)
+        
+        # Estado publicado para o processo de vigilância (ver controle/watchdog.py)
+        self.shared_state = None
+        
+        # Jog em malha fechada de velocidade no modo manual (ver controle/jog.py);
+        # sem ele o modo manual aplica manual_speed_x/y em malha aberta
+        self.jog = None
     
     def start(self):
         """Inicia o controlador de motor"""
-        setup_motors()
+        self.hardware.motors.setup()
         self.running = True
         self.control_thread = threading.Thread(target=self._control_loop)
         self.control_thread.daemon = True
         self.control_thread.start()
+        self.exposure.start()
     
     def stop(self):
         """Para o controlador de motor"""
         self.running = False
         if self.control_thread:
             self.control_thread.join(timeout=1.0)
-        stop_motors()
+        self.hardware.motors.stop()
+        self.exposure.stop()
+        
+        # Comandos que não serão mais executados
+        self.commands.flush(MotionAborted("Controlador parado"))
+        self._process_commands()
     
     def _control_loop(self):
         """Loop principal de controle dos motores"""
         while self.running:
-            # Verificar chaves de fim de curso
-            limit_switches = read_limit_switches()
+            self.step()
             
-            # Calcular velocidade atual
-            self._update_speed()
-            
-            if self.manual_mode:
-                # No modo manual, o PID não é usado
-                # O controle é feito diretamente pelos botões
-                pass
-            else:
-                # No modo automático, atualizar o PID
-                self.pid.update()
-                
-                # Verificar se chegou na posição desejada
-                if self.pid.is_position_reached():
-                    stop_motors()
+            # Pequena pausa para não sobrecarregar a CPU
+            clock.sleep(self.control_period)
+    
+    def step(self):
+        """Executa uma iteração do loop de controle (usado também pela simulação)"""
+        profiler = self.profiler
+        start = t0 = perf_counter_ns()
+        
+        # Corte do watchdog durante um travamento do loop: o estado seguro é
+        # assumido antes de qualquer acionamento nesta iteração
+        cut = self.shared_state is not None and self.shared_state.is_cut()
+        if cut:
+            self._watchdog_cut()
+        
+        # Comandos enviados por outras threads são aplicados aqui, antes do
+        # início da iteração (o traço registra o modo e o setpoint resultantes)
+        self._process_commands()
+        t1 = perf_counter_ns()
+        profiler.record(profiling.COMMANDS, t1 - t0)
+        
+        if self.trace:
+            self.trace.tick_start(self)
+        
+        # Verificar chaves de fim de curso
+        t0 = perf_counter_ns()
+        limit_switches = self.hardware.read_limit_switches()
+        t1 = perf_counter_ns()
+        profiler.record(profiling.LIMITS, t1 - t0)
+        
+        # Calcular velocidade atual
+        self._update_speed()
+        t0 = perf_counter_ns()
+        profiler.record(profiling.SPEED, t0 - t1)
+        
+        if cut or self.commands.emergency_pending:
+            # Corte do watchdog, ou parada de emergência pedida por outra thread
+            # e ainda não processada: nada é acionado nesta iteração
+            self.hardware.motors.stop()
+        elif self.active_routine is not None:
+            # Rotina de calibração: ela comanda os motores e trata os fins de curso
+            self._advance_routine()
+        elif self.manual_mode:
+            # No modo manual, o PID não é usado
+            # O controle é feito diretamente pelos botões (ou pelo jog)
+            if self.jog is not None:
+                self.jog.update(self.hardware.get_position(), limit_switches, self.hardware.motors)
+        else:
+            # No modo automático, atualizar o PID
+            self.pid.update()
             
-            # Verificar limites de segurança
+            # Verificar se chegou na posição desejada
+            if self.pid.is_position_reached():
+                self.hardware.motors.stop()
+        if self.commands.emergency_pending:
+            # A emergência pode ter chegado durante o acionamento acima
+            self.hardware.motors.stop()
+        t1 = perf_counter_ns()
+        profiler.record(profiling.PID, t1 - t0)
+        
+        # Verificar limites de segurança (a calibração precisa sair dos fins de curso)
+        if self.active_routine is None:
             self._check_safety_limits(limit_switches)
-            
-            # Pequena pausa para não sobrecarregar a CPU
-            time.sleep(0.01)
+        
+        # Concluir o movimento em andamento (chegada, fim de curso ou tempo limite)
+        self._check_active_move(limit_switches)
+        t0 = perf_counter_ns()
+        profiler.record(profiling.SAFETY, t0 - t1)
+        
+        # Sinal de vida para o watchdog; um corte feito durante esta iteração é
+        # tratado aqui mesmo (os anteriores já foram tratados no início)
+        if self.shared_state is not None and self.shared_state.publish(self, self.hardware.get_position()):
+            self._watchdog_cut()
+        
+        if self.trace:
+            self.trace.tick_end(self)
+        profiler.tick(start, perf_counter_ns())
+    
+    def _submit(self, command):
+        """
+        Envia um comando ao loop de controle. Sem o loop em execução, a fila é
+        processada imediatamente na thread chamadora.
+        
+        Returns:
+            Future: Concluído quando o comando terminar
+        """
+        future = self.commands.submit(command)
+        if not self.running:
+            self._process_commands()
+        return future
+    
+    def _process_commands(self):
+        """Aplica os comandos da fila (executado pela thread de controle)"""
+        preempt, emergency = self.commands.take_flags()
+        if emergency is not None:
+            self._abort_active(emergency)
+            self.manual_mode = True
+            if self.jog is not None:
+                self.jog.reset()
+            self.hardware.motors.stop()
+        elif preempt:
+            self._abort_active(MotionPreempted("Substituído por um novo comando"))
+        
+        # Um movimento ou rotina em andamento bloqueia os comandos seguintes da fila
+        while self.active_move is None and self.active_routine is None:
+            command = self.commands.pop()
+            if command is None:
+                break
+            self._execute(command)
+    
+    def _execute(self, command):
+        """Aplica um comando; movimentos ficam ativos até chegarem ao destino"""
+        try:
+            if command.kind == MOVE:
+                self.manual_mode = False
+                path = [command.args]
+                if self.pid.backlash is not None:
+                    path = self.pid.backlash.approach_path(self.hardware.get_position(), command.args)
+                self.pid.set_target_position(*path[0])
+                command.waypoints = path[1:]
+                command.started_at = clock.monotonic()
+                self.active_move = command
+                return
+            if command.kind == CALIBRATE:
+                # A calibração comanda os motores em malha aberta: modo manual,
+                # sem PID nem jog, também depois do fim
+                self._apply_mode(True)
+                if self.trace:
+                    self.trace.calibration_start(*command.args)
+                command.steps = self._calibration_steps(*command.args)
+                command.resume_at = clock.monotonic()
+                self.active_routine = command
+                return
+            if command.kind == MODE:
+                self._apply_mode(*command.args)
+            elif command.kind == MANUAL:
+                self._apply_manual(*command.args)
+            elif command.kind == STOP:
+                if self.jog is not None and self.jog.active:
+                    # Jog em andamento: desacelera pela rampa em vez de cortar
+                    self.jog.release()
+                else:
+                    self.hardware.motors.stop()
+            resolve(command.future)
+        except Exception as e:
+            resolve(command.future, exception=e)
+    
+    def _abort_active(self, exception):
+        """Interrompe o movimento (ou a rotina) em andamento e o restante da sua sequência"""
+        routine = self.active_routine
+        if routine is not None:
+            self.active_routine = None
+            routine.steps.close()
+            self.hardware.motors.stop()
+            resolve(routine.future, exception=exception)
+        move = self.active_move
+        if move is None:
+            return
+        self.active_move = None
+        resolve(move.future, exception=exception)
+        if move.group is not None:
+            self.commands.cancel_group(move.group, exception)
+    
+    def _advance_routine(self):
+        """Executa o próximo passo da rotina em andamento quando a sua espera termina"""
+        routine = self.active_routine
+        if clock.monotonic() < routine.resume_at - ROUTINE_SLACK:
+            return
+        try:
+            delay = routine.steps.send(None)
+        except StopIteration as done:
+            self.active_routine = None
+            resolve(routine.future, done.value)
+            return
+        except Exception as e:
+            self.active_routine = None
+            self.hardware.motors.stop()
+            resolve(routine.future, exception=e)
+            return
+        routine.resume_at = clock.monotonic() + (delay or 0.0)
+    
+    def _check_active_move(self, limit_switches):
+        """Conclui o future do movimento em andamento quando ele termina"""
+        move = self.active_move
+        if move is None:
+            return
+        if self.manual_mode:
+            self._abort_active(MotionAborted("Modo manual ativado durante o movimento"))
+            return
+        
+        pos_x, pos_y = self.hardware.get_position()
+        if self.pid.is_position_reached():
+            if move.waypoints:
+                self.pid.set_target_position(*move.waypoints.pop(0))
+                return
+            self.active_move = None
+            resolve(move.future, (pos_x, pos_y))
+            return
+        
+        # Fim de curso acionado no sentido do alvo: o eixo não pode chegar
+        for axis, position, setpoint in (('x', pos_x, self.pid.x_setpoint), ('y', pos_y, self.pid.y_setpoint)):
+            if ((limit_switches[f'{axis}_min'] and setpoint < position) or
+                    (limit_switches[f'{axis}_max'] and setpoint > position)):
+                self._abort_active(LimitReached(f"Fim de curso do eixo {axis.upper()} atingido"))
+                return
+        
+        if move.timeout is not None and clock.monotonic() - move.started_at > move.timeout:
+            self._abort_active(MotionAborted(f"Movimento não concluído em {move.timeout:.1f} s"))
+    
+    def _watchdog_cut(self):
+        """Estado seguro após um corte do watchdog (executado pelo loop de controle)"""
+        self.hardware.motors.stop()
+        self.commands.flush(EmergencyStop("Motores cortados pelo watchdog"))
+        self._process_commands()
+        self.shared_state.acknowledge()
+        logger.warning("Motores cortados pelo watchdog (travamentos registrados: %d)",
+                       self.shared_state.watchdog()["trips"])
+    
+    def emergency_stop(self):
+        """
+        Parada de emergência: para os motores imediatamente (na thread chamadora),
+        descarta os comandos pendentes e cancela o movimento em andamento. Até
+        a thread de controle processar a emergência, step() não aciona os
+        motores; a segunda parada cobre uma iteração que acionou antes de ver o
+        pedido.
+        """
+        self.hardware.motors.stop()
+        self.commands.flush()
+        self.hardware.motors.stop()
+        if not self.running:
+            self._process_commands()
     
     def _update_speed(self):
         """Atualiza o cálculo de velocidade baseado na mudança de posição"""
-        current_time = time.time()
-        current_pos_x, current_pos_y = get_position()
+        current_time = clock.time()
+        current_pos_x, current_pos_y = self.hardware.get_position()
         
         # Calcular o tempo decorrido
         dt = current_time - self.last_time
@@ -87,37 +355,38 @@ class MotorController:
     
     def _check_safety_limits(self, limit_switches):
         """Verifica os limites de segurança e para os motores se necessário"""
+        motors = self.hardware.motors
         if limit_switches['x_min'] or limit_switches['x_max']:
             # Parar motor X se atingiu limite
-            set_motor_speed('x', 0)
+            motors.set_speed('x', 0)
             
             # Se estiver no limite mínimo, não permitir movimento para esquerda
             if limit_switches['x_min']:
                 # Permitir apenas movimento para direita
                 if self.get_motor_direction('x') < 0:
-                    set_motor_direction('x', 0)
+                    motors.set_direction('x', 0)
             
             # Se estiver no limite máximo, não permitir movimento para direita
             if limit_switches['x_max']:
                 # Permitir apenas movimento para esquerda
                 if self.get_motor_direction('x') > 0:
-                    set_motor_direction('x', 0)
+                    motors.set_direction('x', 0)
         
         if limit_switches['y_min'] or limit_switches['y_max']:
             # Parar motor Y se atingiu limite
-            set_motor_speed('y', 0)
+            motors.set_speed('y', 0)
             
             # Se estiver no limite mínimo, não permitir movimento para baixo
             if limit_switches['y_min']:
                 # Permitir apenas movimento para cima
                 if self.get_motor_direction('y') < 0:
-                    set_motor_direction('y', 0)
+                    motors.set_direction('y', 0)
             
             # Se estiver no limite máximo, não permitir movimento para cima
             if limit_switches['y_max']:
                 # Permitir apenas movimento para baixo
                 if self.get_motor_direction('y') > 0:
-                    set_motor_direction('y', 0)
+                    motors.set_direction('y', 0)
     
     def get_motor_direction(self, motor):
         """
@@ -128,59 +397,111 @@ class MotorController:
         # Na prática, você precisaria armazenar o estado atual da direção
         return 0  # Placeholder
     
-    def move_manual(self, direction):
+    def move_manual(self, direction, held=True):
         """
         Move os motores manualmente na direção especificada
         
         Args:
             direction (str): 'up', 'down', 'left', 'right' ou 'stop'
+            held (bool): Comando repetido enquanto o botão está pressionado (usa
+                o jog, se ativo); False move em malha aberta até stop_movement
+            
+        Returns:
+            Future: Concluído quando o comando for aplicado pelo loop de controle
         """
+        return self._submit(Command(MANUAL, (direction, held)))
+    
+    def _apply_manual(self, direction, held=True):
         if not self.manual_mode:
             return
         
+        if self.jog is not None:
+            if direction == 'stop' and self.jog.active:
+                self.jog.release()
+                return
+            if held and direction != 'stop':
+                self.jog.press(direction, self.hardware.get_position())
+                return
+            # Comando único em malha aberta: o jog deixa de atuar
+            self.jog.reset()
+        
+        motors = self.hardware.motors
         if direction == 'up':
-            set_motor_direction('y', 1)
-            set_motor_speed('y', self.manual_speed_y)
+            motors.set_direction('y', 1)
+            motors.set_speed('y', self.manual_speed_y)
         elif direction == 'down':
-            set_motor_direction('y', -1)
-            set_motor_speed('y', self.manual_speed_y)
+            motors.set_direction('y', -1)
+            motors.set_speed('y', self.manual_speed_y)
         elif direction == 'left':
-            set_motor_direction('x', -1)
-            set_motor_speed('x', self.manual_speed_x)
+            motors.set_direction('x', -1)
+            motors.set_speed('x', self.manual_speed_x)
         elif direction == 'right':
-            set_motor_direction('x', 1)
-            set_motor_speed('x', self.manual_speed_x)
+            motors.set_direction('x', 1)
+            motors.set_speed('x', self.manual_speed_x)
         elif direction == 'stop':
-            stop_motors()
+            motors.stop()
     
     def stop_movement(self):
         """Para o movimento de ambos os motores"""
-        stop_motors()
+        return self._submit(Command(STOP))
     
     def set_mode(self, manual=True):
-        """Define o modo de operação (manual ou automático)"""
+        """
+        Define o modo de operação (manual ou automático)
+        
+        Returns:
+            Future: Concluído quando o modo for aplicado pelo loop de controle
+        """
+        return self._submit(Command(MODE, (manual,)))
+    
+    def _apply_mode(self, manual):
         self.manual_mode = manual
+        if self.jog is not None:
+            self.jog.reset()
         if manual:
             # Parar motores ao mudar para modo manual
-            stop_motors()
+            self.hardware.motors.stop()
         else:
             # Ao mudar para modo automático, manter a posição atual como alvo
-            pos_x, pos_y = get_position()
+            pos_x, pos_y = self.hardware.get_position()
             self.pid.set_target_position(pos_x, pos_y)
     
-    def go_to_position(self, x=None, y=None):
+    def go_to_position(self, x=None, y=None, preempt=True, timeout=None):
         """
         Move para uma posição específica usando o controlador PID
         
         Args:
             x (int): Posição alvo no eixo X
             y (int): Posição alvo no eixo Y
+            preempt (bool): Interrompe o movimento atual e descarta os movimentos
+                pendentes (False enfileira o movimento após os demais)
+            timeout (float): Tempo máximo do movimento em segundos
+            
+        Returns:
+            Future: Resultado (x, y) na chegada; exceção MotionAborted se o
+            movimento for interrompido
+        """
+        return self._submit(Command(MOVE, (x, y), preempt=preempt, timeout=timeout))
+    
+    def move_sequence(self, points, preempt=False, timeout=None):
         """
-        # Mudar para modo automático
-        self.manual_mode = False
+        Enfileira um movimento de vários segmentos. Se um segmento for
+        interrompido, os seguintes da mesma sequência são cancelados.
         
-        # Definir posição alvo
-        self.pid.set_target_position(x, y)
+        Args:
+            points (list): Posições (x, y) a visitar em ordem
+            preempt (bool): Interrompe o movimento atual antes de começar
+            timeout (float): Tempo máximo de cada segmento em segundos
+            
+        Returns:
+            list: Um future por segmento
+        """
+        group = object()
+        futures = []
+        for index, (x, y) in enumerate(points):
+            command = Command(MOVE, (x, y), preempt=preempt and index == 0, group=group, timeout=timeout)
+            futures.append(self._submit(command))
+        return futures
     
     def go_to_saved_position(self, position_number):
         """
@@ -191,7 +512,7 @@ class MotorController:
         """
         if 1 <= position_number <= 4 and position_number in self.saved_positions:
             x, y = self.saved_positions[position_number]
-            self.go_to_position(x, y)
+            return self.go_to_position(x, y)
     
     def save_current_position(self, position_number):
         """
@@ -201,12 +522,45 @@ class MotorController:
             position_number (int): Número da posição (1-4)
         """
         if 1 <= position_number <= 4:
-            pos_x, pos_y = get_position()
+            pos_x, pos_y = self.hardware.get_position()
             self.saved_positions[position_number] = (pos_x, pos_y)
     
-    def calibrate(self):
+    def begin_calibration(self, measure_backlash=False, approach=None):
+        """
+        Envia a calibração ao loop de controle, que a executa passo a passo sem
+        deixar de publicar o estado (ver calibrate)
+        
+        Returns:
+            Future: Posição (x, y) ao final da calibração; exceção MotionAborted
+            se ela for interrompida
         """
-        Realiza a calibração dos motores usando os sensores de fim de curso
+        return self._submit(Command(CALIBRATE, (measure_backlash, approach)))
+    
+    def calibrate(self, measure_backlash=False, approach=None):
+        """
+        Realiza a calibração dos motores usando os sensores de fim de curso e
+        aguarda o seu fim. Sem a thread de controle, as iterações do loop são
+        executadas aqui.
+        
+        Args:
+            measure_backlash (bool): Medir a folga dos eixos e ativar a compensação
+            approach (str): Lado de aproximação dos alvos ('+', '-' ou None) com a compensação
+        
+        Returns:
+            tuple: Posição (x, y) ao final da calibração
+        """
+        future = self.begin_calibration(measure_backlash, approach)
+        if self.control_thread is None:
+            while not future.done():
+                self.step()
+                clock.sleep(self.control_period)
+        return future.result()
+    
+    def _calibration_steps(self, measure_backlash, approach):
+        """
+        Rotina de calibração executada pelo loop de controle (_advance_routine):
+        cada valor gerado é a espera em segundos até o próximo passo (0: na
+        próxima iteração)
         """
         # Implementação básica de calibração
         # 1. Mover para os limites mínimos
@@ -214,60 +568,116 @@ class MotorController:
         # 3. Mover para o centro
         
         self.calibrated = False
+        motors = self.hardware.motors
         
-        # Mover para o limite mínimo do eixo X
-        set_motor_direction('x', -1)
-        set_motor_speed('x', 30)  # Velocidade reduzida para calibração
-        
-        # Aguardar até atingir o limite
-        while not read_limit_switches()['x_min'] and self.running:
-            time.sleep(0.1)
-        
-        # Parar o motor X
-        set_motor_speed('x', 0)
-        
-        # Mover para o limite mínimo do eixo Y
-        set_motor_direction('y', -1)
-        set_motor_speed('y', 30)
-        
-        # Aguardar até atingir o limite
-        while not read_limit_switches()['y_min'] and self.running:
-            time.sleep(0.1)
-        
-        # Parar o motor Y
-        set_motor_speed('y', 0)
+        # Mover para o limite mínimo de cada eixo, um de cada vez
+        for axis in ('x', 'y'):
+            motors.set_direction(axis, -1)
+            motors.set_speed(axis, 30)  # Velocidade reduzida para calibração
+            
+            # Aguardar até atingir o limite
+            started = clock.monotonic()
+            while not self.hardware.read_limit_switches()[f'{axis}_min']:
+                if clock.monotonic() - started > HOMING_TIMEOUT:
+                    raise MotionAborted(f"Fim de curso mínimo do eixo {axis.upper()} não atingido "
+                                        f"em {HOMING_TIMEOUT:.0f} s")
+                yield 0
+            
+            # Parar o motor
+            motors.set_speed(axis, 0)
         
         # Resetar os encoders nesta posição
-        reset_position()
+        self.hardware.encoders.reset()
         
         # Mover um pouco para o centro para sair dos sensores de fim de curso
-        set_motor_direction('x', 1)
-        set_motor_speed('x', 30)
-        time.sleep(1)  # Mover por 1 segundo
-        
-        set_motor_direction('y', 1)
-        set_motor_speed('y', 30)
-        time.sleep(1)  # Mover por 1 segundo
+        for axis in ('x', 'y'):
+            motors.set_direction(axis, 1)
+            motors.set_speed(axis, 30)
+            yield 1.0  # Mover por 1 segundo
         
         # Parar os motores
-        stop_motors()
+        motors.stop()
+        
+        # Medir a folga aproximando-se dos dois lados
+        if measure_backlash:
+            self.pid.backlash = yield from calibrate_backlash_steps(approach=approach, hardware=self.hardware)
         
         self.calibrated = True
         
         # Definir a posição atual como alvo para o PID
-        pos_x, pos_y = get_position()
+        pos_x, pos_y = self.hardware.get_position()
         self.pid.set_target_position(pos_x, pos_y)
+        return pos_x, pos_y
+    
+    def capture_image(self, duration=EXPOSURE_TIME, metadata=None):
+        """
+        Ativa o raio-X para capturar uma imagem e aguarda o fim da exposição
+        
+        Args:
+            duration (float): Duração da exposição (s)
+            metadata (dict): Dados copiados para o registro da exposição
+        
+        Returns:
+            dict: Registro da exposição (ver ExposureController)
+        """
+        return self.exposure.expose(duration, metadata).result()
+    
+    def meters_per_unit(self, axis='x'):
+        """
+        Fator de conversão de unidades do encoder para metros na posição atual
+        do eixo, com o mapa de calibração e a compensação térmica (usa apenas a
+        temperatura em cache)
+        """
+        if self.calibration is None:
+            factor = self.units_to_meters
+            if self.thermal is not None:
+                factor *= self.thermal.scale()
+            return factor
+        position = self.hardware.get_position()[0 if axis == 'x' else 1]
+        factor = self.calibration[axis].meters_per_count(position)
+        if self.thermal is not None:
+            factor *= self.thermal.expansion()
+        return factor
+    
+    def counts_to_meters(self, x, y):
+        """
+        Converte uma posição do encoder para metros
+        
+        Returns:
+            tuple: (x_m, y_m)
+        """
+        if self.calibration is None:
+            factor = self.meters_per_unit()
+            return x * factor, y * factor
+        # O mapa foi medido na temperatura de referência da compensação térmica
+        expansion = self.thermal.expansion() if self.thermal is not None else 1.0
+        return (self.calibration['x'].to_meters(x) * expansion,
+                self.calibration['y'].to_meters(y) * expansion)
     
-    def capture_image(self):
-        """Ativa o raio-X para capturar uma imagem"""
-        # Ativar o raio-X
-        activate_raio_x(True)
+    def meters_to_counts(self, x=None, y=None):
+        """
+        Converte uma posição em metros para unidades do encoder (inverso de
+        counts_to_meters); eixos None continuam None
         
-        # Aguardar um tempo para a captura
-        time.sleep(0.5)
+        Returns:
+            tuple: (x, y) em unidades do encoder
+        """
+        if self.calibration is None:
+            factor = self.meters_per_unit()
+            return (None if x is None else round(x / factor),
+                    None if y is None else round(y / factor))
+        expansion = self.thermal.expansion() if self.thermal is not None else 1.0
+        return (None if x is None else round(self.calibration['x'].to_counts(x / expansion)),
+                None if y is None else round(self.calibration['y'].to_counts(y / expansion)))
+    
+    def get_position(self):
+        """
+        Retorna a posição atual dos encoders (mesma interface do ControlProcess)
         
-        # Desativar o raio-X
-        activate_raio_x(False)
+        Returns:
+            tuple: (pos_x, pos_y) posição em unidades do encoder
+        """
+        return self.hardware.get_position()
     
     def get_position_meters(self):
         """
@@ -276,8 +686,22 @@ class MotorController:
         Returns:
             tuple: (pos_x_m, pos_y_m) posição em metros
         """
-        pos_x, pos_y = get_position()
-        return pos_x * self.units_to_meters, pos_y * self.units_to_meters
+        return self.counts_to_meters(*self.hardware.get_position())
+    
+    def go_to_position_meters(self, x=None, y=None, **kwargs):
+        """
+        Move para uma posição em metros (convertida para unidades do encoder
+        com o mapa de calibração e a compensação térmica atuais)
+        
+        Args:
+            x (float): Posição alvo no eixo X em metros
+            y (float): Posição alvo no eixo Y em metros
+            **kwargs: Repassados para go_to_position (preempt, timeout)
+            
+        Returns:
+            Future: Ver go_to_position
+        """
+        return self.go_to_position(*self.meters_to_counts(x, y), **kwargs)
     
     def get_speed_meters_per_second(self):
         """
@@ -286,4 +710,4 @@ class MotorController:
         Returns:
             tuple: (speed_x_mps, speed_y_mps) velocidade em m/s
         """
-        return self.speed_x * self.units_to_meters, self.speed_y * self.units_to_meters
+        return self.speed_x * self.meters_per_unit('x'), self.speed_y * self.meters_per_unit('y')
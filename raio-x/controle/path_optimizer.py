@@ -0,0 +1,296 @@
+# path_optimizer.py
+import math
+import time
+import heapq
+
+from controle import clock
+
+# numpy é opcional: usado para montar a matriz de tempos, as listas de vizinhos
+# e o caminho do vizinho mais próximo
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Velocidade máxima (contagens/s) e aceleração (contagens/s²) de cada eixo; os
+# padrões correspondem ao eixo simulado (400 contagens/s com 100% de duty e
+# constante de tempo de 50 ms)
+AXIS_SPEED = {'x': 400.0, 'y': 400.0}
+AXIS_ACCELERATION = {'x': 8000.0, 'y': 8000.0}
+
+# Vizinhos mais próximos considerados por ponto nas trocas 2-opt
+NEIGHBORS = 10
+
+# Tempo máximo da melhoria 2-opt (s), contado a partir do fim da construção
+# da ordem do vizinho mais próximo (que é sempre concluída)
+TIME_LIMIT = 0.02
+
+# Ganho mínimo para aplicar uma troca (s), evita ciclos por arredondamento
+MIN_GAIN = 1e-9
+
+
+class MoveTimeModel:
+    def __init__(self, speed=None, acceleration=None):
+        """
+        Tempo de um movimento ponto a ponto: os eixos se movem de forma
+        independente, então o movimento dura o tempo do eixo mais lento
+        (distância de Chebyshev ponderada pela velocidade de cada eixo). Cada
+        eixo segue um perfil trapezoidal (triangular nos trechos curtos).
+
+        Args:
+            speed (dict): Velocidade máxima por eixo (contagens/s)
+            acceleration (dict): Aceleração por eixo (contagens/s²)
+        """
+        self.speed = dict(AXIS_SPEED, **(speed or {}))
+        self.acceleration = dict(AXIS_ACCELERATION, **(acceleration or {}))
+
+    def axis_time(self, axis, distance):
+        """Tempo para um eixo percorrer 'distance' contagens partindo e chegando parado"""
+        speed, acceleration = self.speed[axis], self.acceleration[axis]
+        distance = abs(distance)
+        if distance * acceleration >= speed * speed:
+            return distance / speed + speed / acceleration
+        return 2.0 * math.sqrt(distance / acceleration)
+
+    def __call__(self, a, b):
+        """Tempo do movimento entre as posições a e b"""
+        return max(self.axis_time('x', b[0] - a[0]), self.axis_time('y', b[1] - a[1]))
+
+    def _axis_matrix(self, axis, values):
+        distance = np.abs(values[:, None] - values[None, :])
+        speed, acceleration = self.speed[axis], self.acceleration[axis]
+        return np.where(distance * acceleration >= speed * speed,
+                        distance / speed + speed / acceleration,
+                        2.0 * np.sqrt(distance / acceleration))
+
+    def matrix(self, points):
+        """
+        Tempos entre todos os pares de pontos
+
+        Returns:
+            Matriz n x n (numpy.ndarray quando disponível, senão listas)
+        """
+        if not NUMPY_AVAILABLE:
+            return [[self(a, b) for b in points] for a in points]
+        array = np.asarray(points, dtype=float).reshape(-1, 2)
+        return np.maximum(self._axis_matrix('x', array[:, 0]), self._axis_matrix('y', array[:, 1]))
+
+
+def _neighbor_lists(matrix, count):
+    """Os 'count' pontos mais próximos de cada ponto, do mais próximo ao mais distante"""
+    n = len(matrix)
+    count = min(count, n - 1)
+    if count <= 0:
+        return [[] for _ in range(n)]
+    if NUMPY_AVAILABLE:
+        array = matrix.copy()
+        np.fill_diagonal(array, np.inf)
+        nearest = np.argpartition(array, count - 1, axis=1)[:, :count]
+        order = np.argsort(np.take_along_axis(array, nearest, axis=1), axis=1)
+        return np.take_along_axis(nearest, order, axis=1).tolist()
+    return [heapq.nsmallest(count, (j for j in range(n) if j != i), key=row.__getitem__)
+            for i, row in enumerate(matrix)]
+
+
+def _nearest_neighbor(matrix):
+    """Caminho guloso a partir do nó 0"""
+    if NUMPY_AVAILABLE:
+        # Mínimo de cada linha com os nós já visitados mascarados
+        visited = np.zeros(len(matrix), dtype=bool)
+        visited[0] = True
+        tour = [0]
+        for _ in range(len(matrix) - 1):
+            nearest = int(np.argmin(np.where(visited, np.inf, matrix[tour[-1]])))
+            visited[nearest] = True
+            tour.append(nearest)
+        return tour
+    remaining = set(range(1, len(matrix)))
+    tour = [0]
+    while remaining:
+        row = matrix[tour[-1]]
+        nearest = min(remaining, key=row.__getitem__)
+        remaining.remove(nearest)
+        tour.append(nearest)
+    return tour
+
+
+def _two_opt(matrix, tour, neighbors, deadline):
+    """
+    Melhoria 2-opt de um caminho aberto com o primeiro nó fixo: inverte o
+    trecho tour[i+1..j] quando trocar as arestas (t[i], t[i+1]) e (t[j],
+    t[j+1]) por (t[i], t[j]) e (t[i+1], t[j+1]) reduz o tempo total. O fim do
+    caminho é livre (sem aresta depois do último nó). Só são testadas trocas
+    que criam uma aresta até um dos vizinhos mais próximos, com uma fila de
+    nós a revisitar (don't-look bits).
+
+    Returns:
+        int: Trocas aplicadas
+    """
+    n = len(tour)
+    position = [0] * n
+    for index, node in enumerate(tour):
+        position[node] = index
+    queue = list(range(n))
+    queued = [True] * n
+    moves = 0
+
+    def cost(a, b):
+        return matrix[a][b] if b is not None else 0.0
+
+    while queue:
+        if time.perf_counter() > deadline:
+            break
+        a = queue.pop()
+        queued[a] = False
+        improved = False
+        for c in neighbors[a]:
+            p, q = position[a], position[c]
+            # Nova aresta (a, c) pelos sucessores e pelos antecessores dos dois nós
+            for i, j in ((min(p, q), max(p, q)), (min(p, q) - 1, max(p, q) - 1)):
+                if i < 0 or j <= i + 1:
+                    continue
+                ti, ti1, tj = tour[i], tour[i + 1], tour[j]
+                tj1 = tour[j + 1] if j + 1 < n else None
+                delta = (matrix[ti][tj] + cost(ti1, tj1)) - (matrix[ti][ti1] + cost(tj, tj1))
+                if delta < -MIN_GAIN:
+                    tour[i + 1:j + 1] = tour[j:i:-1]
+                    for index in range(i + 1, j + 1):
+                        position[tour[index]] = index
+                    for node in (ti, ti1, tj, tj1):
+                        if node is not None and not queued[node]:
+                            queued[node] = True
+                            queue.append(node)
+                    moves += 1
+                    improved = True
+                    break
+            if improved:
+                break
+    return moves
+
+
+def optimize_order(points, start=None, model=None, neighbors=NEIGHBORS, time_limit=TIME_LIMIT,
+                   stats=None):
+    """
+    Ordem de visita dos pontos que minimiza o tempo total de deslocamento:
+    caminho do vizinho mais próximo seguido de melhoria 2-opt
+
+    Args:
+        points (list): Posições (x, y) a visitar
+        start (tuple): Posição de partida (None: qualquer ponto pode ser o primeiro)
+        model (MoveTimeModel): Modelo de tempo (padrão: MoveTimeModel())
+        neighbors (int): Vizinhos considerados por ponto no 2-opt
+        time_limit (float): Tempo máximo da melhoria 2-opt (s), além da construção
+        stats (dict): Se informado, recebe os tempos estimados e a duração da otimização
+
+    Returns:
+        list: Índices de 'points' na ordem de visita
+    """
+    started = time.perf_counter()
+    points = [tuple(point) for point in points]
+    if len(points) <= 1:
+        return list(range(len(points)))
+    model = model or MoveTimeModel()
+
+    # O nó 0 é a partida; sem partida ele é um nó fictício a custo zero de todos
+    matrix = model.matrix([start if start is not None else points[0]] + points)
+    if start is None:
+        for row in matrix:
+            row[0] = 0.0
+        matrix[0][:] = [0.0] * len(matrix)
+    neighbor_lists = _neighbor_lists(matrix, neighbors)
+    tour = _nearest_neighbor(matrix)
+    if NUMPY_AVAILABLE:
+        # No 2-opt listas são indexadas mais rápido que o array elemento a elemento
+        matrix = matrix.tolist()
+    initial = path_time_indices(matrix, tour)
+    constructed = time.perf_counter()
+    moves = _two_opt(matrix, tour, neighbor_lists, constructed + time_limit)
+    order = [node - 1 for node in tour[1:]]
+
+    if stats is not None:
+        stats.update({
+            "given_s": path_time_indices(matrix, range(len(matrix))),
+            "nearest_neighbor_s": initial,
+            "optimized_s": path_time_indices(matrix, tour),
+            "two_opt_moves": moves,
+            "construction_s": constructed - started,
+            "elapsed_s": time.perf_counter() - started,
+        })
+    return order
+
+
+def path_time_indices(matrix, tour):
+    """Soma dos tempos das arestas de um caminho dado por índices da matriz"""
+    tour = list(tour)
+    return sum(matrix[a][b] for a, b in zip(tour, tour[1:]))
+
+
+def path_time(points, start=None, model=None):
+    """
+    Tempo estimado para visitar os pontos na ordem dada
+
+    Returns:
+        float: Soma dos tempos dos movimentos (s)
+    """
+    model = model or MoveTimeModel()
+    path = ([tuple(start)] if start is not None else []) + [tuple(point) for point in points]
+    return sum(model(a, b) for a, b in zip(path, path[1:]))
+
+
+def move_through(controller, points, optimize=True, model=None, preempt=False, timeout=None):
+    """
+    Enfileira os movimentos até os pontos, na ordem otimizada a partir da
+    posição atual do controlador
+
+    Args:
+        controller (MotorController): Controlador (ou ControlProcess)
+        points (list): Posições (x, y)
+        optimize (bool): False mantém a ordem dada
+        preempt (bool): Interrompe o movimento atual antes de começar
+        timeout (float): Tempo máximo de cada segmento (s)
+
+    Returns:
+        tuple: (ordem de visita em índices de 'points', futures de move_sequence)
+    """
+    order = (optimize_order(points, controller.get_position(), model) if optimize
+             else list(range(len(points))))
+    futures = controller.move_sequence([tuple(points[index]) for index in order], preempt=preempt,
+                                       timeout=timeout)
+    return order, futures
+
+
+def capture_points(controller, points, exposure=None, optimize=True, model=None,
+                   settled=None, wait=None):
+    """
+    Captura uma imagem em cada ponto, visitados na ordem otimizada
+
+    Args:
+        controller (MotorController): Controlador do pórtico
+        points (list): Posições (x, y) de captura
+        exposure (float): Duração de cada exposição (s; padrão: a do controlador)
+        settled (callable): Condição de acomodação após a chegada (padrão: chegada do movimento)
+        wait (callable): Função que aguarda um período (padrão: clock.sleep)
+
+    Returns:
+        list: Registros das exposições na ordem de 'points' (metadados com
+        'index', 'target' e 'visit')
+    """
+    wait = wait or clock.sleep
+    order = (optimize_order(points, controller.get_position(), model) if optimize
+             else list(range(len(points))))
+    records = [None] * len(points)
+    for visit, index in enumerate(order):
+        x, y = points[index]
+        future = controller.go_to_position(x, y)
+        while not future.done():
+            wait(controller.control_period)
+        future.result()
+        while settled is not None and not settled():
+            wait(controller.control_period)
+        metadata = {"index": index, "target": (x, y), "visit": visit}
+        if exposure is None:
+            records[index] = controller.capture_image(metadata=metadata)
+        else:
+            records[index] = controller.capture_image(exposure, metadata)
+    return records
@@ -1,30 +1,50 @@
-import time
-from gpio.motors import set_motor_direction, set_motor_speed
-from controle.encoder import get_position
+from controle import clock
+from controle.hardware import default_hardware
 
 class PIDController:
-    def __init__(self, kp=0.5, ki=0.05, kd=40.0):
+    def __init__(self, kp=0.5, ki=0.05, kd=40.0, hardware=None):
         # Constantes PID conforme sugerido no README
         self.kp = kp  # Ganho proporcional
         self.ki = ki  # Ganho integral
         self.kd = kd  # Ganho derivativo
         
+        # Ganhos por eixo (iniciam iguais; podem ser ajustados com set_gains)
+        self.gains = {'x': (kp, ki, kd), 'y': (kp, ki, kd)}
+        
+        # Compensação de folga opcional (ver controle/backlash.py)
+        self.backlash = None
+        
+        # Encoders e motores do pórtico controlado (ver controle/hardware.py)
+        self.hardware = hardware if hardware is not None else default_hardware
+        
         # Variáveis de estado para cada eixo
         self.reset()
     
+    def set_gains(self, axis, kp, ki, kd):
+        """
+        Define os ganhos de um eixo
+        
+        Args:
+            axis (str): 'x' ou 'y'
+            kp (float): Ganho proporcional
+            ki (float): Ganho integral
+            kd (float): Ganho derivativo
+        """
+        self.gains[axis] = (kp, ki, kd)
+    
     def reset(self):
         """Reseta as variáveis de estado do controlador"""
         # Para eixo X
         self.x_setpoint = 0      # Posição desejada
         self.x_prev_error = 0    # Erro anterior
         self.x_integral = 0      # Acumulador integral
-        self.x_last_time = time.time()  # Tempo da última atualização
+        self.x_last_time = clock.time()  # Tempo da última atualização
         
         # Para eixo Y
         self.y_setpoint = 0
         self.y_prev_error = 0
         self.y_integral = 0
-        self.y_last_time = time.time()
+        self.y_last_time = clock.time()
     
     def set_target_position(self, x=None, y=None):
         """Define a posição alvo (setpoint) para um ou ambos os eixos"""
@@ -49,7 +69,7 @@ class PIDController:
         error = setpoint - current_position
         
         # Obter o tempo atual e calcular dt
-        current_time = time.time()
+        current_time = clock.time()
         if axis == 'x':
             dt = current_time - self.x_last_time
             self.x_last_time = current_time
@@ -73,7 +93,8 @@ class PIDController:
             self.y_prev_error = error
         
         # Calcular saída PID
-        output = (self.kp * error) + (self.ki * (self.x_integral if axis == 'x' else self.y_integral)) + (self.kd * derivative)
+        kp, ki, kd = self.gains[axis]
+        output = (kp * error) + (ki * (self.x_integral if axis == 'x' else self.y_integral)) + (kd * derivative)
         
         # Determinar direção e velocidade
         if abs(error) < 2:  # Margem de erro pequena, considerar como posição atingida
@@ -92,17 +113,24 @@ class PIDController:
             tuple: ((erro_x, velocidade_x), (erro_y, velocidade_y))
         """
         # Obter posição atual
-        pos_x, pos_y = get_position()
+        motors = self.hardware.motors
+        pos_x, pos_y = self.hardware.encoders.get_position()
         
         # Calcular controle para eixo X
         x_direction, x_speed = self.compute_pid('x', pos_x, self.x_setpoint)
-        set_motor_direction('x', x_direction)
-        set_motor_speed('x', x_speed)
+        if self.backlash is not None:
+            x_direction, x_speed = self.backlash.adjust('x', x_direction, x_speed, pos_x,
+                                                         self.x_setpoint - pos_x)
+        motors.set_direction('x', x_direction)
+        motors.set_speed('x', x_speed)
         
         # Calcular controle para eixo Y
         y_direction, y_speed = self.compute_pid('y', pos_y, self.y_setpoint)
-        set_motor_direction('y', y_direction)
-        set_motor_speed('y', y_speed)
+        if self.backlash is not None:
+            y_direction, y_speed = self.backlash.adjust('y', y_direction, y_speed, pos_y,
+                                                         self.y_setpoint - pos_y)
+        motors.set_direction('y', y_direction)
+        motors.set_speed('y', y_speed)
         
         # Calcular erros
         error_x = self.x_setpoint - pos_x
@@ -120,7 +148,173 @@ class PIDController:
         Returns:
             bool: True se ambos os eixos atingiram a posição desejada
         """
-        pos_x, pos_y = get_position()
+        pos_x, pos_y = self.hardware.encoders.get_position()
         x_reached = abs(self.x_setpoint - pos_x) <= tolerance
         y_reached = abs(self.y_setpoint - pos_y) <= tolerance
         return x_reached and y_reached
+
+
+# Escalonamento de ganhos por faixa de erro: (erro mínimo em unidades do encoder, fator de kp).
+# Longe do alvo o ganho é agressivo (saída saturada, velocidade máxima); perto, suave
+GAIN_SCHEDULE = ((200, 1.5), (50, 1.0), (0, 0.6))
+
+IN_POSITION_WINDOW = 5   # Janela de posição (unidades do encoder)
+SETTLE_HOLD = 0.1        # Tempo dentro da janela para considerar o eixo acomodado (s)
+TRACKING_TIME = 0.1      # Constante de tempo do anti-windup por back-calculation (s)
+DERIVATIVE_FILTER = 0.02 # Constante de tempo do filtro do termo derivativo (s)
+MAX_DT = 0.1             # Intervalo acima do qual o eixo é considerado parado pelo PID (s)
+OUTPUT_LIMIT = 100.0     # Saturação do duty cycle (%)
+
+# Ganhos padrão (kp, ki, kd) do ScheduledPIDController. O kd=40 do PIDController
+# foi ajustado para o derivativo do erro sem filtro; aplicado ao derivativo
+# filtrado da posição ele domina a saída e o acionamento oscila sem sair do lugar.
+# No simulador (simulacao/benchmark.py --compare, 1000 movimentos, sementes 0-2)
+# estes ganhos acomodam em média 3% antes do PD (17, 0, 0.5) do PIDController;
+# os anteriores (12, 20, 0.4) eram 4% mais lentos que ele
+SCHEDULED_GAINS = (22.0, 20.0, 0.5)
+
+
+class ScheduledPIDController(PIDController):
+    def __init__(self, kp=SCHEDULED_GAINS[0], ki=SCHEDULED_GAINS[1], kd=SCHEDULED_GAINS[2],
+                 schedule=GAIN_SCHEDULE, window=IN_POSITION_WINDOW,
+                 settle_hold=SETTLE_HOLD, tracking_time=TRACKING_TIME,
+                 derivative_filter=DERIVATIVE_FILTER, hardware=None):
+        """
+        PID com escalonamento de ganhos por faixa de erro, anti-windup por
+        back-calculation e uma única janela de posição, usada tanto para desligar
+        a saída quanto por is_position_reached e pela detecção de acomodação.
+
+        O termo derivativo é calculado sobre a posição medida (e não sobre o
+        erro), para que a mudança de setpoint não gere um pico de saída, e
+        filtrado para atenuar a quantização do encoder. O anti-windup considera
+        apenas a parte P+I da saída, de modo que os picos do derivativo não
+        carreguem a integral.
+
+        Args:
+            kp, ki, kd (float): Ganhos base (multiplicados pelo fator da faixa no kp)
+            schedule (tuple): Faixas (erro mínimo, fator de kp)
+            window (int): Janela de posição em unidades do encoder
+            settle_hold (float): Tempo dentro da janela para considerar acomodado (s)
+            tracking_time (float): Constante de tempo do anti-windup (s)
+            derivative_filter (float): Constante de tempo do filtro do derivativo (s)
+            hardware (HardwareContext): Pórtico controlado (padrão: o pórtico padrão)
+        """
+        self.schedule = sorted(schedule, reverse=True)
+        self.window = window
+        self.settle_hold = settle_hold
+        self.tracking_time = tracking_time
+        self.derivative_filter = derivative_filter
+        super().__init__(kp, ki, kd, hardware)
+
+    def reset(self):
+        """Reseta as variáveis de estado do controlador"""
+        super().reset()
+        self.prev_position = {'x': None, 'y': None}
+        self.derivative = {'x': 0.0, 'y': 0.0}
+        self.in_window_since = {'x': None, 'y': None}
+        self.move_start = clock.time()
+        self.settled_at = None       # Instante em que o movimento atual acomodou
+        self.last_settle_time = None # Tempo de acomodação do último movimento (s)
+
+    def set_target_position(self, x=None, y=None):
+        """Define a posição alvo e reinicia a detecção de acomodação se ela mudou"""
+        if (x is not None and x != self.x_setpoint) or (y is not None and y != self.y_setpoint):
+            self.move_start = clock.time()
+            self.settled_at = None
+            self.in_window_since = {'x': None, 'y': None}
+        super().set_target_position(x, y)
+
+    def gain_factor(self, error):
+        """Fator de kp da faixa correspondente ao erro"""
+        for threshold, factor in self.schedule:
+            if abs(error) >= threshold:
+                return factor
+        return self.schedule[-1][1]
+
+    def compute_pid(self, axis, current_position, setpoint):
+        """
+        Calcula o valor de controle PID para um eixo
+
+        Returns:
+            tuple: (direção, velocidade) onde direção é 1, -1 ou 0 e velocidade é 0-100
+        """
+        error = setpoint - current_position
+
+        current_time = clock.time()
+        dt = current_time - getattr(self, f'{axis}_last_time')
+        setattr(self, f'{axis}_last_time', current_time)
+        setattr(self, f'{axis}_prev_error', error)
+
+        # Depois de um intervalo longo sem atualizar (ex.: modo manual) o
+        # derivativo e a integral recomeçam do zero nesta iteração
+        previous = self.prev_position[axis]
+        self.prev_position[axis] = current_position
+        if previous is None or dt <= 0 or dt > MAX_DT:
+            dt = 0.0
+            self.derivative[axis] = 0.0
+        else:
+            raw = -(current_position - previous) / dt
+            self.derivative[axis] += (raw - self.derivative[axis]) * dt / (self.derivative_filter + dt)
+        derivative = self.derivative[axis]
+
+        # Dentro da janela a saída é desligada e a integral fica congelada
+        if abs(error) <= self.window:
+            return 0, 0
+
+        kp, ki, kd = self.gains[axis]
+        kp *= self.gain_factor(error)
+        integral = getattr(self, f'{axis}_integral')
+        proportional_integral = kp * error + ki * integral
+        output = proportional_integral + kd * derivative
+        limited = max(-OUTPUT_LIMIT, min(OUTPUT_LIMIT, output))
+
+        # Longe do alvo o proporcional sozinho satura e a integral fica parada;
+        # perto, a back-calculation descarrega o excesso da parte P+I em vez
+        # de deixar a integral crescer enquanto a saída está saturada
+        if ki > 0 and dt > 0 and abs(kp * error) < OUTPUT_LIMIT:
+            excess = max(-OUTPUT_LIMIT, min(OUTPUT_LIMIT, proportional_integral)) - proportional_integral
+            integral += (error + excess / (ki * self.tracking_time)) * dt
+            setattr(self, f'{axis}_integral', integral)
+
+        if limited == 0:
+            return 0, 0
+        return (1 if limited > 0 else -1), abs(limited)
+
+    def update(self):
+        """
+        Atualiza o controle PID para ambos os eixos, aplica aos motores e
+        acompanha a acomodação do movimento
+
+        Returns:
+            tuple: ((erro_x, velocidade_x), (erro_y, velocidade_y))
+        """
+        result = super().update()
+        now = clock.time()
+        for axis, (error, _) in zip(('x', 'y'), result):
+            if abs(error) <= self.window:
+                if self.in_window_since[axis] is None:
+                    self.in_window_since[axis] = now
+            else:
+                self.in_window_since[axis] = None
+
+        if self.settled_at is None and all(since is not None and now - since >= self.settle_hold
+                                           for since in self.in_window_since.values()):
+            self.settled_at = max(self.in_window_since.values())
+            self.last_settle_time = self.settled_at - self.move_start
+        elif self.settled_at is not None and None in self.in_window_since.values():
+            # Saiu da janela depois de acomodar (perturbação): acomoda de novo
+            self.settled_at = None
+        return result
+
+    def is_position_reached(self, tolerance=None):
+        """
+        Verifica se a posição desejada foi atingida (padrão: a janela de posição)
+
+        Returns:
+            bool: True se ambos os eixos estão dentro da janela
+        """
+        return super().is_position_reached(self.window if tolerance is None else tolerance)
+
+    def is_settled(self):
+        """Verdadeiro quando os dois eixos ficaram 'settle_hold' segundos dentro da janela"""
+        return self.settled_at is not None
@@ -0,0 +1,234 @@
+# profiling.py
+import os
+import sys
+import signal
+import threading
+import time
+from collections import Counter
+
+# Estágios medidos em cada iteração do loop de controle
+COMMANDS = 0
+LIMITS = 1
+SPEED = 2
+PID = 3
+SAFETY = 4
+TICK = 5      # iteração completa
+PERIOD = 6    # intervalo entre o início de iterações consecutivas
+
+STAGE_NAMES = ('commands', 'limits', 'speed', 'pid', 'safety', 'tick', 'period')
+
+# Histogramas com baldes fixos em potências de 2 (ns): o balde i contém
+# durações em [2^(i-1), 2^i). 40 baldes cobrem até ~9 minutos
+BUCKETS = 40
+
+# Intervalo entre iterações acima do qual a iteração é contada como atrasada
+OVERRUN_FACTOR = 1.5
+
+
+class LoopProfiler:
+    def __init__(self, period=0.01):
+        """
+        Instrumentação sempre ativa do loop de controle: cada estágio da
+        iteração é medido com perf_counter_ns e acumulado em um histograma de
+        baldes fixos. record() é chamado apenas pela thread de controle e faz
+        só operações inteiras; snapshot() pode ser chamado de qualquer thread.
+
+        Args:
+            period (float): Período nominal do loop (s), usado para contar atrasos
+        """
+        self.period_ns = int(period * 1e9)
+        self.reset()
+
+    def reset(self):
+        self.histograms = [[0] * BUCKETS for _ in STAGE_NAMES]
+        self.counts = [0] * len(STAGE_NAMES)
+        self.totals = [0] * len(STAGE_NAMES)
+        self.maxima = [0] * len(STAGE_NAMES)
+        self.overruns = 0
+        self.last_start = None
+
+    def record(self, stage, ns):
+        """Acumula a duração de um estágio (ns)"""
+        bucket = ns.bit_length()
+        self.histograms[stage][bucket if bucket < BUCKETS else BUCKETS - 1] += 1
+        self.counts[stage] += 1
+        self.totals[stage] += ns
+        if ns > self.maxima[stage]:
+            self.maxima[stage] = ns
+
+    def tick(self, start, end):
+        """Registra uma iteração completa e o intervalo desde a anterior (ns)"""
+        self.record(TICK, end - start)
+        if self.last_start is not None:
+            period = start - self.last_start
+            self.record(PERIOD, period)
+            if period > self.period_ns * OVERRUN_FACTOR:
+                self.overruns += 1
+        self.last_start = start
+
+    def snapshot(self):
+        """
+        Cópia das estatísticas por estágio
+
+        Returns:
+            dict: Por estágio: count, mean_us, max_us, p50_us, p90_us, p99_us e
+            buckets (limite superior em ns -> contagem); e o total de atrasos
+        """
+        stages = {}
+        for index, name in enumerate(STAGE_NAMES):
+            histogram = list(self.histograms[index])
+            count = sum(histogram)
+            if not count:
+                stages[name] = {"count": 0}
+                continue
+            stages[name] = {
+                "count": count,
+                "mean_us": self.totals[index] / self.counts[index] / 1e3 if self.counts[index] else 0.0,
+                "max_us": self.maxima[index] / 1e3,
+                "p50_us": _percentile(histogram, count, 0.50) / 1e3,
+                "p90_us": _percentile(histogram, count, 0.90) / 1e3,
+                "p99_us": _percentile(histogram, count, 0.99) / 1e3,
+                "buckets": {1 << i: n for i, n in enumerate(histogram) if n}
+            }
+        return {"stages": stages, "overruns": self.overruns, "period_us": self.period_ns / 1e3}
+
+
+def _percentile(histogram, count, q):
+    """Limite superior do balde que contém o quantil q"""
+    target = q * count
+    cumulative = 0
+    for index, n in enumerate(histogram):
+        cumulative += n
+        if cumulative >= target:
+            return 1 << index
+    return 1 << (len(histogram) - 1)
+
+
+def measure_overhead(profiler=None, iterations=100000):
+    """
+    Mede o custo de instrumentar uma iteração (perf_counter_ns + record de
+    todos os estágios)
+
+    Returns:
+        float: Custo por iteração em ns
+    """
+    profiler = profiler or LoopProfiler()
+    timer = time.perf_counter_ns
+    start = timer()
+    for _ in range(iterations):
+        t0 = timer()
+        for stage in range(SAFETY + 1):
+            t1 = timer()
+            profiler.record(stage, t1 - t0)
+            t0 = t1
+        profiler.tick(t0, timer())
+    elapsed = timer() - start
+    profiler.reset()
+    return elapsed / iterations
+
+
+class SamplingProfiler:
+    def __init__(self, interval=0.005):
+        """
+        Perfilador por amostragem de uma thread: a cada 'interval' segundos
+        registra a pilha de chamadas da thread (sys._current_frames), sem
+        instrumentar o código medido.
+
+        Args:
+            interval (float): Intervalo entre amostras (s)
+        """
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self.thread_id = None
+        self._thread = None
+        self._running = False
+
+    @property
+    def running(self):
+        return self._running
+
+    def start(self, thread_id):
+        """Começa a amostrar a thread indicada"""
+        if self._running:
+            return
+        self.thread_id = thread_id
+        self._running = True
+        self._thread = threading.Thread(target=self._sample_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _sample_loop(self):
+        while self._running:
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                self.stacks[tuple(reversed(stack))] += 1
+                self.samples += 1
+            time.sleep(self.interval)
+
+    def top(self, limit=20):
+        """
+        Funções com mais amostras
+
+        Returns:
+            list: Tuplas (função, amostras próprias, amostras acumuladas)
+        """
+        own = Counter()
+        cumulative = Counter()
+        for stack, n in self.stacks.items():
+            own[stack[-1]] += n
+            for function in set(stack):
+                cumulative[function] += n
+        return [(function, n, cumulative[function]) for function, n in own.most_common(limit)]
+
+    def write_folded(self, path):
+        """Grava as pilhas no formato 'folded' (uma pilha por linha), usado por flame graphs"""
+        with open(path, "w") as f:
+            for stack, n in self.stacks.most_common():
+                f.write(f"{';'.join(stack)} {n}\n")
+
+
+def install_signal_toggle(controller, signum=signal.SIGUSR1, output="control_loop.folded"):
+    """
+    Liga/desliga o perfilador por amostragem da thread de controle a cada
+    sinal recebido (ex.: kill -USR1 <pid>). Ao desligar, grava as pilhas em
+    'output'. Deve ser chamada na thread principal.
+
+    Returns:
+        SamplingProfiler: Perfilador associado ao sinal
+    """
+    sampler = SamplingProfiler()
+
+    def toggle(sig, frame):
+        if sampler.running:
+            sampler.stop()
+            sampler.write_folded(output)
+            print(f"Perfil por amostragem: {sampler.samples} amostras gravadas em {output}")
+        elif controller.control_thread is not None:
+            sampler.stacks.clear()
+            sampler.samples = 0
+            sampler.start(controller.control_thread.ident)
+            print("Perfil por amostragem do loop de controle iniciado")
+
+    signal.signal(signum, toggle)
+    return sampler
+
+
+def print_snapshot(snapshot):
+    print(f"{'estágio':<10}{'n':>9}{'média µs':>11}{'p50 µs':>10}{'p99 µs':>10}{'máx µs':>10}")
+    for name, data in snapshot["stages"].items():
+        if not data["count"]:
+            continue
+        print(f"{name:<10}{data['count']:>9}{data['mean_us']:>11.1f}{data['p50_us']:>10.1f}"
+              f"{data['p99_us']:>10.1f}{data['max_us']:>10.1f}")
+    print(f"Iterações atrasadas (> {OVERRUN_FACTOR:g}× {snapshot['period_us'] / 1e3:g} ms): {snapshot['overruns']}")
@@ -0,0 +1,102 @@
+# startup.py
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# Número máximo de estágios executados ao mesmo tempo
+MAX_WORKERS = 4
+
+
+class StartupSequencer:
+    def __init__(self, max_workers=MAX_WORKERS):
+        """
+        Executa os estágios da inicialização respeitando as dependências
+        declaradas: estágios independentes rodam em paralelo e cada um começa
+        assim que os estágios de que depende terminam. Registra o início e o
+        fim de cada estágio para o relatório da linha do tempo.
+
+        Args:
+            max_workers (int): Estágios executados simultaneamente
+        """
+        self.max_workers = max_workers
+        self.stages = {}          # nome -> (função, dependências)
+        self.timeline = {}        # nome -> {"start", "end", "thread", "error"}
+        self.results = {}
+        self.origin = None
+
+    def stage(self, name, func, after=()):
+        """
+        Registra um estágio
+
+        Args:
+            name (str): Nome do estágio
+            func (callable): Função sem argumentos
+            after (tuple): Estágios que precisam terminar antes deste
+        """
+        for dependency in after:
+            if dependency not in self.stages:
+                raise ValueError(f"Estágio '{name}' depende de '{dependency}', que não foi registrado")
+        self.stages[name] = (func, tuple(after))
+        return self
+
+    def _execute(self, name):
+        func = self.stages[name][0]
+        entry = {"start": time.perf_counter() - self.origin, "thread": threading.current_thread().name}
+        self.timeline[name] = entry
+        try:
+            return func()
+        except Exception as e:
+            entry["error"] = e
+            raise
+        finally:
+            entry["end"] = time.perf_counter() - self.origin
+
+    def run(self):
+        """
+        Executa todos os estágios. Se um estágio falhar, os que dependem dele
+        não são executados e a exceção é relançada depois que os estágios em
+        andamento terminam.
+
+        Returns:
+            dict: Resultado de cada estágio
+        """
+        self.origin = time.perf_counter()
+        pending = dict(self.stages)
+        running = {}
+        done = set()
+        failure = None
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="startup") as executor:
+            while pending or running:
+                if failure is None:
+                    for name, (_, after) in list(pending.items()):
+                        if all(dependency in done for dependency in after):
+                            running[executor.submit(self._execute, name)] = name
+                            del pending[name]
+                if not running:
+                    break
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    if future.exception() is not None:
+                        failure = failure or future.exception()
+                    else:
+                        self.results[name] = future.result()
+                        done.add(name)
+        if failure is not None:
+            raise failure
+        return self.results
+
+    def total(self):
+        """Duração da inicialização (s)"""
+        return max((entry["end"] for entry in self.timeline.values()), default=0.0)
+
+    def print_timeline(self, width=40):
+        """Linha do tempo dos estágios (início, duração e barra proporcional)"""
+        total = self.total() or 1.0
+        print(f"Inicialização em {self.total() * 1e3:.0f} ms:")
+        for name, entry in sorted(self.timeline.items(), key=lambda item: item[1]["start"]):
+            start = int(entry["start"] / total * width)
+            length = max(1, int((entry["end"] - entry["start"]) / total * width))
+            status = " (falhou)" if "error" in entry else ""
+            print(f"  {name:<14} {entry['start'] * 1e3:7.1f} ms +{(entry['end'] - entry['start']) * 1e3:6.1f} ms "
+                  f"|{' ' * start}{'#' * length}{' ' * max(0, width - start - length)}|{status}")
@@ -0,0 +1,153 @@
+# thermal.py
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+
+# Arquivo da calibração térmica (carregado na inicialização pelo main.py)
+THERMAL_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "thermal.json")
+
+# Coeficiente de dilatação linear do aço dos fusos (1/°C) e temperatura de referência
+STEEL_EXPANSION = 11.5e-6
+REFERENCE_TEMPERATURE = 20.0
+
+# Idade máxima da leitura em cache para ser usada na compensação (s)
+MAX_READING_AGE = 60.0
+
+
+class ThermalCompensation:
+    def __init__(self, monitor=None, coefficient=STEEL_EXPANSION, reference=REFERENCE_TEMPERATURE,
+                 base_scale=1.0, max_age=MAX_READING_AGE, allow_simulated=False):
+        """
+        Escala de posição dependente da temperatura: com a dilatação do fuso
+        cada contagem do encoder corresponde a uma distância maior, então
+
+            metros = contagens * units_to_meters * base_scale * (1 + coefficient * (T - reference))
+
+        A temperatura vem da leitura em cache do SensorMonitor; nenhuma chamada
+        acessa o barramento I2C. Sem leitura recente (ou com o sensor em modo de
+        simulação) a última escala válida é mantida.
+
+        Args:
+            monitor (SensorMonitor): Leituras em cache do BMP280
+            coefficient (float): Coeficiente de dilatação calibrado (1/°C)
+            reference (float): Temperatura em que base_scale foi medida (°C)
+            base_scale (float): Correção da escala na temperatura de referência
+            max_age (float): Idade máxima da leitura usada (s)
+            allow_simulated (bool): Aceitar leituras de um sensor em modo de simulação
+        """
+        self.monitor = monitor
+        self.coefficient = coefficient
+        self.reference = reference
+        self.base_scale = base_scale
+        self.max_age = max_age
+        self.allow_simulated = allow_simulated
+        self.temperature = None   # temperatura usada na última escala válida
+        self._scale = base_scale
+
+    def scale_at(self, temperature):
+        """Escala para uma temperatura"""
+        return self.base_scale * (1.0 + self.coefficient * (temperature - self.reference))
+
+    def scale(self):
+        """Escala atual a partir da última leitura em cache (não bloqueia)"""
+        monitor = self.monitor
+        latest = monitor.latest if monitor is not None else None
+        if latest is None or time.time() - latest["timestamp"] > self.max_age:
+            return self._scale
+        if not self.allow_simulated and getattr(monitor.sensor, "simulation_mode", False):
+            return self._scale
+        temperature = latest["temperature"]
+        if temperature != self.temperature:
+            self.temperature = temperature
+            self._scale = self.scale_at(temperature)
+        return self._scale
+
+    def expansion(self):
+        """Dilatação relativa à temperatura de referência (sem base_scale)"""
+        return self.scale() / self.base_scale
+
+    def to_dict(self):
+        return {"coefficient": self.coefficient, "reference": self.reference, "base_scale": self.base_scale}
+
+    def save(self, path=THERMAL_FILE):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, monitor=None, path=THERMAL_FILE):
+        """
+        Carrega a calibração gravada
+
+        Returns:
+            ThermalCompensation: Compensação, ou None se o arquivo não existir
+        """
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            data = json.load(f)
+        return cls(monitor, data["coefficient"], data["reference"], data.get("base_scale", 1.0))
+
+
+def fit_thermal(samples, reference=REFERENCE_TEMPERATURE):
+    """
+    Ajusta a escala térmica por mínimos quadrados a partir de medições de um
+    mesmo deslocamento em temperaturas diferentes
+
+    Args:
+        samples (list): Tuplas (temperatura °C, escala medida), onde escala =
+            distância medida / (contagens * units_to_meters)
+        reference (float): Temperatura de referência
+
+    Returns:
+        tuple: (coefficient, base_scale)
+    """
+    if len(samples) < 2:
+        raise ValueError("São necessárias medições em pelo menos duas temperaturas")
+    n = len(samples)
+    mean_t = sum(t for t, _ in samples) / n
+    mean_s = sum(s for _, s in samples) / n
+    var_t = sum((t - mean_t) ** 2 for t, _ in samples)
+    if var_t == 0:
+        raise ValueError("As medições precisam cobrir temperaturas diferentes")
+    slope = sum((t - mean_t) * (s - mean_s) for t, s in samples) / var_t
+    base_scale = mean_s + slope * (reference - mean_t)
+    return slope / base_scale, base_scale
+
+
+def read_samples(path, units_to_meters):
+    """
+    Lê medições de um CSV com colunas temperature, counts e measured_m
+
+    Returns:
+        list: Tuplas (temperatura, escala medida)
+    """
+    samples = []
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            counts = float(row["counts"])
+            samples.append((float(row["temperature"]), float(row["measured_m"]) / (counts * units_to_meters)))
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Calibração da compensação térmica do pórtico')
+    parser.add_argument('csv', help='Medições: temperature,counts,measured_m')
+    parser.add_argument('--units-to-meters', type=float, default=0.001, help='Fator nominal do encoder')
+    parser.add_argument('--reference', type=float, default=REFERENCE_TEMPERATURE, help='Temperatura de referência')
+    parser.add_argument('--output', default=THERMAL_FILE, help='Arquivo onde gravar a calibração')
+    args = parser.parse_args()
+
+    samples = read_samples(args.csv, args.units_to_meters)
+    coefficient, base_scale = fit_thermal(samples, args.reference)
+    ThermalCompensation(coefficient=coefficient, reference=args.reference, base_scale=base_scale).save(args.output)
+    print(f"{len(samples)} medições | coeficiente {coefficient * 1e6:.2f} ppm/°C | "
+          f"escala a {args.reference:g} °C: {base_scale:.6f}")
+    print(f"Calibração gravada em {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,282 @@
+# trace.py
+import json
+import struct
+import threading
+import time
+from collections import deque
+
+from controle import clock
+from controle.hardware import default_hardware
+from controle.jog import JogController
+from gpio import limitswitches, buttons
+
+# Cabeçalho: identificador, versão, instante inicial (time()) e tamanho da
+# configuração do controlador que o segue (JSON; ver controller_config)
+MAGIC = b"RXTR"
+VERSION = 2
+HEADER = struct.Struct("<4sBdI")
+
+# Evento: intervalo desde o evento anterior (µs), tipo, canal e valor
+EVENT = struct.Struct("<IBBf")
+MAX_DELTA_US = 0xFFFFFFFF
+
+# Tipos de evento
+TICK_START = 1
+TICK_END = 2
+ENCODER = 3
+LIMIT = 4
+BUTTON = 5
+DIRECTION = 6
+SPEED = 7
+MODE = 8
+SETPOINT = 9
+JOG = 10
+CALIBRATE = 11
+
+EVENT_NAMES = {
+    TICK_START: "tick_start",
+    TICK_END: "tick_end",
+    ENCODER: "encoder",
+    LIMIT: "limit",
+    BUTTON: "button",
+    DIRECTION: "direction",
+    SPEED: "speed",
+    MODE: "mode",
+    SETPOINT: "setpoint",
+    JOG: "jog",
+    CALIBRATE: "calibrate"
+}
+
+# Canais: eixos e índices na ordem dos dicionários de pinos
+AXES = ('x', 'y')
+LIMIT_NAMES = tuple(limitswitches.LIMIT_SWITCHES)
+BUTTON_NAMES = tuple(buttons.BUTTONS)
+
+# Bit de canal que marca comandos emitidos pelo próprio loop de controle
+FROM_CONTROL_LOOP = 0x80
+
+# Canais dos eventos do jog: press nas direções de jog.DIRECTIONS, release de
+# todos os eixos ou de um eixo e reset
+JOG_EVENTS = tuple(('press', direction) for direction in ('up', 'down', 'left', 'right')) + (
+    ('release', None), ('release', 'x'), ('release', 'y'), ('reset', None))
+
+# Canais dos eventos de início da calibração: argumentos (measure_backlash, approach)
+CALIBRATE_ARGS = tuple((measure_backlash, approach) for measure_backlash in (False, True)
+                       for approach in (None, '+', '-'))
+
+
+def controller_config(controller):
+    """
+    Configuração do controlador que muda os comandos produzidos e precisa ser
+    refeita no replay (ver apply_config)
+
+    Returns:
+        dict: Ganhos PID por eixo e parâmetros do jog (None sem jog)
+    """
+    return {"gains": {axis: list(gains) for axis, gains in controller.pid.gains.items()},
+            "jog": controller.jog.config() if controller.jog is not None else None}
+
+
+def apply_config(controller, config):
+    """Aplica a um controlador novo a configuração gravada por controller_config"""
+    for axis, gains in config.get("gains", {}).items():
+        controller.pid.set_gains(axis, *gains)
+    if "jog" in config:
+        controller.jog = JogController(**config["jog"]) if config["jog"] is not None else None
+
+
+class TraceRecorder:
+    def __init__(self, path, flush_interval=0.05):
+        """
+        Grava, com timestamps, as bordas de encoder, mudanças das chaves de fim de
+        curso e botões, comandos dos motores e as iterações do loop de controle.
+
+        Os eventos são apenas enfileirados nas threads de controle e de
+        interrupção; a codificação binária e a escrita no disco ficam em uma
+        thread separada.
+
+        Args:
+            path (str): Arquivo de saída
+            flush_interval (float): Intervalo (tempo real) entre escritas em disco
+        """
+        self.path = path
+        self.flush_interval = flush_interval
+        self.events = deque()
+        self.start_time = None
+        self.limit_states = {}
+        self.button_states = {}
+        self.mode = None
+        self.setpoint = (None, None)
+        self.control_thread_id = None  # thread executando uma iteração de controle
+        self.hardware = None           # pórtico gravado (o do controlador de start)
+        self.written = 0
+        self._last_time = 0.0
+        self._file = None
+        self._writer = None
+        self._running = False
+
+    def _now(self):
+        return clock.time() - self.start_time
+
+    def start(self, controller=None):
+        """
+        Começa a gravar. Para que o replay seja determinístico, a gravação deve
+        começar antes da primeira iteração do controlador.
+        """
+        self.start_time = clock.time()
+        config = json.dumps(controller_config(controller) if controller is not None else {}).encode("utf-8")
+        self._file = open(self.path, "wb")
+        self._file.write(HEADER.pack(MAGIC, VERSION, self.start_time, len(config)) + config)
+        self._running = True
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+        self.hardware = controller.hardware if controller is not None else default_hardware
+        self.hardware.encoders.listeners.append(self._on_position)
+        self.hardware.motors.listeners.append(self._on_command)
+        self.hardware.limit_switches.listeners.append(self._on_limits)
+        buttons.read_listeners.append(self._on_buttons)
+        if controller is not None:
+            controller.trace = self
+            if controller.jog is not None:
+                controller.jog.listeners.append(self._on_jog)
+
+    def stop(self, controller=None):
+        """Para a gravação e grava os eventos pendentes"""
+        for listeners, callback in ((self.hardware.encoders.listeners, self._on_position),
+                                    (self.hardware.motors.listeners, self._on_command),
+                                    (self.hardware.limit_switches.listeners, self._on_limits),
+                                    (buttons.read_listeners, self._on_buttons)):
+            if callback in listeners:
+                listeners.remove(callback)
+        if controller is not None and controller.trace is self:
+            controller.trace = None
+        if controller is not None and controller.jog is not None and self._on_jog in controller.jog.listeners:
+            controller.jog.listeners.remove(self._on_jog)
+        self._running = False
+        if self._writer:
+            self._writer.join()
+        self._flush()
+        self._file.close()
+
+    # Ganchos chamados pelo controle (apenas enfileiram)
+
+    def tick_start(self, controller):
+        self.control_thread_id = threading.get_ident()
+        now = self._now()
+        mode = controller.manual_mode
+        if mode != self.mode:
+            self.mode = mode
+            self.events.append((now, MODE, 0, 1.0 if mode else 0.0))
+        setpoint = (controller.pid.x_setpoint, controller.pid.y_setpoint)
+        if setpoint != self.setpoint:
+            for axis, (old, new) in enumerate(zip(self.setpoint, setpoint)):
+                if old != new:
+                    self.events.append((now, SETPOINT, axis, float(new)))
+            self.setpoint = setpoint
+        self.events.append((now, TICK_START, 0, 0.0))
+
+    def calibration_start(self, measure_backlash, approach):
+        """Início da rotina de calibração, antes da iteração que a executa"""
+        channel = CALIBRATE_ARGS.index((bool(measure_backlash), approach))
+        self.events.append((self._now(), CALIBRATE, channel, 0.0))
+
+    def tick_end(self, controller):
+        self.control_thread_id = None
+        self.events.append((self._now(), TICK_END, 0, 0.0))
+
+    def _on_position(self, axis, position):
+        self.events.append((self._now(), ENCODER, AXES.index(axis), float(position)))
+
+    def _on_command(self, motor, kind, value):
+        channel = AXES.index(motor)
+        if threading.get_ident() == self.control_thread_id:
+            channel |= FROM_CONTROL_LOOP
+        self.events.append((self._now(), DIRECTION if kind == 'direction' else SPEED, channel, float(value)))
+
+    def _on_jog(self, event, argument):
+        self.events.append((self._now(), JOG, JOG_EVENTS.index((event, argument)), 0.0))
+
+    def _on_limits(self, states):
+        self._record_changes(states, self.limit_states, LIMIT, LIMIT_NAMES)
+
+    def _on_buttons(self, states):
+        self._record_changes(states, self.button_states, BUTTON, BUTTON_NAMES)
+
+    def _record_changes(self, states, last, kind, names):
+        now = None
+        for index, name in enumerate(names):
+            value = states[name]
+            if last.get(name) != value:
+                last[name] = value
+                if now is None:
+                    now = self._now()
+                self.events.append((now, kind, index, 1.0 if value else 0.0))
+
+    # Escrita em disco
+
+    def _write_loop(self):
+        while self._running:
+            self._flush()
+            time.sleep(self.flush_interval)
+
+    def _flush(self):
+        chunks = []
+        events = self.events
+        last = self._last_time
+        while events:
+            timestamp, kind, channel, value = events.popleft()
+            delta = min(MAX_DELTA_US, max(0, int(round((timestamp - last) * 1e6))))
+            last += delta / 1e6
+            chunks.append(EVENT.pack(delta, kind, channel, value))
+        self._last_time = last
+        if chunks:
+            self._file.write(b"".join(chunks))
+            self._file.flush()
+            self.written += len(chunks)
+
+
+def _read_header(data, path):
+    """Instante inicial, configuração do controlador e início dos eventos"""
+    if len(data) < HEADER.size:
+        raise ValueError(f"Arquivo de traço inválido: {path}")
+    magic, version, start_time, size = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"Arquivo de traço inválido: {path}")
+    config = json.loads(data[HEADER.size:HEADER.size + size].decode("utf-8"))
+    return start_time, config, HEADER.size + size
+
+
+def read_config(path):
+    """
+    Configuração do controlador gravada no cabeçalho do traço
+
+    Returns:
+        dict: Ver controller_config
+    """
+    with open(path, "rb") as f:
+        data = f.read(HEADER.size)
+        if len(data) == HEADER.size:
+            data += f.read(HEADER.unpack_from(data, 0)[3])
+    return _read_header(data, path)[1]
+
+
+def read_trace(path):
+    """
+    Lê um arquivo de traço
+
+    Returns:
+        tuple: (instante inicial, lista de eventos (tempo, tipo, canal, valor))
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    start_time, _, offset = _read_header(data, path)
+    # Descarta um evento incompleto no final (gravação interrompida)
+    body = data[offset:]
+    body = body[:len(body) - len(body) % EVENT.size]
+    events = []
+    elapsed = 0.0
+    for delta, kind, channel, value in EVENT.iter_unpack(body):
+        elapsed += delta / 1e6
+        events.append((elapsed, kind, channel, value))
+    return start_time, events
@@ -0,0 +1,199 @@
+# watchdog.py
+import os
+import time
+import struct
+import multiprocessing
+from multiprocessing import shared_memory
+
+# O processo de vigilância importa este módulo: nada aqui importa RPi.GPIO no
+# carregamento (o backend 'gpio' importa os pinos apenas no corte)
+
+# Prazo sem novas iterações do loop de controle até cortar os motores (s)
+WATCHDOG_DEADLINE = 0.1
+
+# Intervalo entre verificações do processo de vigilância (s)
+WATCHDOG_POLL = 0.005
+
+# Bloco escrito pelo loop de controle a cada iteração (seqlock: a sequência é
+# ímpar durante a escrita): sequência, instante, posição, velocidade, modo
+# manual e movimento em andamento
+STATE_FORMAT = "<QdqqddBB"
+STATE_SIZE = struct.calcsize(STATE_FORMAT)
+
+# Bloco escrito pelo processo de vigilância: corte ativo, número de travamentos,
+# duração do último e do maior travamento, início do travamento atual
+WATCHDOG_FORMAT = "<BQddd"
+WATCHDOG_OFFSET = (STATE_SIZE + 7) // 8 * 8
+WATCHDOG_SIZE = struct.calcsize(WATCHDOG_FORMAT)
+
+SEGMENT_SIZE = WATCHDOG_OFFSET + WATCHDOG_SIZE
+
+# Pinos levados a nível baixo no corte: ponte H desabilitada e raio-X desligado
+CUT_PINS = ('x_dir1', 'x_dir2', 'y_dir1', 'y_dir2', 'x_pwm', 'y_pwm', 'raio_x')
+
+
+class SharedState:
+    def __init__(self, name=None, create=True):
+        """
+        Segmento de memória compartilhada entre o loop de controle e o
+        processo de vigilância
+
+        Args:
+            name (str): Nome do segmento (None gera um nome ao criar)
+            create (bool): Criar o segmento (False abre um existente)
+        """
+        self.shm = shared_memory.SharedMemory(name=name, create=create, size=SEGMENT_SIZE if create else 0)
+        self.owner = create
+        self.sequence = 0
+        if create:
+            self.shm.buf[:SEGMENT_SIZE] = bytes(SEGMENT_SIZE)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def publish(self, controller, position):
+        """
+        Publica o estado do controlador (uma vez por iteração do loop)
+
+        Args:
+            controller (MotorController): Controlador
+            position (tuple): Posição atual dos encoders
+
+        Returns:
+            bool: True se o processo de vigilância cortou os motores
+        """
+        buf = self.shm.buf
+        pos_x, pos_y = position
+        self.sequence += 1
+        struct.pack_into("<Q", buf, 0, 2 * self.sequence - 1)
+        struct.pack_into(STATE_FORMAT, buf, 0, 2 * self.sequence - 1, time.monotonic(), pos_x, pos_y,
+                         float(controller.speed_x), float(controller.speed_y),
+                         1 if controller.manual_mode else 0, 1 if controller.active_move is not None else 0)
+        struct.pack_into("<Q", buf, 0, 2 * self.sequence)
+        return self.is_cut()
+
+    def is_cut(self):
+        """True se o processo de vigilância cortou os motores e o controlador ainda não confirmou"""
+        return self.shm.buf[WATCHDOG_OFFSET] != 0
+
+    def read(self):
+        """Último estado publicado (relê se a leitura coincidir com uma escrita)"""
+        buf = self.shm.buf
+        while True:
+            values = struct.unpack_from(STATE_FORMAT, buf, 0)
+            if values[0] % 2 == 0 and struct.unpack_from("<Q", buf, 0)[0] == values[0]:
+                break
+        return {"sequence": values[0] // 2, "time": values[1], "position": (values[2], values[3]),
+                "speed": (values[4], values[5]), "manual_mode": bool(values[6]), "moving": bool(values[7])}
+
+    def watchdog(self):
+        cut, trips, last, longest, since = struct.unpack_from(WATCHDOG_FORMAT, self.shm.buf, WATCHDOG_OFFSET)
+        return {"cut": bool(cut), "trips": trips, "last_stall_s": last, "max_stall_s": longest,
+                "stalled_since": since or None}
+
+    def _write_watchdog(self, cut, trips, last, longest, since):
+        struct.pack_into(WATCHDOG_FORMAT, self.shm.buf, WATCHDOG_OFFSET, cut, trips, last, longest, since)
+
+    def acknowledge(self):
+        """Libera o corte depois que o controlador colocou os motores em estado seguro"""
+        self.shm.buf[WATCHDOG_OFFSET] = 0
+
+    def close(self):
+        self.shm.close()
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def cut_gpio_outputs():
+    """Leva os pinos dos motores e do raio-X a nível baixo (processo de vigilância)"""
+    import RPi.GPIO as GPIO
+    from gpio.motors import MOTOR_PINS
+    GPIO.setwarnings(False)
+    GPIO.setmode(GPIO.BCM)
+    for name in CUT_PINS:
+        GPIO.setup(MOTOR_PINS[name], GPIO.OUT, initial=GPIO.LOW)
+
+
+def _watch(name, deadline, poll, backend, parent, stop):
+    """Laço do processo de vigilância"""
+    state = SharedState(name, create=False)
+    last_sequence = None
+    last_change = time.monotonic()
+    stalled_since = 0.0
+    trips, last_stall, longest = 0, 0.0, 0.0
+    try:
+        while not stop.is_set():
+            time.sleep(poll)
+            now = time.monotonic()
+            sequence = struct.unpack_from("<Q", state.shm.buf, 0)[0]
+            if sequence != last_sequence:
+                if stalled_since:
+                    last_stall = now - stalled_since
+                    longest = max(longest, last_stall)
+                    stalled_since = 0.0
+                    state._write_watchdog(state.shm.buf[WATCHDOG_OFFSET], trips, last_stall, longest, 0.0)
+                last_sequence = sequence
+                last_change = now
+                continue
+            orphaned = os.getppid() != parent
+            if sequence == 0 and not orphaned:
+                # Loop de controle ainda não começou
+                continue
+            if not stalled_since and (now - last_change > deadline or orphaned):
+                if backend == 'gpio':
+                    cut_gpio_outputs()
+                stalled_since = last_change
+                trips += 1
+                state._write_watchdog(1, trips, last_stall, longest, stalled_since)
+            if orphaned:
+                break
+    finally:
+        state.shm.close()
+
+
+class Watchdog:
+    def __init__(self, state, deadline=WATCHDOG_DEADLINE, poll=WATCHDOG_POLL, backend='gpio'):
+        """
+        Processo de vigilância do loop de controle. Se a sequência publicada
+        em 'state' não mudar dentro de 'deadline' segundos (ou se o processo
+        principal terminar), os motores são cortados e o travamento é
+        registrado no segmento compartilhado, com a sua duração quando o loop
+        voltar.
+
+        Args:
+            state (SharedState): Segmento publicado pelo MotorController
+            deadline (float): Prazo sem iterações até o corte (s)
+            poll (float): Intervalo entre verificações (s)
+            backend (str): 'gpio' escreve nos pinos com RPi.GPIO; 'sim' apenas
+                sinaliza o corte no segmento (lido pelo pórtico simulado)
+        """
+        if backend not in ('gpio', 'sim'):
+            raise ValueError(f"Backend desconhecido: {backend}")
+        self.state = state
+        self.deadline = deadline
+        self.poll = poll
+        self.backend = backend
+        self.process = None
+        self._stop = None
+
+    def start(self):
+        context = multiprocessing.get_context("spawn")
+        self._stop = context.Event()
+        self.process = context.Process(
+            target=_watch, name="watchdog", daemon=True,
+            args=(self.state.name, self.deadline, self.poll, self.backend, os.getpid(), self._stop))
+        self.process.start()
+        return self
+
+    def stop(self):
+        if self.process is not None:
+            self._stop.set()
+            self.process.join(timeout=1.0)
+            self.process = None
+
+    def status(self):
+        return self.state.watchdog()
@@ -9,9 +9,15 @@ BUTTONS = {
     'emergency': 11
 }
 
+# Funções chamadas a cada leitura com o dicionário de estados
+read_listeners = []
+
 def setup_buttons():
     for pin in BUTTONS.values():
         GPIO.setup(pin, GPIO.IN, pull_up_down=GPIO.PUD_UP)
 
 def read_buttons():
-    return {name: not GPIO.input(pin) for name, pin in BUTTONS.items()}
+    states = {name: not GPIO.input(pin) for name, pin in BUTTONS.items()}
+    for listener in read_listeners:
+        listener(states)
+    return states
@@ -7,6 +7,7 @@ ENCODERS = {
     'y_b': 13
 }
 
-def setup_encoders():
+def setup_encoders(gpio=None):
+    gpio = gpio if gpio is not None else GPIO
     for pin in ENCODERS.values():
-        GPIO.setup(pin, GPIO.IN)
+        gpio.setup(pin, gpio.IN)
@@ -1,8 +1,9 @@
 import RPi.GPIO as GPIO
 
-def setup_gpio():
-    GPIO.setmode(GPIO.BCM)
-    GPIO.setwarnings(False)
+def setup_gpio(gpio=None):
+    gpio = gpio if gpio is not None else GPIO
+    gpio.setmode(gpio.BCM)
+    gpio.setwarnings(False)
 
 def cleanup_gpio():
     GPIO.cleanup()
@@ -7,9 +7,45 @@ LIMIT_SWITCHES = {
     'y_max': 21
 }
 
+
+class LimitSwitches:
+    def __init__(self, gpio=None, pins=LIMIT_SWITCHES):
+        """
+        Chaves de fim de curso de um pórtico
+
+        Args:
+            gpio: Backend GPIO (padrão: o RPi.GPIO do módulo)
+            pins (dict): Pinos no formato de LIMIT_SWITCHES
+        """
+        self.gpio = gpio
+        self.pins = pins
+        # Funções chamadas a cada leitura com o dicionário de estados
+        self.listeners = []
+
+    def backend(self):
+        return self.gpio if self.gpio is not None else GPIO
+
+    def setup(self):
+        gpio = self.backend()
+        for pin in self.pins.values():
+            gpio.setup(pin, gpio.IN, pull_up_down=gpio.PUD_UP)
+
+    def read(self):
+        gpio = self.backend()
+        states = {name: not gpio.input(pin) for name, pin in self.pins.items()}
+        for listener in self.listeners:
+            listener(states)
+        return states
+
+
+# Chaves do pórtico padrão, usadas pelas funções abaixo (ver controle/hardware.py)
+default_limit_switches = LimitSwitches()
+
+# Funções chamadas a cada leitura do pórtico padrão com o dicionário de estados
+read_listeners = default_limit_switches.listeners
+
 def setup_limit_switches():
-    for pin in LIMIT_SWITCHES.values():
-        GPIO.setup(pin, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+    default_limit_switches.setup()
 
 def read_limit_switches():
-    return {name: not GPIO.input(pin) for name, pin in LIMIT_SWITCHES.items()}
+    return default_limit_switches.read()
@@ -14,79 +14,139 @@ MOTOR_PINS = {
 # Frequência PWM (1 kHz conforme especificado)
 PWM_FREQ = 1000
 
-# Objetos PWM
-pwm_x = None
-pwm_y = None
+
+class Motors:
+    def __init__(self, gpio=None, pins=MOTOR_PINS, frequency=PWM_FREQ):
+        """
+        Saídas dos motores e do raio-X de um pórtico
+
+        Args:
+            gpio: Backend GPIO (padrão: o RPi.GPIO do módulo, resolvido a cada
+                chamada para acompanhar o backend simulado instalado)
+            pins (dict): Pinos no formato de MOTOR_PINS
+            frequency (int): Frequência do PWM (Hz)
+        """
+        self.gpio = gpio
+        self.pins = pins
+        self.frequency = frequency
+        # Objetos PWM
+        self.pwm = {'x': None, 'y': None}
+        # Funções chamadas a cada comando com (motor, 'direction' ou 'speed', valor)
+        self.listeners = []
+
+    def backend(self):
+        return self.gpio if self.gpio is not None else GPIO
+
+    def setup(self):
+        """Configura os pinos dos motores e inicializa o PWM"""
+        gpio = self.backend()
+        # Configurar pinos como saída
+        for pin in self.pins.values():
+            gpio.setup(pin, gpio.OUT)
+            gpio.output(pin, gpio.LOW)
+
+        # Inicializar PWM com duty cycle 0 (motor parado)
+        for motor in ('x', 'y'):
+            self.pwm[motor] = gpio.PWM(self.pins[f'{motor}_pwm'], self.frequency)
+            self.pwm[motor].start(0)
+
+    def set_direction(self, motor, direction):
+        """
+        Define a direção do motor
+
+        Args:
+            motor (str): 'x' ou 'y'
+            direction (int): 1 para frente, -1 para trás, 0 para parar
+        """
+        gpio = self.backend()
+        dir1_pin = self.pins[f'{motor}_dir1']
+        dir2_pin = self.pins[f'{motor}_dir2']
+
+        if direction == 1:  # Frente
+            gpio.output(dir1_pin, gpio.HIGH)
+            gpio.output(dir2_pin, gpio.LOW)
+        elif direction == -1:  # Trás
+            gpio.output(dir1_pin, gpio.LOW)
+            gpio.output(dir2_pin, gpio.HIGH)
+        else:  # Parar (direction == 0)
+            gpio.output(dir1_pin, gpio.LOW)
+            gpio.output(dir2_pin, gpio.LOW)
+
+        for listener in self.listeners:
+            listener(motor, 'direction', direction)
+
+    def set_speed(self, motor, speed):
+        """
+        Define a velocidade do motor usando PWM
+
+        Args:
+            motor (str): 'x' ou 'y'
+            speed (float): Velocidade do motor (0 a 100)
+        """
+        # Garantir que a velocidade está entre 0 e 100
+        speed = max(0, min(100, speed))
+        self.pwm[motor].ChangeDutyCycle(speed)
+
+        for listener in self.listeners:
+            listener(motor, 'speed', speed)
+
+    def stop(self):
+        """Para todos os motores"""
+        self.set_direction('x', 0)
+        self.set_direction('y', 0)
+        self.set_speed('x', 0)
+        self.set_speed('y', 0)
+
+    def activate_raio_x(self, activate=True):
+        """
+        Ativa ou desativa o raio-X (captura de imagem)
+
+        Args:
+            activate (bool): True para ativar, False para desativar
+        """
+        gpio = self.backend()
+        gpio.output(self.pins['raio_x'], gpio.HIGH if activate else gpio.LOW)
+
+
+# Saídas do pórtico padrão, usadas pelas funções abaixo (ver controle/hardware.py)
+default_motors = Motors()
+
+# Funções chamadas a cada comando do pórtico padrão com (motor, 'direction' ou 'speed', valor)
+command_listeners = default_motors.listeners
 
 def setup_motors():
     """Configura os pinos dos motores e inicializa o PWM"""
-    # Configurar pinos como saída
-    for pin in MOTOR_PINS.values():
-        GPIO.setup(pin, GPIO.OUT)
-        GPIO.output(pin, GPIO.LOW)
-    
-    # Inicializar PWM
-    global pwm_x, pwm_y
-    pwm_x = GPIO.PWM(MOTOR_PINS['x_pwm'], PWM_FREQ)
-    pwm_y = GPIO.PWM(MOTOR_PINS['y_pwm'], PWM_FREQ)
-    
-    # Iniciar PWM com duty cycle 0 (motor parado)
-    pwm_x.start(0)
-    pwm_y.start(0)
+    default_motors.setup()
 
 def set_motor_direction(motor, direction):
     """
     Define a direção do motor
-    
+
     Args:
         motor (str): 'x' ou 'y'
         direction (int): 1 para frente, -1 para trás, 0 para parar
     """
-    if motor == 'x':
-        dir1_pin = MOTOR_PINS['x_dir1']
-        dir2_pin = MOTOR_PINS['x_dir2']
-    else:  # motor == 'y'
-        dir1_pin = MOTOR_PINS['y_dir1']
-        dir2_pin = MOTOR_PINS['y_dir2']
-    
-    if direction == 1:  # Frente
-        GPIO.output(dir1_pin, GPIO.HIGH)
-        GPIO.output(dir2_pin, GPIO.LOW)
-    elif direction == -1:  # Trás
-        GPIO.output(dir1_pin, GPIO.LOW)
-        GPIO.output(dir2_pin, GPIO.HIGH)
-    else:  # Parar (direction == 0)
-        GPIO.output(dir1_pin, GPIO.LOW)
-        GPIO.output(dir2_pin, GPIO.LOW)
+    default_motors.set_direction(motor, direction)
 
 def set_motor_speed(motor, speed):
     """
     Define a velocidade do motor usando PWM
-    
+
     Args:
         motor (str): 'x' ou 'y'
         speed (float): Velocidade do motor (0 a 100)
     """
-    # Garantir que a velocidade está entre 0 e 100
-    speed = max(0, min(100, speed))
-    
-    if motor == 'x':
-        pwm_x.ChangeDutyCycle(speed)
-    else:  # motor == 'y'
-        pwm_y.ChangeDutyCycle(speed)
+    default_motors.set_speed(motor, speed)
 
 def stop_motors():
     """Para todos os motores"""
-    set_motor_direction('x', 0)
-    set_motor_direction('y', 0)
-    set_motor_speed('x', 0)
-    set_motor_speed('y', 0)
+    default_motors.stop()
 
 def activate_raio_x(activate=True):
     """
     Ativa ou desativa o raio-X (captura de imagem)
-    
+
     Args:
         activate (bool): True para ativar, False para desativar
     """
-    GPIO.output(MOTOR_PINS['raio_x'], GPIO.HIGH if activate else GPIO.LOW)
+    default_motors.activate_raio_x(activate)
@@ -3,8 +3,19 @@ from gpio.buttons import setup_buttons, read_buttons
 from gpio.limitswitches import setup_limit_switches, read_limit_switches
 from gpio.encoder_gpio import setup_encoders
 from gpio.motors import setup_motors, stop_motors
-from controle.encoder import setup_encoder_interrupts, get_position
+from controle.encoder import setup_encoder_interrupts
 from controle.motor_control import MotorController
+from controle.trace import TraceRecorder
+from controle.autotune import apply_saved_gains
+from controle.profiling import install_signal_toggle
+from controle.metrics import MetricsCollector, MetricsServer
+from controle.environment import SensorMonitor, create_bmp280_sensor, configure_logging
+from controle.thermal import ThermalCompensation
+from controle.calibration_map import CalibrationMap
+from controle.startup import StartupSequencer
+from controle.watchdog import SharedState, Watchdog
+from controle.control_process import ControlProcess
+from controle.jog import JogController
 
 import time
 import signal
@@ -13,6 +24,19 @@ import sys
 # Controlador global para acesso no handler de sinal
 motor_controller = None
 
+# Gravador de traços opcional (--trace ARQUIVO)
+trace_recorder = None
+
+# Leitura do BMP280 em segundo plano (compensação térmica e métricas)
+sensor_monitor = None
+
+# Endpoint de métricas opcional (--metrics PORTA)
+metrics_collector = None
+metrics_server = None
+
+# Processo de vigilância opcional do loop de controle (--watchdog)
+watchdog = None
+
 def signal_handler(sig, frame):
     print("\nEncerrando com segurança...")
     if motor_controller:
@@ -20,24 +44,171 @@ def signal_handler(sig, frame):
     cleanup_gpio()
     sys.exit(0)
 
-def main():
+def start_trace(path):
+    """Começa a gravar o traço do controlador (antes de iniciar o loop de controle)"""
+    global trace_recorder
+    if path:
+        trace_recorder = TraceRecorder(path)
+        trace_recorder.start(motor_controller)
+
+def load_tuned_gains():
+    """Carrega os ganhos PID por eixo gravados pela sintonia automática"""
+    axes = apply_saved_gains(motor_controller.pid)
+    if axes:
+        print(f"Ganhos PID ajustados carregados para os eixos: {', '.join(a.upper() for a in axes)}")
+
+def load_calibration_map():
+    """Carrega o mapa de calibração não linear dos eixos, se existir"""
+    motor_controller.calibration = CalibrationMap.load()
+    if motor_controller.calibration:
+        print("Mapa de calibração dos eixos carregado")
+
+def stop_trace():
+    global trace_recorder
+    if trace_recorder:
+        trace_recorder.stop(motor_controller)
+        trace_recorder = None
+
+def start_sensor_monitor():
+    """
+    Inicia a leitura do BMP280 em segundo plano e aplica a compensação
+    térmica calibrada (se houver) ao controlador
+    """
+    global sensor_monitor
+    # O sensor é procurado na thread do monitor, sem atrasar a inicialização
+    sensor_monitor = SensorMonitor(factory=create_bmp280_sensor).start()
+    motor_controller.thermal = ThermalCompensation.load(sensor_monitor)
+    if motor_controller.thermal:
+        print(f"Compensação térmica ativa ({motor_controller.thermal.coefficient * 1e6:.2f} ppm/°C)")
+
+def stop_sensor_monitor():
+    global sensor_monitor
+    if sensor_monitor:
+        sensor_monitor.close()
+        sensor_monitor = None
+
+def start_metrics(port):
+    """Inicia o endpoint HTTP de métricas"""
+    global metrics_collector, metrics_server
+    if port is None:
+        return
+    metrics_collector = MetricsCollector(motor_controller, sensor_monitor).start()
+    metrics_server = MetricsServer(metrics_collector, port=port).start()
+    print(f"Métricas disponíveis em {metrics_server.address}")
+
+def stop_metrics():
+    global metrics_collector, metrics_server
+    if metrics_server:
+        metrics_server.stop()
+        metrics_server = None
+    if metrics_collector:
+        metrics_collector.stop()
+        metrics_collector = None
+
+def start_watchdog(enabled):
+    """Publica o estado do loop em memória compartilhada e inicia o processo de vigilância"""
+    global watchdog
+    if not enabled:
+        return
+    motor_controller.shared_state = SharedState()
+    watchdog = Watchdog(motor_controller.shared_state).start()
+    print(f"Watchdog ativo (corte após {watchdog.deadline * 1e3:.0f} ms sem iterações)")
+
+def stop_watchdog():
+    global watchdog
+    if watchdog:
+        watchdog.stop()
+        status = watchdog.status()
+        if status["trips"]:
+            print(f"Watchdog: {status['trips']} corte(s), maior travamento {status['max_stall_s'] * 1e3:.0f} ms")
+        motor_controller.shared_state = None
+        watchdog.state.close()
+        watchdog = None
+
+def create_controller(use_jog=False):
     global motor_controller
+    motor_controller = MotorController()
+    # Botões de direção com jog em malha fechada de velocidade (--jog); os
+    # parâmetros padrão do jog foram ajustados no pórtico simulado
+    if use_jog:
+        motor_controller.jog = JogController()
+
+def start_control_process(options, use_watchdog):
+    """
+    Inicia o loop de controle em um processo dedicado; motor_controller passa a
+    ser o cliente (ControlProcess), com a mesma interface do MotorController
+    """
+    global motor_controller, watchdog
+    state = SharedState() if use_watchdog else None
+    motor_controller = ControlProcess(watchdog_state=state, **options).start()
+    if state:
+        watchdog = Watchdog(state).start()
+        print(f"Watchdog ativo (corte após {watchdog.deadline * 1e3:.0f} ms sem iterações)")
+
+def startup_isolated(options, use_watchdog=False):
+    """
+    Inicialização com o loop de controle isolado: este processo configura só
+    os botões e as chaves de fim de curso lidos pelo loop principal; encoders e
+    motores ficam com o processo de controle
+    """
+    sequencer = StartupSequencer()
+    sequencer.stage("gpio", setup_gpio)
+    sequencer.stage("buttons", setup_buttons, after=("gpio",))
+    sequencer.stage("limits", setup_limit_switches, after=("gpio",))
+    sequencer.stage("control", lambda: start_control_process(options, use_watchdog), after=("gpio",))
+    try:
+        sequencer.run()
+    finally:
+        sequencer.print_timeline()
+    return sequencer
+
+def startup(trace_path=None, metrics_port=None, use_watchdog=False, isolated=None, use_jog=False):
+    """
+    Inicializa periféricos e controlador. Estágios independentes rodam em
+    paralelo; o loop de controle começa assim que GPIO, ganhos e mapas estão
+    prontos, e o sensor ambiental é procurado depois, em segundo plano.
     
+    Com 'isolated' (argumentos do ControlProcess) o loop de controle roda em
+    um processo dedicado; traço, métricas e compensação térmica dependem do
+    controlador no mesmo processo e não são iniciados.
+    """
+    if isolated is not None:
+        if trace_path or metrics_port is not None:
+            print("Traço e métricas não estão disponíveis com o loop de controle isolado")
+        return startup_isolated(isolated, use_watchdog)
+    sequencer = StartupSequencer()
+    sequencer.stage("gpio", setup_gpio)
+    sequencer.stage("buttons", setup_buttons, after=("gpio",))
+    sequencer.stage("limits", setup_limit_switches, after=("gpio",))
+    sequencer.stage("encoders", setup_encoders, after=("gpio",))
+    sequencer.stage("interrupts", setup_encoder_interrupts, after=("encoders",))
+    sequencer.stage("controller", lambda: create_controller(use_jog), after=("gpio",))
+    sequencer.stage("gains", load_tuned_gains, after=("controller",))
+    sequencer.stage("calibration", load_calibration_map, after=("controller",))
+    sequencer.stage("trace", lambda: start_trace(trace_path), after=("controller",))
+    sequencer.stage("watchdog", lambda: start_watchdog(use_watchdog), after=("controller",))
+    sequencer.stage("control", lambda: motor_controller.start(),
+                    after=("buttons", "limits", "interrupts", "gains", "calibration", "trace", "watchdog"))
+    sequencer.stage("sensor", start_sensor_monitor, after=("controller",))
+    sequencer.stage("metrics", lambda: start_metrics(metrics_port), after=("control", "sensor"))
     try:
-        # Configurar GPIO e periféricos
-        setup_gpio()
-        setup_buttons()
-        setup_limit_switches()
-        setup_encoders()
-        setup_encoder_interrupts()
-        
-        # Inicializar controlador de motor
-        motor_controller = MotorController()
-        motor_controller.start()
+        sequencer.run()
+    finally:
+        sequencer.print_timeline()
+    return sequencer
+
+def main(trace_path=None, metrics_port=None, use_watchdog=False, isolated=None, use_jog=False):
+    try:
+        configure_logging()
+        startup(trace_path, metrics_port, use_watchdog, isolated, use_jog)
         
         # Registrar handler para SIGINT (Ctrl+C)
         signal.signal(signal.SIGINT, signal_handler)
         
+        # Perfil por amostragem do loop de controle: kill -USR1 <pid> liga/desliga
+        if isolated is None:
+            install_signal_toggle(motor_controller)
+        
         print("Sistema de controle da máquina de raio-X iniciado")
         print("Pressione Ctrl+C para sair")
         
@@ -56,7 +227,7 @@ def main():
             elif buttons['right']:
                 motor_controller.move_manual('right')
             elif buttons['emergency']:
-                motor_controller.stop_movement()
+                motor_controller.emergency_stop()
             else:
                 # Se nenhum botão está pressionado, parar os motores no modo manual
                 if motor_controller.manual_mode:
@@ -64,7 +235,7 @@ def main():
             
             # Obter informações do sistema
             limits = read_limit_switches()
-            pos_x, pos_y = get_position()
+            pos_x, pos_y = motor_controller.get_position()
             pos_x_m, pos_y_m = motor_controller.get_position_meters()
             speed_x_mps, speed_y_mps = motor_controller.get_speed_meters_per_second()
             
@@ -82,25 +253,22 @@ def main():
     
     finally:
         # Garantir que os motores sejam parados e GPIO limpo
+        stop_metrics()
+        stop_sensor_monitor()
         if motor_controller:
             motor_controller.stop()
+        stop_watchdog()
+        stop_trace()
         cleanup_gpio()
 
-def test_motor_control():
-    """Função para testar o controle básico dos motores"""
-    global motor_controller
-    
+def test_motor_control(trace_path=None, metrics_port=None, use_watchdog=False, isolated=None, use_jog=False):
+    """
+    Função para testar o controle básico dos motores (comandos únicos em malha
+    aberta, mantidos até stop_movement mesmo com o jog ativo)
+    """
     try:
-        # Configurar GPIO e periféricos
-        setup_gpio()
-        setup_buttons()
-        setup_limit_switches()
-        setup_encoders()
-        setup_encoder_interrupts()
-        
-        # Inicializar controlador de motor
-        motor_controller = MotorController()
-        motor_controller.start()
+        configure_logging()
+        startup(trace_path, metrics_port, use_watchdog, isolated, use_jog)
         
         # Registrar handler para SIGINT (Ctrl+C)
         signal.signal(signal.SIGINT, signal_handler)
@@ -110,7 +278,7 @@ def test_motor_control():
         
         # Testar movimento do motor X
         print("Movendo motor X para frente por 2 segundos...")
-        motor_controller.move_manual('right')
+        motor_controller.move_manual('right', held=False)
         time.sleep(2)
         
         print("Parando motor X...")
@@ -118,7 +286,7 @@ def test_motor_control():
         time.sleep(1)
         
         print("Movendo motor X para trás por 2 segundos...")
-        motor_controller.move_manual('left')
+        motor_controller.move_manual('left', held=False)
         time.sleep(2)
         
         print("Parando motor X...")
@@ -127,7 +295,7 @@ def test_motor_control():
         
         # Testar movimento do motor Y
         print("Movendo motor Y para cima por 2 segundos...")
-        motor_controller.move_manual('up')
+        motor_controller.move_manual('up', held=False)
         time.sleep(2)
         
         print("Parando motor Y...")
@@ -135,7 +303,7 @@ def test_motor_control():
         time.sleep(1)
         
         print("Movendo motor Y para baixo por 2 segundos...")
-        motor_controller.move_manual('down')
+        motor_controller.move_manual('down', held=False)
         time.sleep(2)
         
         print("Parando motor Y...")
@@ -148,13 +316,38 @@ def test_motor_control():
     
     finally:
         # Garantir que os motores sejam parados e GPIO limpo
+        stop_metrics()
+        stop_sensor_monitor()
         if motor_controller:
             motor_controller.stop()
+        stop_watchdog()
+        stop_trace()
         cleanup_gpio()
 
 if __name__ == "__main__":
+    # Gravação opcional de traço para replay offline: --trace ARQUIVO
+    trace_path = sys.argv[sys.argv.index("--trace") + 1] if "--trace" in sys.argv[:-1] else None
+    
+    # Endpoint local de métricas no formato do Prometheus: --metrics PORTA
+    metrics_port = int(sys.argv[sys.argv.index("--metrics") + 1]) if "--metrics" in sys.argv[:-1] else None
+    
+    # Processo separado que corta os motores se o loop de controle travar: --watchdog
+    use_watchdog = "--watchdog" in sys.argv
+    
+    # Jog em malha fechada de velocidade nos botões de direção: --jog
+    use_jog = "--jog" in sys.argv
+    
+    # Loop de controle em processo dedicado: --isolated [--cpu N] [--priority N]
+    isolated = None
+    if "--isolated" in sys.argv:
+        isolated = {
+            "cpu": int(sys.argv[sys.argv.index("--cpu") + 1]) if "--cpu" in sys.argv[:-1] else None,
+            "priority": int(sys.argv[sys.argv.index("--priority") + 1]) if "--priority" in sys.argv[:-1] else None,
+            "jog": use_jog,
+        }
+    
     # Para testar apenas o controle dos motores, descomente a linha abaixo
-    test_motor_control()
+    test_motor_control(trace_path, metrics_port, use_watchdog, isolated, use_jog)
     
     # Para executar o sistema completo
-    # main()
\ No newline at end of file
+    # main(trace_path, metrics_port, use_watchdog, isolated, use_jog)
\ No newline at end of file
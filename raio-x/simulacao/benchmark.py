@@ -0,0 +1,222 @@
+# benchmark.py
+import sys
+import json
+import time
+import random
+import argparse
+
+from simulacao.gantry import SimulatedGantry, AxisModel
+from controle.encoder import get_position
+from controle.autotune import autotune, print_results
+from controle.pid import PIDController, ScheduledPIDController
+from controle.profiling import measure_overhead, print_snapshot
+
+# Controladores de posição comparáveis no benchmark
+CONTROLLERS = {
+    'pid': PIDController,
+    'scheduled': ScheduledPIDController
+}
+
+# Ganhos usados quando nenhum é informado (execução simples e comparação): o
+# PIDController com os ganhos padrão não acomoda a maior parte dos movimentos no
+# modelo simulado (cada um esperaria MOVE_TIMEOUT), então ele usa ganhos PD que
+# funcionam; o ScheduledPIDController usa os seus padrões
+COMPARE_GAINS = {
+    'pid': (17.0, 0.0, 0.5),
+    'scheduled': None
+}
+
+# Tempo máximo (simulado) para cada movimento e cada referenciamento
+MOVE_TIMEOUT = 20.0
+HOMING_TIMEOUT = 60.0
+
+# Velocidade abaixo da qual o eixo é considerado parado (contagens/s)
+SETTLED_SPEED = 1.0
+
+
+def is_settled(controller):
+    """Verdadeiro quando o alvo foi atingido e os dois eixos estão parados"""
+    return (controller.pid.is_position_reached()
+            and abs(controller.speed_x) < SETTLED_SPEED
+            and abs(controller.speed_y) < SETTLED_SPEED)
+
+
+def random_targets(count, travel, margin=50, seed=0):
+    """Gera alvos aleatórios reprodutíveis dentro do curso"""
+    rng = random.Random(seed)
+    return [(rng.randint(margin, travel - margin), rng.randint(margin, travel - margin))
+            for _ in range(count)]
+
+
+def summarize(times):
+    """Estatísticas dos tempos de movimento bem-sucedidos"""
+    ok = sorted(t for t in times if t is not None)
+    if not ok:
+        return {"count": len(times), "succeeded": 0}
+    return {
+        "count": len(times),
+        "succeeded": len(ok),
+        "mean_s": sum(ok) / len(ok),
+        "p50_s": ok[len(ok) // 2],
+        "p90_s": ok[min(len(ok) - 1, int(len(ok) * 0.9))],
+        "max_s": ok[-1]
+    }
+
+
+def bench_moves(gantry, controller, targets, timeout=MOVE_TIMEOUT):
+    """
+    Executa uma sequência de movimentos ponto a ponto
+
+    Returns:
+        list: Tempo simulado de cada movimento (None se não estabilizou)
+    """
+    times = []
+    for x, y in targets:
+        controller.go_to_position(x, y)
+        times.append(gantry.run_until(controller, lambda: is_settled(controller), timeout))
+    return times
+
+
+def bench_homing(gantry, controller, cycles, timeout=HOMING_TIMEOUT):
+    """
+    Executa ciclos de referenciamento (calibrate) a partir de posições variadas
+
+    Returns:
+        list: Tempo simulado de cada ciclo (None se não terminou calibrado)
+    """
+    times = []
+    travel = gantry.axes['x'].travel
+    for target in random_targets(cycles, travel, seed=cycles):
+        controller.go_to_position(*target)
+        gantry.run_until(controller, lambda: is_settled(controller), timeout)
+        start = gantry.clock.now
+        controller.calibrate()
+        elapsed = gantry.clock.now - start
+        times.append(elapsed if controller.calibrated and elapsed < timeout else None)
+    return times
+
+
+def run(moves=1000, homing=100, seed=0, tune=False, controller_kind='pid', gains=None, backlash=0.0,
+        compensate=False):
+    """
+    Executa o benchmark em um pórtico simulado novo
+
+    Args:
+        controller_kind (str): Controlador de posição ('pid' ou 'scheduled')
+        gains (tuple): Ganhos (kp, ki, kd) aplicados aos dois eixos antes dos movimentos
+            (padrão: COMPARE_GAINS do controlador)
+        backlash (float): Folga simulada de cada eixo (contagens)
+        compensate (bool): Medir a folga na calibração e ativar a compensação
+    """
+    gantry = SimulatedGantry(AxisModel(backlash=backlash), AxisModel(backlash=backlash)).install()
+    # O PID é criado depois de instalar o relógio virtual
+    controller = gantry.create_controller(CONTROLLERS[controller_kind]())
+    if gains is None:
+        gains = COMPARE_GAINS[controller_kind]
+    if gains:
+        for axis in ('x', 'y'):
+            controller.pid.set_gains(axis, *gains)
+    wall_start = time.perf_counter()
+    tuning = None
+    try:
+        controller.calibrate(measure_backlash=compensate)
+        if tune:
+            tuning = autotune(controller, wait=lambda seconds: gantry.run(controller, seconds))
+        targets = random_targets(moves, gantry.axes['x'].travel, seed=seed)
+        move_times = bench_moves(gantry, controller, targets)
+        homing_times = bench_homing(gantry, controller, homing)
+    finally:
+        gantry.uninstall()
+    wall = time.perf_counter() - wall_start
+    return {
+        "controller": controller_kind,
+        "backlash": backlash,
+        "compensated": compensate,
+        "seed": seed,
+        "simulated_s": gantry.clock.now,
+        "wall_s": wall,
+        "speedup": gantry.clock.now / wall if wall > 0 else 0.0,
+        "final_position": get_position(),
+        "autotune": tuning,
+        "moves": summarize(move_times),
+        "homing": summarize(homing_times),
+        "profile": controller.profiler.snapshot()
+    }
+
+
+def compare(moves=1000, homing=100, seed=0, tune=False, gains=None, backlash=0.0, compensate=False):
+    """
+    Executa o mesmo benchmark com cada controlador de posição
+
+    Args:
+        gains (tuple): Ganhos aplicados a todos os controladores (padrão: COMPARE_GAINS)
+    """
+    return {kind: run(moves, homing, seed, tune, kind, gains, backlash, compensate)
+            for kind in CONTROLLERS}
+
+
+def print_report(report):
+    if report["autotune"]:
+        print_results(report["autotune"])
+    print(f"Controlador: {report['controller']}")
+    print(f"Tempo simulado: {report['simulated_s']:.1f} s | Tempo real: {report['wall_s']:.2f} s | "
+          f"Aceleração: {report['speedup']:.0f}x")
+    for name in ("moves", "homing"):
+        data = report[name]
+        line = f"{name:<7} {data['succeeded']}/{data['count']} concluídos"
+        if data["succeeded"]:
+            line += (f" | média {data['mean_s']:.2f} s, p50 {data['p50_s']:.2f} s, "
+                     f"p90 {data['p90_s']:.2f} s, máx {data['max_s']:.2f} s")
+        print(line)
+
+
+def print_profile(report):
+    """Tempos dos estágios do loop e custo da instrumentação em relação ao período"""
+    print_snapshot(report["profile"])
+    overhead = measure_overhead()
+    budget = report["profile"]["period_us"] * 1e3
+    print(f"Custo da instrumentação: {overhead / 1e3:.2f} µs por iteração "
+          f"({100.0 * overhead / budget:.3f}% do período)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark do controle do pórtico no simulador')
+    parser.add_argument('--moves', type=int, default=1000, help='Número de movimentos aleatórios')
+    parser.add_argument('--homing', type=int, default=100, help='Número de ciclos de referenciamento')
+    parser.add_argument('--seed', type=int, default=0, help='Semente dos alvos aleatórios')
+    parser.add_argument('--autotune', action='store_true', help='Sintonizar o PID por relé antes dos movimentos')
+    parser.add_argument('--controller', choices=tuple(CONTROLLERS), default='pid',
+                        help='Controlador de posição')
+    parser.add_argument('--gains', type=float, nargs=3, metavar=('KP', 'KI', 'KD'),
+                        help='Ganhos aplicados aos dois eixos (padrão: ganhos do benchmark para o controlador)')
+    parser.add_argument('--compare', action='store_true',
+                        help='Comparar todos os controladores nos mesmos movimentos')
+    parser.add_argument('--backlash', type=float, default=0.0, help='Folga simulada dos eixos (contagens)')
+    parser.add_argument('--compensate-backlash', action='store_true',
+                        help='Medir a folga na calibração e compensar as inversões')
+    parser.add_argument('--profile', action='store_true', help='Mostrar os tempos dos estágios do loop')
+    parser.add_argument('--output', help='Arquivo JSON onde gravar os resultados')
+    args = parser.parse_args()
+
+    if args.compare:
+        report = compare(args.moves, args.homing, args.seed, args.autotune, args.gains, args.backlash,
+                         args.compensate_backlash)
+        for result in report.values():
+            print_report(result)
+            if args.profile:
+                print_profile(result)
+            print()
+    else:
+        report = run(args.moves, args.homing, args.seed, args.autotune, args.controller, args.gains,
+                     args.backlash, args.compensate_backlash)
+        print_report(report)
+        if args.profile:
+            print_profile(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
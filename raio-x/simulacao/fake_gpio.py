@@ -0,0 +1,161 @@
+# fake_gpio.py
+import sys
+import types
+
+
+class FakePWM:
+    """Canal PWM simulado (mesma interface de RPi.GPIO.PWM)"""
+
+    def __init__(self, gpio, channel, frequency):
+        self.gpio = gpio
+        self.channel = channel
+        self.frequency = frequency
+        self.duty_cycle = 0.0
+        self.running = False
+
+    def start(self, duty_cycle):
+        self.running = True
+        self.ChangeDutyCycle(duty_cycle)
+
+    def ChangeDutyCycle(self, duty_cycle):
+        self.gpio.write_count += 1
+        self.duty_cycle = float(duty_cycle)
+
+    def ChangeFrequency(self, frequency):
+        self.frequency = frequency
+
+    def stop(self):
+        self.running = False
+        self.duty_cycle = 0.0
+
+
+class FakeGPIO:
+    """
+    Backend GPIO simulado com a mesma interface usada do RPi.GPIO.
+
+    Pinos de saída e PWM guardam o último valor escrito; pinos de entrada são
+    controlados pela simulação através de set_input(), que dispara os callbacks
+    registrados com add_event_detect() como as interrupções reais.
+    """
+
+    # Constantes do RPi.GPIO
+    BOARD = 10
+    BCM = 11
+    OUT = 0
+    IN = 1
+    LOW = 0
+    HIGH = 1
+    PUD_OFF = 20
+    PUD_DOWN = 21
+    PUD_UP = 22
+    RISING = 31
+    FALLING = 32
+    BOTH = 33
+
+    def __init__(self):
+        self.mode = None
+        self.levels = {}      # pino -> nível atual
+        self.directions = {}  # pino -> IN/OUT
+        self.callbacks = {}   # pino -> (borda, [callbacks])
+        self.pwms = {}        # pino -> FakePWM
+        self.write_count = 0  # escritas em saídas e PWM (para métricas/benchmarks)
+
+    def setmode(self, mode):
+        self.mode = mode
+
+    def getmode(self):
+        return self.mode
+
+    def setwarnings(self, flag):
+        pass
+
+    def setup(self, channel, direction, pull_up_down=PUD_OFF, initial=None):
+        channels = channel if isinstance(channel, (list, tuple)) else [channel]
+        for pin in channels:
+            self.directions[pin] = direction
+            if direction == self.OUT:
+                self.levels[pin] = initial if initial is not None else self.LOW
+            elif pin not in self.levels:
+                # Entradas com pull-up ficam em nível alto enquanto nada as aciona
+                self.levels[pin] = self.HIGH if pull_up_down == self.PUD_UP else self.LOW
+
+    def output(self, channel, value):
+        channels = channel if isinstance(channel, (list, tuple)) else [channel]
+        for pin in channels:
+            self.write_count += 1
+            self.levels[pin] = self.HIGH if value else self.LOW
+
+    def input(self, channel):
+        return self.levels.get(channel, self.LOW)
+
+    def add_event_detect(self, channel, edge, callback=None, bouncetime=None):
+        self.callbacks[channel] = (edge, [callback] if callback else [])
+
+    def add_event_callback(self, channel, callback):
+        self.callbacks[channel][1].append(callback)
+
+    def remove_event_detect(self, channel):
+        self.callbacks.pop(channel, None)
+
+    def PWM(self, channel, frequency):
+        pwm = FakePWM(self, channel, frequency)
+        self.pwms[channel] = pwm
+        return pwm
+
+    def cleanup(self, channel=None):
+        if channel is None:
+            self.levels.clear()
+            self.directions.clear()
+            self.callbacks.clear()
+            self.pwms.clear()
+        else:
+            for pin in (channel if isinstance(channel, (list, tuple)) else [channel]):
+                self.levels.pop(pin, None)
+                self.directions.pop(pin, None)
+                self.callbacks.pop(pin, None)
+                self.pwms.pop(pin, None)
+
+    # Lado da simulação
+
+    def set_input(self, channel, level):
+        """Altera o nível de uma entrada e dispara os callbacks da borda correspondente"""
+        level = self.HIGH if level else self.LOW
+        previous = self.levels.get(channel, self.LOW)
+        self.levels[channel] = level
+        if level == previous or channel not in self.callbacks:
+            return
+        edge, callbacks = self.callbacks[channel]
+        if edge == self.BOTH or (edge == self.RISING) == (level == self.HIGH):
+            for callback in callbacks:
+                callback(channel)
+
+    def duty(self, channel):
+        """Duty cycle atual do PWM de um pino (0 se não houver PWM ativo)"""
+        pwm = self.pwms.get(channel)
+        return pwm.duty_cycle if pwm is not None and pwm.running else 0.0
+
+
+def install(gpio=None):
+    """
+    Instala o backend simulado no lugar de RPi.GPIO.
+
+    Deve ser chamado antes de importar os módulos gpio/ e controle/; módulos já
+    importados que usavam o backend anterior também são atualizados.
+
+    Returns:
+        FakeGPIO: O backend instalado
+    """
+    if gpio is None:
+        gpio = FakeGPIO()
+    previous = sys.modules.get("RPi.GPIO")
+
+    package = types.ModuleType("RPi")
+    package.GPIO = gpio
+    sys.modules["RPi"] = package
+    sys.modules["RPi.GPIO"] = gpio
+
+    if previous is not None:
+        for module in list(sys.modules.values()):
+            if getattr(module, "GPIO", None) is previous:
+                module.GPIO = gpio
+    return gpio
@@ -0,0 +1,171 @@
+# fleet.py
+import sys
+import json
+import time
+import argparse
+
+from simulacao.gantry import SimulatedGantry, VirtualClock
+from simulacao.benchmark import random_targets, summarize
+from controle import clock
+
+# Ganhos PD que acomodam bem no modelo simulado
+SIM_GAINS = (17.0, 0.0, 0.5)
+
+# Curso simulado (contagens) e tempo máximo de cada movimento (s)
+TRAVEL = 1000
+MOVE_TIMEOUT = 20.0
+
+
+class Fleet:
+    def __init__(self, count, step=0.002, gains=SIM_GAINS, **gantry_options):
+        """
+        Vários pórticos simulados no mesmo processo, cada um com o seu
+        HardwareContext e o seu MotorController, executados por um único
+        escalonador: a cada período todos os controladores executam uma
+        iteração e o relógio virtual compartilhado avança todas as plantas.
+
+        Args:
+            count (int): Número de pórticos
+            step (float): Passo de integração das plantas (s)
+            gains (tuple): Ganhos (kp, ki, kd) aplicados aos dois eixos (None mantém os padrões)
+            **gantry_options: Repassados para SimulatedGantry (x, y, enable)
+        """
+        self.clock = VirtualClock(step=step)
+        self.gantries = [SimulatedGantry(clock=self.clock, **gantry_options).attach() for _ in range(count)]
+        self.controllers = [gantry.create_controller() for gantry in self.gantries]
+        for controller in self.controllers:
+            if gains:
+                for axis in ('x', 'y'):
+                    controller.pid.set_gains(axis, *gains)
+        self.control_period = self.controllers[0].control_period if self.controllers else 0.01
+        self.ticks = 0
+
+    def install(self):
+        """Instala o relógio compartilhado como relógio do controle"""
+        clock.set_clock(self.clock)
+        return self
+
+    def uninstall(self):
+        clock.set_clock(None)
+
+    def tick(self):
+        """Uma iteração de todos os controladores seguida de um período das plantas"""
+        for controller in self.controllers:
+            controller.step()
+        self.clock.sleep(self.control_period)
+        self.ticks += 1
+
+    def run_until(self, condition, timeout):
+        """
+        Executa até condition() ser verdadeira
+
+        Returns:
+            float: Tempo simulado decorrido, ou None se o tempo limite estourou
+        """
+        start = self.clock.now
+        while self.clock.now - start < timeout:
+            self.tick()
+            if condition():
+                return self.clock.now - start
+        return None
+
+
+def run(count, moves, seed=0, timeout=MOVE_TIMEOUT):
+    """
+    Cada pórtico da frota executa 'moves' movimentos aleatórios enfileirados
+    (alvos diferentes por pórtico)
+
+    Returns:
+        dict: Tempos de movimento, tempo simulado, tempo de parede e, por
+        pórtico, os instantes e as posições de chegada
+    """
+    fleet = Fleet(count).install()
+    try:
+        sequences = []
+        for index, controller in enumerate(fleet.controllers):
+            # Os encoders contam a partir da posição inicial, no centro do curso
+            targets = [(x - TRAVEL // 2, y - TRAVEL // 2)
+                       for x, y in random_targets(moves, TRAVEL, seed=seed + index)]
+            futures = controller.move_sequence(targets, timeout=timeout)
+            sequences.append((targets, futures, []))
+
+        def record_arrivals():
+            # Instante simulado de conclusão de cada movimento
+            done = True
+            for targets, futures, finished in sequences:
+                while len(finished) < len(futures) and futures[len(finished)].done():
+                    finished.append(fleet.clock.now)
+                done = done and len(finished) == len(futures)
+            return done
+
+        started = time.perf_counter()
+        simulated = fleet.run_until(record_arrivals, timeout * moves)
+        wall = time.perf_counter() - started
+    finally:
+        fleet.uninstall()
+
+    times, failed, results = [], 0, []
+    for targets, futures, finished in sequences:
+        previous = 0.0
+        arrivals = []
+        for future, end in zip(futures, finished):
+            if future.exception() is None:
+                times.append(end - previous)
+                arrivals.append(list(future.result()))
+            else:
+                failed += 1
+                arrivals.append(None)
+            previous = end
+        results.append({"finished": finished, "arrivals": arrivals})
+    return {
+        "gantries": count,
+        "moves": count * moves,
+        "failed": failed + sum(len(futures) - len(finished) for _, futures, finished in sequences),
+        "move_time": summarize(times),
+        "simulated_s": simulated,
+        "wall_s": wall,
+        "controller_steps_per_s": fleet.ticks * count / wall,
+        "results": results,
+    }
+
+
+def verify(report, moves, seed=0, timeout=MOVE_TIMEOUT):
+    """
+    Repete o primeiro pórtico sozinho e confere que a frota não alterou o
+    seu resultado (os pórticos não compartilham estado)
+
+    Returns:
+        bool: True se os instantes e as posições de chegada coincidem
+    """
+    return run(1, moves, seed, timeout)["results"][0] == report["results"][0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Frota de pórticos simulados em um único processo')
+    parser.add_argument('--gantries', type=int, default=200, help='Número de pórticos simulados')
+    parser.add_argument('--moves', type=int, default=5, help='Movimentos aleatórios por pórtico')
+    parser.add_argument('--seed', type=int, default=0, help='Semente dos alvos (o pórtico i usa seed + i)')
+    parser.add_argument('--verify', action='store_true',
+                        help='Conferir o primeiro pórtico contra uma execução isolada')
+    parser.add_argument('--output', help='Arquivo JSON onde gravar os resultados')
+    args = parser.parse_args()
+
+    report = run(args.gantries, args.moves, args.seed)
+    stats = report["move_time"]
+    print(f"{report['gantries']} pórticos, {report['moves']} movimentos, {report['failed']} falhas")
+    if stats["succeeded"]:
+        print(f"Tempo de movimento: média {stats['mean_s']:.2f} s, p90 {stats['p90_s']:.2f} s, "
+              f"máx {stats['max_s']:.2f} s")
+    print(f"{report['simulated_s'] or 0:.1f} s simulados em {report['wall_s']:.1f} s "
+          f"({report['controller_steps_per_s']:.0f} iterações de controle/s)")
+    if args.verify:
+        report["verified"] = verify(report, args.moves, args.seed)
+        print(f"Primeiro pórtico igual à execução isolada: {'sim' if report['verified'] else 'NÃO'}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0 if report["failed"] == 0 and report.get("verified", True) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,273 @@
+# gantry.py
+import math
+
+from simulacao.fake_gpio import FakeGPIO, install
+
+# Os módulos gpio/ e controle/ importam RPi.GPIO; o backend simulado precisa
+# estar instalado antes de importá-los
+install()
+
+from controle import clock
+from controle import encoder
+from controle.hardware import HardwareContext, default_hardware
+from controle.motor_control import MotorController
+from gpio.buttons import BUTTONS, setup_buttons
+from gpio.limitswitches import LIMIT_SWITCHES
+from gpio.motors import MOTOR_PINS
+
+
+class VirtualClock:
+    def __init__(self, step=0.002, epoch=1.0e9):
+        """
+        Relógio virtual: sleep() avança o tempo simulado (e a planta) em vez de
+        esperar, permitindo rodar mais rápido que o tempo real.
+
+        Args:
+            step (float): Passo máximo de integração da planta em segundos
+            epoch (float): Valor de time() no instante zero da simulação
+        """
+        self.step = step
+        self.epoch = epoch
+        self.now = 0.0
+        self.listeners = []
+
+    def time(self):
+        return self.epoch + self.now
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.advance(seconds)
+
+    def advance(self, seconds):
+        """Avança o tempo em passos de no máximo 'step', atualizando os ouvintes"""
+        remaining = seconds
+        while remaining > 1e-12:
+            dt = min(self.step, remaining)
+            self.now += dt
+            remaining -= dt
+            for listener in self.listeners:
+                listener(dt)
+
+
+class AxisModel:
+    def __init__(self, max_speed=400.0, time_constant=0.05, stiction_duty=5.0,
+                 travel=1000, limit_width=3, overtravel=10, start=None, backlash=0.0):
+        """
+        Modelo de um eixo: motor DC + fuso, aproximado por uma dinâmica de
+        primeira ordem entre duty cycle e velocidade, com atrito estático.
+
+        Posições e velocidades estão em unidades do encoder (contagens).
+
+        Args:
+            max_speed (float): Velocidade em regime com 100% de duty (contagens/s)
+            time_constant (float): Constante de tempo mecânica do conjunto (s)
+            stiction_duty (float): Duty mínimo para vencer o atrito estático (%)
+            travel (int): Curso entre as chaves de fim de curso (contagens)
+            limit_width (int): Largura da região em que a chave fica acionada
+            overtravel (int): Curso além das chaves até o batente mecânico
+            start (float): Posição inicial (padrão: centro do curso)
+            backlash (float): Folga entre motor e carro (contagens); o encoder
+                mede o carro, que só acompanha o motor depois de vencida a folga
+        """
+        self.max_speed = max_speed
+        self.time_constant = time_constant
+        self.stiction_duty = stiction_duty
+        self.travel = travel
+        self.limit_width = limit_width
+        self.overtravel = overtravel
+        self.position = float(travel / 2 if start is None else start)
+        self.backlash = backlash
+        self.motor_position = self.position  # igual à posição do carro sem folga
+        self.velocity = 0.0
+        self._decay_dt = None
+        self._decay = 0.0
+
+    def target_velocity(self, direction, duty):
+        """Velocidade de regime para o comando atual"""
+        if direction == 0 or duty <= self.stiction_duty:
+            return 0.0
+        effective = (duty - self.stiction_duty) / (100.0 - self.stiction_duty)
+        return direction * effective * self.max_speed
+
+    def step(self, dt, direction, duty):
+        """Integra a dinâmica do eixo por dt segundos (solução exata com comando constante)"""
+        target = self.target_velocity(direction, duty)
+        if target == 0.0 and abs(self.velocity) < 1e-3:
+            self.velocity = 0.0
+            return
+        if dt != self._decay_dt:
+            self._decay_dt = dt
+            self._decay = math.exp(-dt / self.time_constant)
+        transient = self.velocity - target
+        self.motor_position += target * dt + transient * self.time_constant * (1.0 - self._decay)
+        self.velocity = target + transient * self._decay
+
+        # O carro é arrastado pelo motor apenas quando a folga está fechada
+        half = self.backlash / 2.0
+        if self.motor_position - self.position > half:
+            self.position = self.motor_position - half
+        elif self.position - self.motor_position > half:
+            self.position = self.motor_position + half
+
+        # Batentes mecânicos além das chaves de fim de curso
+        if self.position < -self.overtravel:
+            self.motor_position += -self.overtravel - self.position
+            self.position, self.velocity = -self.overtravel, 0.0
+        elif self.position > self.travel + self.overtravel:
+            self.motor_position -= self.position - self.travel - self.overtravel
+            self.position, self.velocity = self.travel + self.overtravel, 0.0
+
+    def at_min(self):
+        return self.position <= self.limit_width
+
+    def at_max(self):
+        return self.position >= self.travel - self.limit_width
+
+
+# Pinos de cada eixo usados pela planta
+AXIS_PINS = {
+    'x': {'pwm': MOTOR_PINS['x_pwm'], 'dir1': MOTOR_PINS['x_dir1'], 'dir2': MOTOR_PINS['x_dir2'],
+          'enc_a': encoder.PIN_X_A, 'enc_b': encoder.PIN_X_B,
+          'min': LIMIT_SWITCHES['x_min'], 'max': LIMIT_SWITCHES['x_max']},
+    'y': {'pwm': MOTOR_PINS['y_pwm'], 'dir1': MOTOR_PINS['y_dir1'], 'dir2': MOTOR_PINS['y_dir2'],
+          'enc_a': encoder.PIN_Y_A, 'enc_b': encoder.PIN_Y_B,
+          'min': LIMIT_SWITCHES['y_min'], 'max': LIMIT_SWITCHES['y_max']}
+}
+
+
+class SimulatedGantry:
+    def __init__(self, x=None, y=None, step=0.002, enable=None, clock=None):
+        """
+        Gêmeo digital do pórtico: os eixos simulados leem os comandos escritos em
+        gpio/motors.py e geram as bordas de encoder e os estados das chaves de fim
+        de curso lidos por controle/encoder.py e gpio/limitswitches.py.
+
+        Com install() o pórtico ocupa o hardware padrão do processo; com
+        attach() ele tem um HardwareContext próprio e vários pórticos podem
+        coexistir (ver simulacao/fleet.py).
+
+        Args:
+            x (AxisModel): Modelo do eixo X (padrão: AxisModel())
+            y (AxisModel): Modelo do eixo Y (padrão: AxisModel())
+            step (float): Passo de integração da planta em segundos
+            enable (callable): Linha de habilitação da ponte H; quando retorna
+                False as saídas dos motores ficam cortadas (ex.: watchdog)
+            clock (VirtualClock): Relógio compartilhado com outros pórticos
+                (padrão: um relógio próprio com passo 'step')
+        """
+        self.gpio = FakeGPIO()
+        self.enable = enable
+        self.clock = clock if clock is not None else VirtualClock(step=step)
+        self.hardware = None
+        self.axes = {'x': x or AxisModel(), 'y': y or AxisModel()}
+        # Última contagem inteira gerada por eixo (posição absoluta da planta)
+        self.counts = {name: math.floor(axis.position) for name, axis in self.axes.items()}
+        self.limits = {}
+        self.clock.listeners.append(self._advance)
+
+    def install(self):
+        """Instala o GPIO e o relógio simulados e configura os periféricos como no main()"""
+        install(self.gpio)
+        clock.set_clock(self.clock)
+        self.hardware = default_hardware
+        self.hardware.setup()
+        setup_buttons()
+        encoder.reset_position()
+        self._update_limits()
+        return self
+
+    def attach(self):
+        """
+        Configura um HardwareContext próprio sobre o GPIO simulado desta
+        instância, sem alterar o RPi.GPIO nem o relógio do processo (o relógio
+        compartilhado deve ser instalado com clock.set_clock por quem executa)
+        """
+        self.hardware = HardwareContext(self.gpio)
+        self.hardware.setup()
+        self._update_limits()
+        return self
+
+    def uninstall(self):
+        """Volta ao relógio do sistema"""
+        clock.set_clock(None)
+
+    def create_controller(self, pid=None):
+        """
+        Cria um MotorController pronto para ser executado passo a passo com run()
+        (sem a thread de controle, para manter a simulação determinística)
+
+        Args:
+            pid: Controlador de posição a usar (padrão: o do MotorController)
+        """
+        controller = MotorController(pid, self.hardware)
+        controller.hardware.motors.setup()
+        controller.running = True
+        return controller
+
+    def _direction(self, pins):
+        dir1 = self.gpio.input(pins['dir1'])
+        dir2 = self.gpio.input(pins['dir2'])
+        if dir1 and not dir2:
+            return 1
+        if dir2 and not dir1:
+            return -1
+        return 0
+
+    def _advance(self, dt):
+        """Avança a planta um passo e gera as bordas de encoder correspondentes"""
+        gpio = self.gpio
+        enabled = self.enable is None or self.enable()
+        for name, axis in self.axes.items():
+            pins = AXIS_PINS[name]
+            duty = gpio.duty(pins['pwm']) if enabled else 0.0
+            if duty == 0.0 and axis.velocity == 0.0:
+                continue
+            axis.step(dt, self._direction(pins), duty)
+            target = math.floor(axis.position)
+            while self.counts[name] != target:
+                # Quadratura: o nível de B no momento da borda de A indica o sentido
+                forward = target > self.counts[name]
+                self.counts[name] += 1 if forward else -1
+                gpio.set_input(pins['enc_b'], forward)
+                gpio.set_input(pins['enc_a'], not gpio.input(pins['enc_a']))
+            self._update_limits(name)
+
+    def _update_limits(self, name=None):
+        # Chaves ativas em nível baixo (entradas com pull-up)
+        for axis_name in ([name] if name else self.axes):
+            axis = self.axes[axis_name]
+            state = (axis.at_min(), axis.at_max())
+            if self.limits.get(axis_name) == state:
+                continue
+            self.limits[axis_name] = state
+            pins = AXIS_PINS[axis_name]
+            self.gpio.set_input(pins['min'], not state[0])
+            self.gpio.set_input(pins['max'], not state[1])
+
+    def press_button(self, name, pressed=True):
+        """Simula um botão (ativo em nível baixo)"""
+        self.gpio.set_input(BUTTONS[name], not pressed)
+
+    def run(self, controller, duration):
+        """Executa o loop de controle por 'duration' segundos de tempo simulado"""
+        end = self.clock.now + duration
+        while self.clock.now < end:
+            controller.step()
+            self.clock.sleep(controller.control_period)
+
+    def run_until(self, controller, condition, timeout):
+        """
+        Executa o loop de controle até condition() ser verdadeira
+
+        Returns:
+            float: Tempo simulado decorrido, ou None se o tempo limite estourou
+        """
+        start = self.clock.now
+        while self.clock.now - start < timeout:
+            controller.step()
+            if condition():
+                return self.clock.now - start
+            self.clock.sleep(controller.control_period)
+        return None
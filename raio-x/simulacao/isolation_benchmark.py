@@ -0,0 +1,121 @@
+# isolation_benchmark.py
+import sys
+import json
+import time
+import threading
+import argparse
+
+from simulacao.gantry import SimulatedGantry
+from controle.control_process import ControlProcess, run_paced, CONTROL_PERIOD
+
+# Ganhos PD que acomodam bem no modelo simulado
+SIM_GAINS = (17.0, 0.0, 0.5)
+
+# Alvos alternados durante a medição (contagens)
+TARGETS = ((800, 600), (200, 150))
+
+
+def _hog(stop):
+    """Trabalho em Python puro que disputa o GIL (ex.: sensor, métricas, interface)"""
+    data = {}
+    while not stop.is_set():
+        for i in range(1000):
+            data[i % 97] = json.dumps([i, i * 2.5, str(i)])
+
+
+def _exercise(controller, duration):
+    """Alterna movimentos entre os alvos durante 'duration' segundos"""
+    end = time.monotonic() + duration
+    index = 0
+    while time.monotonic() < end:
+        controller.go_to_position(*TARGETS[index % len(TARGETS)])
+        index += 1
+        time.sleep(min(1.0, max(0.0, end - time.monotonic())))
+
+
+def _with_hogs(hogs, func):
+    stop = threading.Event()
+    threads = [threading.Thread(target=_hog, args=(stop,), daemon=True) for _ in range(hogs)]
+    for thread in threads:
+        thread.start()
+    try:
+        return func()
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+
+def run_thread(duration, hogs):
+    """
+    Loop de controle em uma thread do processo principal (como o MotorController.start)
+
+    Returns:
+        dict: ticks, overruns, period_p99_us, period_max_us
+    """
+    gantry = SimulatedGantry().install()
+    controller = gantry.create_controller()
+    for axis in ('x', 'y'):
+        controller.pid.set_gains(axis, *SIM_GAINS)
+    running = [True]
+    loop = threading.Thread(target=run_paced, daemon=True,
+                            args=(controller, lambda: running[0], CONTROL_PERIOD),
+                            kwargs={"advance": gantry.clock.sleep})
+    loop.start()
+    try:
+        _with_hogs(hogs, lambda: _exercise(controller, duration))
+    finally:
+        running[0] = False
+        loop.join()
+        gantry.uninstall()
+    period = controller.profiler.snapshot()["stages"]["period"]
+    return {"ticks": period["count"] + 1, "overruns": controller.profiler.overruns,
+            "period_p99_us": min(period["p99_us"], period["max_us"]), "period_max_us": period["max_us"]}
+
+
+def run_process(duration, hogs, cpu=None, priority=None):
+    """
+    Loop de controle no processo isolado (ControlProcess)
+
+    Returns:
+        dict: ticks, overruns, period_p99_us, period_max_us
+    """
+    process = ControlProcess(simulate=True, cpu=cpu, priority=priority, gains=SIM_GAINS).start()
+    try:
+        _with_hogs(hogs, lambda: _exercise(process, duration))
+        # As estatísticas do período são publicadas a cada STATS_INTERVAL iterações
+        time.sleep(1.1)
+        state = process.state()
+    finally:
+        process.stop()
+    return {key: state[key] for key in ("ticks", "overruns", "period_p99_us", "period_max_us")}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Jitter do loop de controle: thread no processo principal x processo isolado')
+    parser.add_argument('--duration', type=float, default=10.0, help='Duração de cada medição (s)')
+    parser.add_argument('--hogs', type=int, default=4, help='Threads que disputam o GIL no processo principal')
+    parser.add_argument('--cpu', type=int, help='CPU do processo isolado')
+    parser.add_argument('--priority', type=int, help='Prioridade SCHED_FIFO do processo isolado')
+    parser.add_argument('--output', help='Arquivo JSON onde gravar os resultados')
+    args = parser.parse_args()
+
+    results = {}
+    for hogs in sorted({0, args.hogs}):
+        results[f"thread_{hogs}"] = run_thread(args.duration, hogs)
+        results[f"process_{hogs}"] = run_process(args.duration, hogs, args.cpu, args.priority)
+
+    print(f"Período nominal {CONTROL_PERIOD * 1e3:g} ms, {args.duration:g} s por medição")
+    for name, result in results.items():
+        mode, hogs = name.split("_")
+        print(f"  {'thread' if mode == 'thread' else 'processo':<9} {hogs} threads concorrentes: "
+              f"período p99 {result['period_p99_us'] / 1e3:6.2f} ms, máximo {result['period_max_us'] / 1e3:6.2f} ms, "
+              f"{result['overruns']} atrasos em {result['ticks']} iterações")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+# jog_benchmark.py
+import sys
+import json
+import argparse
+
+from simulacao.gantry import SimulatedGantry
+from controle.encoder import get_position
+from controle.jog import JogController
+
+# Distâncias de posicionamento medidas (contagens)
+DISTANCES = (5, 20, 60, 150, 400)
+
+# Modelo do operador: lê os botões no período do loop principal e reage à
+# posição vista REACTION segundos antes
+BUTTON_PERIOD = 0.1
+REACTION = 0.2
+
+# Erros aceitos ao fim do posicionamento (contagens): grosso e fino
+TOLERANCES = (10, 2)
+
+# Erro acima do qual o operador mantém o botão pressionado em vez de dar toques
+COARSE_ERROR = 15
+
+# Tempo máximo de uma tarefa de posicionamento (s)
+TASK_TIMEOUT = 30.0
+
+
+def position_task(gantry, controller, distance, tolerance, timeout=TASK_TIMEOUT):
+    """
+    Um operador leva o eixo X até 'distance' contagens à frente usando os
+    botões: mantém pressionado enquanto o erro visto for grande (soltando
+    com a antecedência que a velocidade vista sugere), espera o eixo parar
+    e corrige com toques.
+
+    Returns:
+        dict: time_s (None se não concluiu), presses, final_error
+    """
+    target = get_position()[0] + distance
+    delay = int(round(REACTION / BUTTON_PERIOD))
+    history = [get_position()[0]] * (delay + 2)
+    elapsed = 0.0
+    presses = 0
+    holding = None
+
+    while elapsed < timeout:
+        seen, before = history[-1 - delay], history[-2 - delay]
+        speed = (seen - before) / BUTTON_PERIOD
+        error = target - seen
+        direction = 'right' if error > 0 else 'left'
+
+        if holding:
+            # Solta quando o erro visto cabe no que o eixo anda durante a reação
+            if abs(error) <= abs(speed) * REACTION + tolerance or (error > 0) != (holding == 'right'):
+                holding = None
+        elif speed == 0 and history[-1] == seen:
+            if abs(error) <= tolerance:
+                return {"time_s": elapsed, "presses": presses, "final_error": error}
+            presses += 1
+            if abs(error) > max(COARSE_ERROR, tolerance):
+                holding = direction
+            else:
+                # Toque: um período do loop principal pressionado
+                controller.move_manual(direction)
+                gantry.run(controller, BUTTON_PERIOD)
+                controller.stop_movement()
+                elapsed += BUTTON_PERIOD
+                history.append(get_position()[0])
+                continue
+
+        if holding:
+            controller.move_manual(holding)
+        else:
+            controller.stop_movement()
+        gantry.run(controller, BUTTON_PERIOD)
+        elapsed += BUTTON_PERIOD
+        history.append(get_position()[0])
+    return {"time_s": None, "presses": presses, "final_error": target - get_position()[0]}
+
+
+def run(jog, tolerance, distances=DISTANCES):
+    """
+    Executa as tarefas de posicionamento nos dois sentidos para cada distância
+
+    Args:
+        jog (bool): Usar o JogController (senão, o modo manual em malha aberta)
+
+    Returns:
+        dict: Resultado por distância (tempo médio, toques, tarefas concluídas)
+    """
+    gantry = SimulatedGantry().install()
+    controller = gantry.create_controller()
+    controller.jog = JogController() if jog else None
+    results = {}
+    try:
+        for distance in distances:
+            tasks = [position_task(gantry, controller, sign * distance, tolerance) for sign in (1, -1)]
+            done = [task for task in tasks if task["time_s"] is not None]
+            results[distance] = {
+                "completed": len(done),
+                "tasks": len(tasks),
+                "mean_time_s": sum(task["time_s"] for task in done) / len(done) if done else None,
+                "presses": sum(task["presses"] for task in tasks) / len(tasks),
+            }
+    finally:
+        gantry.uninstall()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Tempo de posicionamento manual: malha aberta x jog em malha fechada')
+    parser.add_argument('--output', help='Arquivo JSON onde gravar os resultados')
+    args = parser.parse_args()
+
+    results = {}
+    for tolerance in TOLERANCES:
+        results[tolerance] = {"open_loop": run(False, tolerance), "jog": run(True, tolerance)}
+        print(f"\nTolerância de {tolerance} contagens (tempo médio, tarefas concluídas, acionamentos)")
+        print(f"{'Distância':>10} | {'Malha aberta':>24} | {'Jog':>24}")
+        for distance in DISTANCES:
+            cells = []
+            for mode in ("open_loop", "jog"):
+                result = results[tolerance][mode][distance]
+                time_s = f"{result['mean_time_s']:.1f} s" if result["mean_time_s"] is not None else "—"
+                cells.append(f"{time_s} {result['completed']}/{result['tasks']} {result['presses']:.1f} acion.")
+            print(f"{distance:>10} | {cells[0]:>24} | {cells[1]:>24}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+# metrics_check.py
+import sys
+import argparse
+import urllib.request
+from collections import Counter
+
+from simulacao.gantry import SimulatedGantry
+from controle.metrics import MetricsCollector, MetricsServer, CONTENT_TYPE, PERIOD_BUCKETS
+
+# Ganhos PD que acomodam bem no modelo simulado
+SIM_GAINS = (17.0, 0.0, 0.5)
+
+# Alvos percorridos antes da coleta (contagens)
+TARGETS = ((600, 400), (200, 700))
+
+
+def parse_exposition(text):
+    """
+    Amostras do formato de exposição do Prometheus
+
+    Returns:
+        dict: Nome com rótulos (como no texto) -> valor
+    """
+    samples = {}
+    for line in text.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        name, value = line.rsplit(" ", 1)
+        samples[name] = float(value)
+    return samples
+
+
+def run(timeout=5.0):
+    """
+    Calibra e executa movimentos no pórtico simulado com o MetricsCollector e
+    o servidor em uma porta livre, busca /metrics com urllib.request e confere
+    os contadores de escrita nos motores e o histograma do período do loop
+
+    Returns:
+        dict: Endereço, número de amostras, escritas e iterações conferidas
+    """
+    gantry = SimulatedGantry().install()
+    controller = gantry.create_controller()
+    for axis in ('x', 'y'):
+        controller.pid.set_gains(axis, *SIM_GAINS)
+    writes = Counter()
+    controller.hardware.motors.listeners.append(lambda motor, kind, value: writes.update([(motor, kind)]))
+    collector = MetricsCollector(controller, interval=60.0).start()
+    server = MetricsServer(collector, port=0).start()
+    try:
+        controller.calibrate()
+        for target in TARGETS:
+            future = controller.go_to_position(*target)
+            gantry.run_until(controller, future.done, 20)
+            future.result()
+        collector.collect()
+        with urllib.request.urlopen(server.address, timeout=timeout) as response:
+            status = response.status
+            content_type = response.headers["Content-Type"]
+            text = response.read().decode("utf-8")
+    finally:
+        server.stop()
+        collector.stop()
+        gantry.uninstall()
+
+    assert status == 200, status
+    assert content_type == CONTENT_TYPE, content_type
+    samples = parse_exposition(text)
+
+    assert "# TYPE gantry_gpio_writes_total counter" in text
+    for motor in ('x', 'y'):
+        for kind in ('direction', 'speed'):
+            key = f'gantry_gpio_writes_total{{motor="{motor}",kind="{kind}"}}'
+            assert samples[key] == writes[(motor, kind)], (key, samples[key], writes[(motor, kind)])
+    assert sum(writes.values()) > 0
+
+    assert samples['gantry_limit_hits_total{switch="x_min"}'] >= 1
+    assert samples["gantry_calibrated"] == 1
+
+    assert "# TYPE gantry_control_period_seconds histogram" in text
+    buckets = [samples[f'gantry_control_period_seconds_bucket{{le="{(1 << index) / 1e9!r}"}}']
+               for index in PERIOD_BUCKETS]
+    count = samples["gantry_control_period_seconds_count"]
+    assert buckets == sorted(buckets), buckets
+    assert samples['gantry_control_period_seconds_bucket{le="+Inf"}'] == count
+    assert count == controller.profiler.snapshot()["stages"]["period"]["count"] > 0
+    assert samples["gantry_control_period_seconds_sum"] > 0
+    assert samples["gantry_control_tick_seconds_count"] == count + 1
+
+    return {"address": server.address, "samples": len(samples),
+            "gpio_writes": sum(writes.values()), "periods": int(count)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Verificação do endpoint /metrics no simulador')
+    parser.add_argument('--timeout', type=float, default=5.0, help='Tempo limite da requisição HTTP (s)')
+    args = parser.parse_args()
+
+    result = run(args.timeout)
+    print(f"{result['address']}: {result['samples']} amostras | {result['gpio_writes']} escritas nos "
+          f"motores | {result['periods']} períodos no histograma | OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
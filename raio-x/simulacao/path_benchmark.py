@@ -0,0 +1,122 @@
+# path_benchmark.py
+import sys
+import json
+import random
+import argparse
+
+from simulacao.gantry import SimulatedGantry
+from controle.path_optimizer import MoveTimeModel, optimize_order, path_time
+
+# Ganhos PD que acomodam bem no modelo simulado
+SIM_GAINS = (17.0, 0.0, 0.5)
+
+# Pontos por lista de captura e listas sorteadas por tamanho
+SIZES = (4, 8, 16, 32, 128, 512, 1024)
+LISTS = 10
+
+# Maior lista percorrida no simulador; acima dela só o tempo estimado pelo
+# modelo e o custo da otimização são medidos
+SIMULATE_MAX = 128
+
+# Região dos pontos em torno da posição inicial (os encoders contam a partir do centro do curso)
+HALF_RANGE = 400
+
+# Tempo máximo de cada movimento (s)
+MOVE_TIMEOUT = 20.0
+
+
+def random_points(count, rng):
+    return [(rng.randint(-HALF_RANGE, HALF_RANGE), rng.randint(-HALF_RANGE, HALF_RANGE)) for _ in range(count)]
+
+
+def travel(points):
+    """
+    Percorre os pontos no simulador com move_sequence a partir da posição inicial
+
+    Returns:
+        float: Tempo simulado até a chegada ao último ponto (None se algum movimento falhou)
+    """
+    gantry = SimulatedGantry().install()
+    try:
+        controller = gantry.create_controller()
+        for axis in ('x', 'y'):
+            controller.pid.set_gains(axis, *SIM_GAINS)
+        futures = controller.move_sequence(points, timeout=MOVE_TIMEOUT)
+        elapsed = gantry.run_until(controller, lambda: futures[-1].done(), MOVE_TIMEOUT * len(points))
+        if elapsed is None or any(future.exception() for future in futures):
+            return None
+        return elapsed
+    finally:
+        gantry.uninstall()
+
+
+def run(sizes=SIZES, lists=LISTS, seed=0, simulate_max=SIMULATE_MAX):
+    """
+    Compara a ordem dada com a ordem otimizada em listas aleatórias
+
+    Returns:
+        dict: Por tamanho, tempos médios estimados e simulados (até
+        simulate_max pontos) nas duas ordens, o tempo da otimização (total e
+        da construção) e as trocas 2-opt aplicadas
+    """
+    rng = random.Random(seed)
+    model = MoveTimeModel()
+    results = {}
+    for size in sizes:
+        totals = {"given_model_s": 0.0, "nearest_neighbor_model_s": 0.0, "optimized_model_s": 0.0,
+                  "given_sim_s": 0.0, "optimized_sim_s": 0.0, "optimizer_ms": 0.0, "construction_ms": 0.0,
+                  "two_opt_moves": 0.0, "failed": 0}
+        for _ in range(lists):
+            points = random_points(size, rng)
+            stats = {}
+            order = optimize_order(points, (0, 0), model, stats=stats)
+            if size <= simulate_max:
+                ordered = [points[index] for index in order]
+                given, optimized = travel(points), travel(ordered)
+                if given is None or optimized is None:
+                    totals["failed"] += 1
+                    continue
+                totals["given_sim_s"] += given
+                totals["optimized_sim_s"] += optimized
+            totals["given_model_s"] += path_time(points, (0, 0), model)
+            totals["nearest_neighbor_model_s"] += stats["nearest_neighbor_s"]
+            totals["optimized_model_s"] += stats["optimized_s"]
+            totals["optimizer_ms"] += stats["elapsed_s"] * 1e3
+            totals["construction_ms"] += stats["construction_s"] * 1e3
+            totals["two_opt_moves"] += stats["two_opt_moves"]
+        completed = lists - totals["failed"]
+        results[size] = {key: (value / completed if key != "failed" and completed else value)
+                         for key, value in totals.items()}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Tempo de deslocamento: ordem dada x ordem otimizada')
+    parser.add_argument('--lists', type=int, default=LISTS, help='Listas de pontos por tamanho')
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES, help='Pontos por lista')
+    parser.add_argument('--seed', type=int, default=0, help='Semente dos pontos')
+    parser.add_argument('--simulate-max', type=int, default=SIMULATE_MAX,
+                        help='Maior lista percorrida no simulador')
+    parser.add_argument('--output', help='Arquivo JSON onde gravar os resultados')
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.lists, args.seed, args.simulate_max)
+    print(f"{'Pontos':>6} | {'Estimado (dada -> vizinho -> otimizada)':>42} | "
+          f"{'Simulado (dada -> otimizada)':>30} | Otimização (construção, trocas 2-opt)")
+    for size, result in results.items():
+        model = (f"{result['given_model_s']:.1f} s -> {result['nearest_neighbor_model_s']:.1f} s -> "
+                 f"{result['optimized_model_s']:.1f} s")
+        simulated = (f"{result['given_sim_s']:.1f} s -> {result['optimized_sim_s']:.1f} s "
+                     f"({100.0 * (1 - result['optimized_sim_s'] / result['given_sim_s']):.0f}%)"
+                     if result['given_sim_s'] else "—")
+        print(f"{size:>6} | {model:>42} | {simulated:>30} | {result['optimizer_ms']:.2f} ms "
+              f"({result['construction_ms']:.2f} ms, {result['two_opt_moves']:.0f})"
+              + (f" ({result['failed']} listas com falha)" if result['failed'] else ""))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
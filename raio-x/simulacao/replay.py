@@ -0,0 +1,255 @@
+# replay.py
+import sys
+import argparse
+
+from simulacao.fake_gpio import FakeGPIO
+from simulacao.gantry import VirtualClock
+
+from controle import clock
+from controle import trace
+from controle.hardware import HardwareContext
+from controle.motor_control import MotorController
+from gpio.buttons import BUTTONS
+from gpio.limitswitches import LIMIT_SWITCHES
+
+# Diferença de duty cycle aceita entre gravação e replay (pontos percentuais)
+SPEED_TOLERANCE = 0.5
+
+# Eventos que representam leituras feitas dentro da própria iteração de controle
+READ_EVENTS = (trace.LIMIT, trace.BUTTON)
+
+
+def split_ticks(events):
+    """
+    Separa os eventos em trechos fora das iterações de controle e janelas
+    [TICK_START, TICK_END]
+
+    Returns:
+        list: Tuplas ('events', lista) ou ('tick', evento inicial, lista da janela)
+    """
+    segments = []
+    pending = []
+    window = None
+    for event in events:
+        kind = event[1]
+        if kind == trace.TICK_START:
+            if pending:
+                segments.append(('events', pending))
+                pending = []
+            window = (event, [])
+        elif kind == trace.TICK_END and window is not None:
+            segments.append(('tick', window[0], window[1]))
+            window = None
+        elif window is not None:
+            window[1].append(event)
+        else:
+            pending.append(event)
+    if pending:
+        segments.append(('events', pending))
+    return segments
+
+
+class TraceReplayer:
+    def __init__(self, path, speed_tolerance=SPEED_TOLERANCE, controller_factory=MotorController):
+        """
+        Reproduz um traço gravado em um MotorController/PIDController novos, com
+        GPIO simulado e relógio virtual, comparando os comandos produzidos em cada
+        iteração com os gravados. A configuração gravada no cabeçalho (ex.:
+        ganhos por eixo de pid_gains.json) é aplicada ao controlador criado.
+
+        Args:
+            path (str): Arquivo de traço gravado por TraceRecorder
+            speed_tolerance (float): Diferença de duty cycle aceita
+            controller_factory (callable): Cria o controlador a ser verificado; recebe
+                hardware=HardwareContext próprio do replay, sobre um GPIO simulado
+        """
+        self.path = path
+        self.speed_tolerance = speed_tolerance
+        self.controller_factory = controller_factory
+        self.gpio = FakeGPIO()
+        self.hardware = HardwareContext(self.gpio)
+        self.clock = None
+        self.controller = None
+        self.ticks = 0
+        self.mismatches = []
+        self._produced = []
+        self._capturing = False
+
+    def _on_command(self, motor, kind, value):
+        if self._capturing:
+            self._produced.append((motor, kind, value))
+
+    # Ganchos de traço do controlador em replay: como na gravação, só os comandos
+    # entre tick_start e tick_end pertencem à iteração (os do processamento da
+    # fila, antes dela, foram gravados como comandos externos)
+
+    def tick_start(self, controller):
+        self._capturing = True
+
+    def tick_end(self, controller):
+        self._capturing = False
+
+    def calibration_start(self, measure_backlash, approach):
+        pass
+
+    def _set_time(self, timestamp):
+        if timestamp > self.clock.now:
+            self.clock.advance(timestamp - self.clock.now)
+
+    def _apply(self, event):
+        """Aplica um evento de entrada gravado"""
+        timestamp, kind, channel, value = event
+        if kind == trace.ENCODER:
+            if channel == 0:
+                self.hardware.encoders.pos_x = int(value)
+            else:
+                self.hardware.encoders.pos_y = int(value)
+        elif kind == trace.LIMIT:
+            # Chaves e botões são ativos em nível baixo
+            self.gpio.set_input(LIMIT_SWITCHES[trace.LIMIT_NAMES[channel]], not value)
+        elif kind == trace.BUTTON:
+            self.gpio.set_input(BUTTONS[trace.BUTTON_NAMES[channel]], not value)
+        elif kind == trace.MODE:
+            self.controller.manual_mode = bool(value)
+        elif kind == trace.SETPOINT:
+            if channel == 0:
+                self.controller.pid.set_target_position(x=int(value))
+            else:
+                self.controller.pid.set_target_position(y=int(value))
+        elif kind == trace.JOG:
+            # Botões aplicados ao jog pelos comandos do modo manual
+            event, argument = trace.JOG_EVENTS[channel]
+            if event == 'press':
+                self.controller.jog.press(argument, self.controller.hardware.get_position())
+            elif event == 'release':
+                self.controller.jog.release(argument)
+            else:
+                self.controller.jog.reset()
+        elif kind == trace.CALIBRATE:
+            # Executada pela próxima iteração, como na gravação
+            self.controller.begin_calibration(*trace.CALIBRATE_ARGS[channel])
+        elif kind in (trace.DIRECTION, trace.SPEED) and not channel & trace.FROM_CONTROL_LOOP:
+            # Comandos externos (ex.: modo manual) são repetidos para manter o estado
+            motor = trace.AXES[channel]
+            if kind == trace.DIRECTION:
+                self.hardware.motors.set_direction(motor, int(value))
+            else:
+                self.hardware.motors.set_speed(motor, value)
+
+    def _expected(self, window):
+        expected = []
+        for timestamp, kind, channel, value in window:
+            if kind in (trace.DIRECTION, trace.SPEED) and channel & trace.FROM_CONTROL_LOOP:
+                motor = trace.AXES[channel & ~trace.FROM_CONTROL_LOOP]
+                expected.append((motor, 'direction' if kind == trace.DIRECTION else 'speed', value))
+        return expected
+
+    def _matches(self, produced, expected):
+        if len(produced) != len(expected):
+            return False
+        for (m1, k1, v1), (m2, k2, v2) in zip(produced, expected):
+            if m1 != m2 or k1 != k2:
+                return False
+            if k1 == 'direction' and int(v1) != int(v2):
+                return False
+            if k1 == 'speed' and abs(v1 - v2) > self.speed_tolerance:
+                return False
+        return True
+
+    def _replay_tick(self, start_event, window):
+        self._set_time(start_event[0])
+        # Leituras de chaves/botões da janela foram as vistas pela iteração
+        for event in window:
+            if event[1] in READ_EVENTS or event[1] in (trace.MODE, trace.SETPOINT):
+                self._apply(event)
+
+        self._produced = []
+        try:
+            self.controller.step()
+        finally:
+            self._capturing = False
+
+        expected = self._expected(window)
+        if not self._matches(self._produced, expected):
+            self.mismatches.append({
+                "tick": self.ticks,
+                "time": start_event[0],
+                "expected": expected,
+                "produced": self._produced
+            })
+        self.ticks += 1
+
+        # Bordas de encoder e comandos externos que chegaram durante a iteração
+        for event in window:
+            if event[1] not in READ_EVENTS:
+                self._set_time(event[0])
+                self._apply(event)
+
+    def run(self):
+        """
+        Executa o replay completo
+
+        Returns:
+            dict: Número de iterações, divergências e detalhes das primeiras divergências
+        """
+        start_time, events = trace.read_trace(self.path)
+        self.clock = VirtualClock(epoch=start_time)
+        clock.set_clock(self.clock)
+        self.hardware.motors.listeners.append(self._on_command)
+        try:
+            self.hardware.setup()
+            self.hardware.encoders.reset()
+            self.controller = self.controller_factory(hardware=self.hardware)
+            trace.apply_config(self.controller, trace.read_config(self.path))
+            self.controller.trace = self
+            self.controller.running = True
+
+            for segment in split_ticks(events):
+                if segment[0] == 'tick':
+                    self._replay_tick(segment[1], segment[2])
+                else:
+                    for event in segment[1]:
+                        self._set_time(event[0])
+                        self._apply(event)
+        finally:
+            self.hardware.motors.listeners.remove(self._on_command)
+            clock.set_clock(None)
+
+        return {
+            "events": len(events),
+            "ticks": self.ticks,
+            "mismatched_ticks": len(self.mismatches),
+            "first_mismatches": self.mismatches[:10]
+        }
+
+
+def dump(path):
+    """Imprime os eventos de um traço em formato legível"""
+    start_time, events = trace.read_trace(path)
+    print(f"Início: {start_time:.6f} | {len(events)} eventos")
+    for timestamp, kind, channel, value in events:
+        print(f"{timestamp:12.6f} {trace.EVENT_NAMES.get(kind, kind):<10} {channel:>3} {value:g}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay determinístico de um traço do controle do pórtico')
+    parser.add_argument('path', help='Arquivo de traço gravado')
+    parser.add_argument('--dump', action='store_true', help='Apenas imprimir os eventos')
+    parser.add_argument('--tolerance', type=float, default=SPEED_TOLERANCE, help='Diferença de duty aceita')
+    args = parser.parse_args()
+
+    if args.dump:
+        dump(args.path)
+        return 0
+
+    report = TraceReplayer(args.path, args.tolerance).run()
+    print(f"{report['events']} eventos, {report['ticks']} iterações, "
+          f"{report['mismatched_ticks']} iterações divergentes")
+    for mismatch in report["first_mismatches"]:
+        print(f"  • iteração {mismatch['tick']} em {mismatch['time']:.6f} s: "
+              f"gravado {mismatch['expected']} | replay {mismatch['produced']}")
+    return 1 if report["mismatched_ticks"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
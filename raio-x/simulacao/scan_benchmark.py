@@ -0,0 +1,154 @@
+# scan_benchmark.py
+import sys
+import json
+import time
+import argparse
+
+from simulacao.gantry import SimulatedGantry
+from simulacao.benchmark import is_settled
+from controle.flyscan import FlyScan, raster, stop_and_shoot, FLY_EXPOSURE
+from controle.exposure import ExposureController, ExposureOverlap
+from controle.commands import resolve
+
+# Grade padrão (contagens)
+GRID = {"x_start": 100, "x_end": 900, "y_start": 100, "y_end": 700, "x_step": 50, "y_step": 100}
+
+# Ganhos PD que acomodam bem no modelo simulado
+SIM_GAINS = (17.0, 0.0, 0.5)
+
+
+class VirtualExposure(ExposureController):
+    def __init__(self, gantry, **kwargs):
+        """
+        ExposureController no relógio virtual: trigger(), _begin() e _finish()
+        são os do controlador real, mas os pedidos são atendidos no passo da
+        planta em que o prazo vence, em vez da thread de exposição (ela não pode
+        dormir no relógio virtual enquanto a simulação avança)
+        """
+        super().__init__(hardware=gantry.hardware, **kwargs)
+        self.gantry = gantry
+        self.pulses = []        # (registro, future) dos pulsos em andamento
+        self.true_errors = []
+        gantry.clock.listeners.append(self._tick)
+
+    def start(self):
+        return self
+
+    def stop(self):
+        pass
+
+    def fire(self, duration, metadata):
+        """Disparo da varredura: registra o erro em relação à posição real do carro"""
+        # A contagem do encoder é inteira e tem origem no referenciamento
+        offset = self.gantry.counts['x'] - self.hardware.get_position()[0]
+        self.true_errors.append(self.gantry.axes['x'].position - offset - metadata["trigger"][0])
+        return self.trigger(duration, metadata)
+
+    def _tick(self, dt):
+        while not self._requests.empty():
+            duration, data, future = self._requests.get()
+            if future.running():
+                self.pulses.append((data, future))
+            elif future.set_running_or_notify_cancel():
+                try:
+                    self.pulses.append((self._begin(duration, data), future))
+                except ExposureOverlap as e:
+                    resolve(future, exception=e)
+        now = self.gantry.clock.now
+        for pulse in [p for p in self.pulses if p[0]["deadline"] <= now]:
+            self.pulses.remove(pulse)
+            record, future = pulse
+            resolve(future, self._finish(record))
+
+
+def _summary(rows, images, elapsed):
+    return {"rows": len(rows), "images": images, "simulated_s": elapsed,
+            "images_per_min": 60.0 * images / elapsed if elapsed else 0.0}
+
+
+def run_stop_and_shoot(rows, exposure):
+    gantry = SimulatedGantry().install()
+    controller = gantry.create_controller()
+    for axis in ('x', 'y'):
+        controller.pid.set_gains(axis, *SIM_GAINS)
+    try:
+        controller.calibrate()
+        start = gantry.clock.now
+        records = stop_and_shoot(controller, rows, exposure, settled=lambda: is_settled(controller),
+                                 wait=lambda seconds: gantry.run(controller, seconds))
+        elapsed = gantry.clock.now - start
+    finally:
+        controller.exposure.stop()
+        gantry.uninstall()
+    return _summary(rows, len(records), elapsed)
+
+
+def run_fly_scan(rows, exposure, duty):
+    gantry = SimulatedGantry().install()
+    controller = gantry.create_controller()
+    for axis in ('x', 'y'):
+        controller.pid.set_gains(axis, *SIM_GAINS)
+    exposure_controller = controller.exposure = VirtualExposure(gantry)
+    try:
+        controller.calibrate()
+        scan = FlyScan(controller, duty, exposure, fire=exposure_controller.fire,
+                       wait=lambda seconds: gantry.run(controller, seconds))
+        start = gantry.clock.now
+        shots = scan.run(rows)
+        elapsed = gantry.clock.now - start
+        # Termina o último pulso
+        gantry.run(controller, exposure)
+    finally:
+        gantry.uninstall()
+    report = _summary(rows, len(shots), elapsed)
+    errors = [abs(e) for e in exposure_controller.true_errors]
+    durations = [record["duration_s"] for record in exposure_controller.records]
+    report.update({
+        "expected": sum(len(xs) for _, xs in rows),
+        "exposures": len(durations),
+        "rejected_pulses": exposure_controller.rejected,
+        "duration_error_max_s": max((abs(d - exposure) for d in durations), default=0.0),
+        "count_error_max": max((abs(s["error"]) for s in shots), default=0),
+        "position_error_mean": sum(errors) / len(errors) if errors else 0.0,
+        "position_error_max": max(errors, default=0.0),
+    })
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Varredura em movimento x parar-e-capturar no simulador')
+    parser.add_argument('--exposure', type=float, default=FLY_EXPOSURE, help='Duração de cada exposição (s)')
+    parser.add_argument('--duty', type=float, help='Duty cycle do eixo X na passada (%%; padrão: escolhido '
+                        'pelo espaçamento e pela exposição)')
+    parser.add_argument('--x-step', type=int, default=GRID["x_step"], help='Espaçamento das imagens em X')
+    parser.add_argument('--y-step', type=int, default=GRID["y_step"], help='Espaçamento das linhas em Y')
+    parser.add_argument('--output', help='Arquivo JSON onde gravar os resultados')
+    args = parser.parse_args()
+
+    rows = raster(GRID["x_start"], GRID["x_end"], GRID["y_start"], GRID["y_end"], args.x_step, args.y_step)
+    wall = time.perf_counter()
+    report = {
+        "stop_and_shoot": run_stop_and_shoot(rows, args.exposure),
+        "fly_scan": run_fly_scan(rows, args.exposure, args.duty),
+    }
+    wall = time.perf_counter() - wall
+
+    for name, data in report.items():
+        print(f"{name:<15} {data['images']} imagens em {data['simulated_s']:.1f} s simulados | "
+              f"{data['images_per_min']:.1f} imagens/min")
+    fly = report["fly_scan"]
+    print(f"Disparos: {fly['images']}/{fly['expected']} | exposições: {fly['exposures']} | "
+          f"recusados por sobreposição: {fly['rejected_pulses']} | "
+          f"erro da duração máx {fly['duration_error_max_s'] * 1e3:.1f} ms")
+    print(f"Erro da contagem máx {fly['count_error_max']} | erro da posição real média "
+          f"{fly['position_error_mean']:.2f}, máx {fly['position_error_max']:.2f} contagens")
+    print(f"Ganho de vazão: {fly['images_per_min'] / report['stop_and_shoot']['images_per_min']:.1f}x "
+          f"(tempo real {wall:.1f} s)")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())